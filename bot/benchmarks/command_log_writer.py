@@ -0,0 +1,120 @@
+"""
+Command log written inline vs through the buffered writer.
+
+Logs ``--commands`` commands from ``--concurrency`` concurrent handlers,
+either
+
+* ``insert``: one ``INSERT INTO command_log`` transaction per command, in
+  the handler, as a naive write path would, or
+* ``buffered``: `BufferedCommandLogWriter.record` in the handler, COPYed
+  in batches by the writer.
+
+Reports the time the handlers spent logging (the latency added to each
+command) and the rate at which entries reached the table. The entries are
+deleted at the end.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/command_log_writer.py --commands 20000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+
+from config import CommandLogConfig, PostgresConfig
+from domain.entities import CommandLogEntity
+from infrastructure.adapters.command_log import (
+    BufferedCommandLogWriter,
+    CommandLogRetention,
+)
+from infrastructure.adapters.postgres import dispose_engines, new_session_maker
+from infrastructure.repositories.mappers import COMMAND_LOG
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+TELEGRAM_ID = -424242
+
+INSERT_STMT = text(
+    f"""
+    INSERT INTO command_log ({', '.join(COMMAND_LOG.columns)})
+    VALUES ({', '.join(f':{c}' for c in COMMAND_LOG.columns)})
+    """
+)
+
+
+def entry(n: int) -> CommandLogEntity:
+    return CommandLogEntity(
+        request_id=uuid.uuid4(), telegram_id=TELEGRAM_ID, chat_id=TELEGRAM_ID,
+        message_id=n, kind="text", text="turn on the kitchen light",
+        status="received", created_at=datetime.now(timezone.utc),
+    )
+
+
+async def measure(
+    name: str,
+    session_maker: async_sessionmaker[AsyncSession],
+    config: CommandLogConfig,
+    commands: int,
+    concurrency: int,
+) -> None:
+    writer = BufferedCommandLogWriter(session_maker, config)
+    latencies: list[float] = []
+
+    async def handler(worker: int) -> None:
+        for n in range(worker, commands, concurrency):
+            started = time.perf_counter()
+            if name == "insert":
+                async with session_maker() as session:
+                    await session.execute(
+                        INSERT_STMT, COMMAND_LOG.to_params(entry(n))
+                    )
+                    await session.commit()
+            else:
+                writer.record(entry(n))
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0)
+
+    await writer.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(handler(worker) for worker in range(concurrency)))
+    await writer.stop()
+    elapsed = time.perf_counter() - started
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<8} {commands / elapsed:>9.0f} {q[49] * 1e6:>9.1f} "
+        f"{q[98] * 1e6:>9.1f} {writer.dropped:>8}"
+    )
+
+
+async def main(commands: int, concurrency: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    config = CommandLogConfig.model_validate(os.environ)
+    await CommandLogRetention(session_maker, config).maintain_partitions()
+    print(
+        f"{'log':<8} {'rows/s':>9} {'p50 us':>9} {'p99 us':>9} {'dropped':>8}"
+    )
+    try:
+        for name in ("insert", "buffered"):
+            await measure(name, session_maker, config, commands, concurrency)
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                text("DELETE FROM command_log WHERE telegram_id = :id"),
+                {"id": TELEGRAM_ID},
+            )
+            await session.commit()
+        await dispose_engines(session_maker)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--commands", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+    asyncio.run(main(args.commands, args.concurrency))
@@ -0,0 +1,143 @@
+"""
+Bulk device writes vs the single-row loop.
+
+For each batch size, inserts (and then updates) synthetic devices of one
+home with ``SmartDeviceRepositorySQL`` using the per-row methods and the
+bulk ``create_many`` / ``upsert_many`` / ``update_many`` APIs. Every run is
+rolled back, so the database is left untouched.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/device_bulk.py --sizes 10,1000,100000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Awaitable, Callable
+
+from config import PostgresConfig
+from domain.entities import HomeEntity, SmartDeviceEntity
+from infrastructure.adapters.postgres import new_session_maker
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+# A scenario returns the seconds of its measured part, or None to time all of it.
+Scenario = Callable[
+    [SmartDeviceRepositorySQL, list[SmartDeviceEntity]], Awaitable[float | None]
+]
+
+
+def make_devices(home_id: uuid.UUID, count: int) -> list[SmartDeviceEntity]:
+    now = datetime.now(timezone.utc)
+    return [
+        SmartDeviceEntity(
+            id=uuid.uuid4(), home_id=home_id, name=f"device-{i}", type="lamp",
+            location=f"room-{i % 20}", serial_number=None, manufacturer="acme",
+            model="L1", firmware_version="1.0", is_active=True,
+            registered_at=now, last_seen=now, custom_settings={"brightness": 50},
+            ip_address=None, mac_address=None, battery_level=100,
+            connectivity="wifi", status="on", last_error=None, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def loop_create(
+    repo: SmartDeviceRepositorySQL, dms: list[SmartDeviceEntity]
+) -> float | None:
+    for dm in dms:
+        await repo.create(dm)
+    return None
+
+
+async def bulk_create(
+    repo: SmartDeviceRepositorySQL, dms: list[SmartDeviceEntity]
+) -> float | None:
+    await repo.create_many(dms)
+    return None
+
+
+async def bulk_upsert(
+    repo: SmartDeviceRepositorySQL, dms: list[SmartDeviceEntity]
+) -> float | None:
+    await repo.upsert_many(dms)
+    return None
+
+
+async def loop_update(
+    repo: SmartDeviceRepositorySQL, dms: list[SmartDeviceEntity]
+) -> float | None:
+    await repo.create_many(dms)
+    started = time.perf_counter()
+    for dm in dms:
+        await repo.update(replace(dm, battery_level=42))
+    return time.perf_counter() - started
+
+
+async def bulk_update(
+    repo: SmartDeviceRepositorySQL, dms: list[SmartDeviceEntity]
+) -> float | None:
+    await repo.create_many(dms)
+    started = time.perf_counter()
+    await repo.update_many([replace(dm, battery_level=42) for dm in dms])
+    return time.perf_counter() - started
+
+
+async def measure(
+    session_maker: async_sessionmaker[AsyncSession], size: int, scenario: Scenario
+) -> float:
+    async with session_maker() as session:
+        home = HomeEntity(
+            id=uuid.uuid4(), name="bench", address=None,
+            created_at=datetime.now(timezone.utc),
+        )
+        await HomeRepositorySQL(session).create(home)
+        dms = make_devices(home.id, size)
+        repo = SmartDeviceRepositorySQL(session)
+        started = time.perf_counter()
+        measured = await scenario(repo, dms)
+        elapsed = time.perf_counter() - started if measured is None else measured
+        await session.rollback()
+        return elapsed
+
+
+async def main(sizes: list[int], loop_max: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    scenarios: list[tuple[str, Scenario, bool]] = [
+        ("create loop", loop_create, True),
+        ("create_many", bulk_create, False),
+        ("upsert_many", bulk_upsert, False),
+        ("update loop", loop_update, True),
+        ("update_many", bulk_update, False),
+    ]
+    print(f"{'scenario':<14} {'rows':>8} {'total ms':>10} {'us/row':>9}")
+    try:
+        for size in sizes:
+            for name, scenario, is_loop in scenarios:
+                if is_loop and size > loop_max:
+                    continue
+                elapsed = await measure(session_maker, size, scenario)
+                print(
+                    f"{name:<14} {size:>8} {elapsed * 1e3:>10.1f} "
+                    f"{elapsed / size * 1e6:>9.1f}"
+                )
+    finally:
+        await session_maker.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,1000,100000")
+    parser.add_argument(
+        "--loop-max", type=int, default=100_000,
+        help="skip the single-row loops above this batch size",
+    )
+    args = parser.parse_args()
+    asyncio.run(main([int(s) for s in args.sizes.split(",")], args.loop_max))
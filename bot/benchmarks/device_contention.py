@@ -0,0 +1,179 @@
+"""
+Row locks vs optimistic compare-and-swap under concurrent device writers.
+
+Commits a home with a few devices and lets concurrent workers update them:
+even workers tick the battery level (the gateway), odd workers change a
+settings key (the webapp). Each update runs in its own transaction, either
+
+* ``lock``: ``read(lock="no_key_update")`` then ``update``, so writers of
+  the same device queue on its row lock for the whole transaction, or
+* ``cas``: unlocked ``read`` then version-checked ``update`` inside
+  ``UnitOfWork.retry``, which re-runs the transaction on a conflict.
+
+Reports throughput, latency percentiles and the number of CAS retries. The
+devices and the home are deleted at the end.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/device_contention.py --workers 32 --devices 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from config import PostgresConfig
+from domain.entities import HomeEntity, SmartDeviceEntity
+from infrastructure.adapters.postgres import LazySession, new_session_maker
+from infrastructure.adapters.uow import UnitOfWork
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.home_user_role import HomeUserRoleRepositorySQL
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from infrastructure.repositories.user import TelegramUserRepositorySQL
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class NoPermissions:
+    async def invalidate(self, **kwargs: Any) -> None:
+        pass
+
+
+def new_uow(session_maker: async_sessionmaker[AsyncSession]) -> UnitOfWork:
+    return UnitOfWork(
+        LazySession(session_maker),  # type: ignore[arg-type]
+        users=TelegramUserRepositorySQL,  # type: ignore[arg-type]
+        home=HomeRepositorySQL,  # type: ignore[arg-type]
+        roles=HomeUserRoleRepositorySQL,  # type: ignore[arg-type]
+        devices=SmartDeviceRepositorySQL,  # type: ignore[arg-type]
+        outbox=OutboxRepositorySQL,  # type: ignore[arg-type]
+        permissions=NoPermissions(),  # type: ignore[arg-type]
+    )
+
+
+def change(dm: SmartDeviceEntity, worker: int) -> SmartDeviceEntity:
+    now = datetime.now(timezone.utc)
+    if worker % 2 == 0:
+        return replace(dm, battery_level=random.randint(0, 100), last_seen=now)
+    settings = dict(dm.custom_settings or {})
+    settings[f"worker_{worker}"] = random.randint(0, 100)
+    return replace(dm, custom_settings=settings, updated_at=now)
+
+
+async def locked_update(
+    session_maker: async_sessionmaker[AsyncSession], device_id: uuid.UUID, worker: int
+) -> int:
+    async with new_uow(session_maker) as uow:
+        dm = await uow.devices.read(id=device_id, lock="no_key_update")
+        assert dm is not None
+        await uow.devices.update(change(dm, worker), check_version=False)
+    return 0
+
+
+async def cas_update(
+    session_maker: async_sessionmaker[AsyncSession], device_id: uuid.UUID, worker: int
+) -> int:
+    runs = 0
+
+    async def operation(uow: UnitOfWork) -> None:
+        nonlocal runs
+        runs += 1
+        dm = await uow.devices.read(id=device_id, lock=None)
+        assert dm is not None
+        await uow.devices.update(change(dm, worker))
+
+    await new_uow(session_maker).retry(operation, attempts=50)
+    return runs - 1
+
+
+Strategy = Callable[
+    [async_sessionmaker[AsyncSession], uuid.UUID, int], Awaitable[int]
+]
+
+
+async def run(
+    session_maker: async_sessionmaker[AsyncSession],
+    strategy: Strategy,
+    device_ids: list[uuid.UUID],
+    workers: int,
+    ops: int,
+) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    retries = 0
+
+    async def worker(n: int) -> None:
+        nonlocal retries
+        rng = random.Random(n)
+        for _ in range(ops):
+            started = time.perf_counter()
+            retries += await strategy(session_maker, rng.choice(device_ids), n)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    return time.perf_counter() - started, latencies, retries
+
+
+async def main(workers: int, devices: int, ops: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    now = datetime.now(timezone.utc)
+    home = HomeEntity(id=uuid.uuid4(), name="contention", address=None, created_at=now)
+    dms = [
+        SmartDeviceEntity(
+            id=uuid.uuid4(), home_id=home.id, name=f"device-{i}", type="lamp",
+            location=None, serial_number=None, manufacturer=None, model=None,
+            firmware_version=None, is_active=True, registered_at=now,
+            last_seen=now, custom_settings={}, ip_address=None,
+            mac_address=None, battery_level=100, connectivity="wifi",
+            status="on", last_error=None, updated_at=now,
+        )
+        for i in range(devices)
+    ]
+    async with session_maker() as session:
+        await HomeRepositorySQL(session).create(home)
+        await SmartDeviceRepositorySQL(session).create_many(dms)
+        await session.commit()
+
+    ids = [dm.id for dm in dms]
+    print(
+        f"{'strategy':<8} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'retries':>8}"
+    )
+    try:
+        for name, strategy in (("lock", locked_update), ("cas", cas_update)):
+            elapsed, latencies, retries = await run(
+                session_maker, strategy, ids, workers, ops
+            )
+            q = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name:<8} {len(latencies) / elapsed:>8.0f} {q[49] * 1e3:>8.2f} "
+                f"{q[94] * 1e3:>8.2f} {q[98] * 1e3:>8.2f} {retries:>8}"
+            )
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                text("DELETE FROM smart_devices WHERE home_id = :id"), {"id": home.id}
+            )
+            await session.execute(
+                text("DELETE FROM homes WHERE id = :id"), {"id": home.id}
+            )
+            await session.commit()
+        await session_maker.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--devices", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=200, help="updates per worker")
+    args = parser.parse_args()
+    asyncio.run(main(args.workers, args.devices, args.ops))
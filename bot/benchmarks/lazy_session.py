@@ -0,0 +1,114 @@
+"""
+Per-update benchmark: the previous session provider vs `LazySession`.
+
+Simulates a stream of Telegram updates where only a fraction touch Postgres
+(the rest are text/voice commands that only need Redis) and reports the peak
+number of checked-out pool connections and the mean latency per update for
+both.
+
+``baseline`` is what the container and UnitOfWork did before: open an
+`AsyncSession` per update, ``begin`` it on entering the unit of work and
+``commit`` on leaving it. `AsyncSession` already checks a connection out
+only on the first statement, so the peak connection counts of the two
+should match; the difference is the cost of opening and closing a session
+for the updates that never query Postgres.
+
+Run from the ``bot`` directory against a database configured through the
+usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/lazy_session.py --updates 2000 --db-ratio 0.1
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from typing import Awaitable, Callable
+
+from config import PostgresConfig
+from infrastructure.adapters.postgres import LazySession, new_session_maker
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+Update = Callable[[async_sessionmaker[AsyncSession], bool], Awaitable[None]]
+
+
+async def baseline_update(
+    session_maker: async_sessionmaker[AsyncSession], touches_db: bool
+) -> None:
+    async with session_maker() as session:
+        await session.begin()
+        if touches_db:
+            await session.execute(text("SELECT 1"))
+        await asyncio.sleep(0.001)
+        await session.commit()
+
+
+async def lazy_update(
+    session_maker: async_sessionmaker[AsyncSession], touches_db: bool
+) -> None:
+    session = LazySession(session_maker)
+    try:
+        await session.begin()
+        if touches_db:
+            await session.execute(text("SELECT 1"))
+        await asyncio.sleep(0.001)
+        await session.commit()
+    finally:
+        await session.close()
+
+
+async def run(
+    name: str,
+    update: Update,
+    session_maker: async_sessionmaker[AsyncSession],
+    plan: list[bool],
+    concurrency: int,
+) -> None:
+    pool = session_maker.kw["bind"].pool
+    peak = 0
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def sample() -> None:
+        nonlocal peak
+        while True:
+            peak = max(peak, pool.checkedout())
+            await asyncio.sleep(0.0005)
+
+    async def one(touches_db: bool) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await update(session_maker, touches_db)
+            latencies.append(time.perf_counter() - started)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    await asyncio.gather(*(one(touches_db) for touches_db in plan))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    mean_ms = sum(latencies) / len(latencies) * 1000
+    print(
+        f"{name:>8}: {len(plan) / elapsed:8.0f} upd/s, "
+        f"mean {mean_ms:6.2f} ms, peak connections {peak}"
+    )
+
+
+async def main(updates: int, db_ratio: float, concurrency: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    plan = [random.random() < db_ratio for _ in range(updates)]
+    try:
+        await run("baseline", baseline_update, session_maker, plan, concurrency)
+        await run("lazy", lazy_update, session_maker, plan, concurrency)
+    finally:
+        await session_maker.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--db-ratio", type=float, default=0.1)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.db_ratio, args.concurrency))
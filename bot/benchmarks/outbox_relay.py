@@ -0,0 +1,165 @@
+"""
+Outbox relay throughput and commit-to-delivery lag.
+
+Concurrent producers commit units of work that each add ``--per-uow``
+outbox messages, ``--messages`` in total, while an `OutboxRelay` publishes
+them to a temporary queue consumed by this script. Runs twice: with the
+relay woken by the outbox NOTIFY, and polling only, every
+``--poll-interval`` seconds. Reports delivered messages per second and
+percentiles of the lag between the producer's commit and the delivery.
+
+Run from the ``bot`` directory against a migrated database and a broker
+configured through the usual ``DB_*`` and ``MQ_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/outbox_relay.py --messages 20000 --producers 16
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from config import OutboxConfig, PostgresConfig, RabbitMQConfig
+from domain.entities import OutboxMessageEntity
+from faststream.rabbit import RabbitQueue
+from infrastructure.adapters.outbox import OutboxRelay
+from infrastructure.adapters.postgres import (
+    LazySession,
+    dispose_engines,
+    new_session_maker,
+)
+from infrastructure.adapters.rabbit import new_broker
+from infrastructure.adapters.uow import UnitOfWork
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.home_user_role import HomeUserRoleRepositorySQL
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from infrastructure.repositories.user import TelegramUserRepositorySQL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+QUEUE = RabbitQueue(f"outbox_bench_{uuid.uuid4().hex[:8]}", auto_delete=True)
+
+
+class NoPermissions:
+    async def invalidate(self, **kwargs: Any) -> None:
+        pass
+
+
+def new_uow(session_maker: async_sessionmaker[AsyncSession]) -> UnitOfWork:
+    return UnitOfWork(
+        LazySession(session_maker),  # type: ignore[arg-type]
+        users=TelegramUserRepositorySQL,  # type: ignore[arg-type]
+        home=HomeRepositorySQL,  # type: ignore[arg-type]
+        roles=HomeUserRoleRepositorySQL,  # type: ignore[arg-type]
+        devices=SmartDeviceRepositorySQL,  # type: ignore[arg-type]
+        outbox=OutboxRepositorySQL,  # type: ignore[arg-type]
+        permissions=NoPermissions(),  # type: ignore[arg-type]
+    )
+
+
+class Consumer:
+    def __init__(self) -> None:
+        self.lags: list[float] = []
+        self.last_at = 0.0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def __call__(self, body: dict[str, Any]) -> None:
+        self.last_at = time.perf_counter()
+        self.lags.append(time.time() - body["committed_at"])
+        if len(self.lags) >= self.expected:
+            self.done.set()
+
+    def reset(self, expected: int) -> None:
+        self.lags.clear()
+        self.done.clear()
+        self.expected = expected
+
+
+async def produce(
+    session_maker: async_sessionmaker[AsyncSession], uows: int, per_uow: int
+) -> None:
+    for _ in range(uows):
+        uow = new_uow(session_maker)
+        async with uow:
+            for _ in range(per_uow):
+                await uow.outbox.add(
+                    OutboxMessageEntity(
+                        id=uuid.uuid4(), exchange="", routing_key=QUEUE.name,
+                        payload={"committed_at": time.time()}, headers=None,
+                        created_at=datetime.now(timezone.utc),
+                    )
+                )
+
+
+async def measure(
+    name: str,
+    session_maker: async_sessionmaker[AsyncSession],
+    relay: OutboxRelay,
+    consumer: Consumer,
+    messages: int,
+    producers: int,
+    per_uow: int,
+) -> None:
+    uows = messages // (producers * per_uow)
+    consumer.reset(uows * producers * per_uow)
+    await relay.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(produce(session_maker, uows, per_uow) for _ in range(producers))
+        )
+        await asyncio.wait_for(consumer.done.wait(), 60)
+    finally:
+        await relay.stop()
+    q = statistics.quantiles(consumer.lags, n=100)
+    print(
+        f"{name:<7} {len(consumer.lags) / (consumer.last_at - started):>8.0f} "
+        f"{q[49] * 1e3:>8.1f} {q[94] * 1e3:>8.1f} {q[98] * 1e3:>8.1f}"
+    )
+
+
+async def main(
+    messages: int, producers: int, per_uow: int, poll_interval: float
+) -> None:
+    psql_config = PostgresConfig.model_validate(os.environ)
+    session_maker = new_session_maker(psql_config)
+    broker = new_broker(RabbitMQConfig.model_validate(os.environ))
+    consumer = Consumer()
+    broker.subscriber(QUEUE)(consumer)
+    await broker.start()
+    print(f"{'relay':<7} {'msg/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    try:
+        for name, listen in (("notify", True), ("poll", False)):
+            config = OutboxConfig.model_validate(
+                {
+                    **os.environ,
+                    "OUTBOX_LISTEN": listen,
+                    "OUTBOX_POLL_INTERVAL": poll_interval,
+                }
+            )
+            relay = OutboxRelay(session_maker, broker, psql_config, config)
+            await measure(
+                name, session_maker, relay, consumer, messages, producers, per_uow
+            )
+    finally:
+        await broker.stop()
+        await dispose_engines(session_maker)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--producers", type=int, default=16)
+    parser.add_argument(
+        "--per-uow", type=int, default=1, help="messages per unit of work"
+    )
+    parser.add_argument("--poll-interval", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.messages, args.producers, args.per_uow, args.poll_interval)
+    )
@@ -0,0 +1,136 @@
+"""
+Dirty-field vs full-row device updates.
+
+Creates synthetic devices with a large ``custom_settings`` document and
+applies battery ticks (and one settings-key change) to each of them with
+``SmartDeviceRepositorySQL.update``, once through a repository that has no
+snapshot of the devices (full 19-column UPDATE) and once through one that
+read them first (only the changed columns / keys are written). Reports
+latency and the WAL bytes generated per update. Every run is rolled back,
+so the database is left untouched.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/partial_update.py --devices 500 --ticks 5
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timezone
+
+from config import PostgresConfig
+from domain.entities import HomeEntity, SmartDeviceEntity
+from infrastructure.adapters.postgres import new_session_maker
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+WAL_LSN = text("SELECT pg_current_wal_lsn()")
+WAL_DIFF = text("SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), :lsn)")
+
+
+def make_devices(
+    home_id: uuid.UUID, count: int, settings_keys: int
+) -> list[SmartDeviceEntity]:
+    now = datetime.now(timezone.utc)
+    return [
+        SmartDeviceEntity(
+            id=uuid.uuid4(), home_id=home_id, name=f"device-{i}", type="sensor",
+            location=f"room-{i % 20}", serial_number=None, manufacturer="acme",
+            model="S1", firmware_version="1.0", is_active=True,
+            registered_at=now, last_seen=now,
+            custom_settings={
+                f"option_{k}": {"value": k, "label": f"Option {k}" * 4}
+                for k in range(settings_keys)
+            },
+            ip_address=None, mac_address=None, battery_level=100,
+            connectivity="zigbee", status="online", last_error=None,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def tick(dm: SmartDeviceEntity, step: int) -> SmartDeviceEntity:
+    now = datetime.now(timezone.utc)
+    settings = dict(dm.custom_settings or {})
+    if step == 0:
+        settings["option_0"] = {"value": -1, "label": "changed"}
+    return replace(
+        dm,
+        battery_level=max(0, (dm.battery_level or 100) - 1),
+        last_seen=now,
+        updated_at=now,
+        custom_settings=settings,
+    )
+
+
+async def measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    devices: int,
+    ticks: int,
+    settings_keys: int,
+    partial: bool,
+) -> tuple[float, float]:
+    async with session_maker() as session:
+        home = HomeEntity(
+            id=uuid.uuid4(), name="bench", address=None,
+            created_at=datetime.now(timezone.utc),
+        )
+        await HomeRepositorySQL(session).create(home)
+        dms = make_devices(home.id, devices, settings_keys)
+        await SmartDeviceRepositorySQL(session).create_many(dms)
+
+        repo = SmartDeviceRepositorySQL(session)
+        if partial:
+            # Reading the devices gives the repository its snapshots.
+            dms = [await repo.read(id=dm.id) for dm in dms]  # type: ignore[misc]
+        lsn = (await session.execute(WAL_LSN)).scalar_one()
+        started = time.perf_counter()
+        for step in range(ticks):
+            updated = []
+            for dm in dms:
+                if not partial:
+                    # A fresh repository has no snapshot to diff against.
+                    repo = SmartDeviceRepositorySQL(session)
+                updated.append(await repo.update(tick(dm, step)))
+            dms = updated
+        elapsed = time.perf_counter() - started
+        wal = (await session.execute(WAL_DIFF, {"lsn": lsn})).scalar_one()
+        await session.rollback()
+        return elapsed, float(wal)
+
+
+async def main(devices: int, ticks: int, settings_keys: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    updates = devices * ticks
+    print(f"{'mode':<8} {'updates':>8} {'us/update':>10} {'WAL B/update':>13}")
+    try:
+        for name, partial in (("full", False), ("partial", True)):
+            elapsed, wal = await measure(
+                session_maker, devices, ticks, settings_keys, partial
+            )
+            print(
+                f"{name:<8} {updates:>8} {elapsed / updates * 1e6:>10.1f} "
+                f"{wal / updates:>13.1f}"
+            )
+    finally:
+        await session_maker.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument(
+        "--settings-keys", type=int, default=200,
+        help="top-level keys in each device's custom_settings",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.devices, args.ticks, args.settings_keys))
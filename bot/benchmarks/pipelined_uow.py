@@ -0,0 +1,158 @@
+"""
+Round trips of the onboarding unit of work with and without pipelining.
+
+Each iteration runs the flow of adding a home: one UnitOfWork creates the
+home, the owner's role and N devices and commits. It runs once over a
+plain `LazySession` (``BEGIN``, every statement and ``COMMIT`` wait for
+the server) and once over a `PipelinedSession`, which queues the inserts
+and the ``COMMIT``; the role insert reads its ``RETURNING`` value and so
+still syncs the pipeline. Reports the latency per flow. The gap grows
+with the network latency to the database, so run it against a remote
+server to see the effect the bot gets in production. The rows are
+deleted at the end.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/pipelined_uow.py --flows 200 --devices 10
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any
+
+from config import PostgresConfig
+from domain.entities import (
+    HomeEntity,
+    HomeRole,
+    HomeUserRoleEntity,
+    SmartDeviceEntity,
+    TelegramUserEntity,
+)
+from infrastructure.adapters.postgres import (
+    LazySession,
+    PipelinedSession,
+    new_session_maker,
+)
+from infrastructure.adapters.uow import UnitOfWork
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.home_user_role import HomeUserRoleRepositorySQL
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from infrastructure.repositories.user import TelegramUserRepositorySQL
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class NoPermissions:
+    async def invalidate(self, **kwargs: Any) -> None:
+        pass
+
+
+def new_uow(session: LazySession) -> UnitOfWork:
+    return UnitOfWork(
+        session,  # type: ignore[arg-type]
+        users=TelegramUserRepositorySQL,  # type: ignore[arg-type]
+        home=HomeRepositorySQL,  # type: ignore[arg-type]
+        roles=HomeUserRoleRepositorySQL,  # type: ignore[arg-type]
+        devices=SmartDeviceRepositorySQL,  # type: ignore[arg-type]
+        outbox=OutboxRepositorySQL,  # type: ignore[arg-type]
+        permissions=NoPermissions(),  # type: ignore[arg-type]
+    )
+
+
+async def onboard(
+    session: LazySession, user_id: uuid.UUID, devices: int
+) -> uuid.UUID:
+    now = datetime.now(timezone.utc)
+    home = HomeEntity(id=uuid.uuid4(), name="onboarding", address=None, created_at=now)
+    try:
+        async with new_uow(session) as uow:
+            await uow.home.create(home)
+            await uow.roles.create(
+                HomeUserRoleEntity(uuid.uuid4(), home.id, user_id, HomeRole.OWNER, now)
+            )
+            await uow.devices.create_many([
+                SmartDeviceEntity(
+                    id=uuid.uuid4(), home_id=home.id, name=f"device-{i}",
+                    type="lamp", location=None, serial_number=None,
+                    manufacturer=None, model=None, firmware_version=None,
+                    is_active=True, registered_at=now, last_seen=now,
+                    custom_settings={}, ip_address=None, mac_address=None,
+                    battery_level=100, connectivity="wifi", status="on",
+                    last_error=None, updated_at=now,
+                )
+                for i in range(devices)
+            ])
+    finally:
+        await session.close()
+    return home.id
+
+
+async def measure(
+    session_maker: async_sessionmaker[AsyncSession],
+    session_cls: type[LazySession],
+    user_id: uuid.UUID,
+    flows: int,
+    devices: int,
+    home_ids: list[uuid.UUID],
+) -> list[float]:
+    latencies = []
+    for _ in range(flows):
+        started = time.perf_counter()
+        home_ids.append(await onboard(session_cls(session_maker), user_id, devices))
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main(flows: int, devices: int, warmup: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    user = TelegramUserEntity(uuid.uuid4(), 10**13 + os.getpid(), "bench", None, None)
+    async with session_maker() as session:
+        await TelegramUserRepositorySQL(session).create(user)  # type: ignore[arg-type]
+        await session.commit()
+
+    home_ids: list[uuid.UUID] = []
+    print(f"{'session':<10} {'flows':>6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8}")
+    try:
+        for session_cls in (LazySession, PipelinedSession):
+            await measure(
+                session_maker, session_cls, user.id, warmup, devices, home_ids
+            )
+            latencies = await measure(
+                session_maker, session_cls, user.id, flows, devices, home_ids
+            )
+            q = statistics.quantiles(latencies, n=100)
+            print(
+                f"{session_cls.__name__:<10} {flows:>6} {q[49] * 1e3:>8.2f} "
+                f"{q[94] * 1e3:>8.2f} {statistics.fmean(latencies) * 1e3:>8.2f}"
+            )
+    finally:
+        async with session_maker() as session:
+            params = {"ids": home_ids}
+            for table in ("smart_devices", "home_user_roles"):
+                await session.execute(
+                    text(f"DELETE FROM {table} WHERE home_id = ANY(:ids)"), params
+                )
+            await session.execute(
+                text("DELETE FROM homes WHERE id = ANY(:ids)"), params
+            )
+            await session.execute(
+                text("DELETE FROM telegram_users WHERE id = :id"), {"id": user.id}
+            )
+            await session.commit()
+        await session_maker.kw["bind"].dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--flows", type=int, default=200)
+    parser.add_argument("--devices", type=int, default=10, help="devices per home")
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.flows, args.devices, args.warmup))
@@ -0,0 +1,96 @@
+"""
+Checkout waits under load with a fixed and an adaptive pool size.
+
+Runs waves of concurrent units of work (each holds its connection for a
+short query plus ``--hold`` seconds of handler work) against a small pool,
+once with the pool size fixed and once with `PoolMonitor` resizing it
+after every wave. Reports throughput, the checkout wait percentiles and
+timeouts from the pool histogram, and the final pool size.
+
+Run from the ``bot`` directory against a database configured through the
+usual ``DB_*`` environment variables::
+
+    DB_POOL_SIZE=4 DB_MAX_OVERFLOW=2 PYTHONPATH=src \
+        python benchmarks/pool_pressure.py --concurrency 40 --waves 20
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from config import PoolMonitorConfig, PostgresConfig
+from infrastructure.adapters.pool_monitor import PoolMonitor
+from infrastructure.adapters.postgres import (
+    LazySession,
+    dispose_engines,
+    new_session_maker,
+    pool_stats,
+)
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+async def unit_of_work(
+    session_maker: async_sessionmaker[AsyncSession], hold: float
+) -> bool:
+    session = LazySession(session_maker)
+    try:
+        await session.execute(text("SELECT pg_sleep(0)"))
+        await asyncio.sleep(hold)
+        await session.commit()
+        return True
+    except Exception:
+        return False
+    finally:
+        await session.close()
+
+
+async def measure(
+    adaptive: bool, concurrency: int, waves: int, hold: float
+) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    monitor = PoolMonitor(
+        session_maker,
+        PoolMonitorConfig.model_validate({**os.environ, "DB_POOL_ADAPTIVE": "1"}),
+    )
+    done = 0
+    started = time.perf_counter()
+    try:
+        for _ in range(waves):
+            results = await asyncio.gather(
+                *(unit_of_work(session_maker, hold) for _ in range(concurrency))
+            )
+            done += sum(results)
+            if adaptive:
+                monitor.adjust()
+        elapsed = time.perf_counter() - started
+        stats = pool_stats(session_maker)[0]
+        print(
+            f"{'adaptive' if adaptive else 'fixed':<9} {done / elapsed:>8.0f} "
+            f"{stats.wait_p50 * 1e3:>8.1f} {stats.wait_p95 * 1e3:>8.1f} "
+            f"{stats.wait_p99 * 1e3:>8.1f} {stats.timeouts:>8} {stats.size:>5}"
+        )
+    finally:
+        await dispose_engines(session_maker)
+
+
+async def main(concurrency: int, waves: int, hold: float) -> None:
+    print(
+        f"{'pool':<9} {'uow/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'timeouts':>8} {'size':>5}"
+    )
+    for adaptive in (False, True):
+        await measure(adaptive, concurrency, waves, hold)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=40)
+    parser.add_argument("--waves", type=int, default=20)
+    parser.add_argument(
+        "--hold", type=float, default=0.01,
+        help="seconds each unit of work keeps its connection",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.waves, args.hold))
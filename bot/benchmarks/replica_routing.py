@@ -0,0 +1,189 @@
+"""
+Device reads on the primary vs routed to read replicas.
+
+Commits a home with some devices, waits until the replicas have them and
+then lets concurrent workers read random devices by id, each read in its
+own unit of work: once pinned to the primary and once as a read-only unit
+of work routed to the replicas. Reports throughput, latency percentiles
+and the pool of every engine after each run.
+
+It then checks read-your-writes: each trial updates a device on the
+primary and immediately reads it back in a read-only unit of work, and
+counts the reads that returned the old row. Run it with
+``DB_READ_YOUR_WRITES=0`` to see what the window protects against.
+
+Run from the ``bot`` directory with ``DB_REPLICA_HOSTS`` listing the
+replicas (a streaming replica or a second local Postgres fed by logical
+replication) next to the usual ``DB_*`` environment variables::
+
+    DB_REPLICA_HOSTS=localhost:5433 PYTHONPATH=src \
+        python benchmarks/replica_routing.py --workers 32 --reads 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any
+
+from config import PostgresConfig
+from domain.entities import HomeEntity, SmartDeviceEntity
+from infrastructure.adapters.postgres import (
+    LazySession,
+    dispose_engines,
+    new_session_maker,
+    pool_stats,
+)
+from infrastructure.adapters.uow import UnitOfWork
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.home_user_role import HomeUserRoleRepositorySQL
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from infrastructure.repositories.user import TelegramUserRepositorySQL
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+
+class NoPermissions:
+    async def invalidate(self, **kwargs: Any) -> None:
+        pass
+
+
+def new_uow(session_maker: async_sessionmaker[AsyncSession]) -> UnitOfWork:
+    return UnitOfWork(
+        LazySession(session_maker),  # type: ignore[arg-type]
+        users=TelegramUserRepositorySQL,  # type: ignore[arg-type]
+        home=HomeRepositorySQL,  # type: ignore[arg-type]
+        roles=HomeUserRoleRepositorySQL,  # type: ignore[arg-type]
+        devices=SmartDeviceRepositorySQL,  # type: ignore[arg-type]
+        outbox=OutboxRepositorySQL,  # type: ignore[arg-type]
+        permissions=NoPermissions(),  # type: ignore[arg-type]
+    )
+
+
+async def read_device(
+    session_maker: async_sessionmaker[AsyncSession],
+    device_id: uuid.UUID,
+    replica: bool,
+) -> SmartDeviceEntity | None:
+    uow = new_uow(session_maker)
+    try:
+        if replica:
+            uow.read_only()
+        else:
+            uow.session.routing = "primary"
+        async with uow:
+            return await uow.devices.read(id=device_id)
+    finally:
+        await uow.session.close()  # type: ignore[attr-defined]
+
+
+async def run(
+    session_maker: async_sessionmaker[AsyncSession],
+    device_ids: list[uuid.UUID],
+    workers: int,
+    reads: int,
+    replica: bool,
+) -> tuple[float, list[float]]:
+    latencies: list[float] = []
+
+    async def worker(n: int) -> None:
+        rng = random.Random(n)
+        for _ in range(reads):
+            started = time.perf_counter()
+            await read_device(session_maker, rng.choice(device_ids), replica)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    return time.perf_counter() - started, latencies
+
+
+async def stale_reads(
+    session_maker: async_sessionmaker[AsyncSession],
+    device_id: uuid.UUID,
+    trials: int,
+) -> int:
+    stale = 0
+    for trial in range(trials):
+        uow = new_uow(session_maker)
+        try:
+            async with uow:
+                dm = await uow.devices.read(id=device_id, lock="no_key_update")
+                assert dm is not None
+                await uow.devices.update(replace(dm, name=f"renamed-{trial}"))
+        finally:
+            await uow.session.close()  # type: ignore[attr-defined]
+        dm = await read_device(session_maker, device_id, replica=True)
+        stale += dm is None or dm.name != f"renamed-{trial}"
+    return stale
+
+
+async def main(workers: int, devices: int, reads: int, trials: int) -> int:
+    psql_config = PostgresConfig.model_validate(os.environ)
+    if not psql_config.replica_hosts:
+        print("DB_REPLICA_HOSTS is not set, nothing to compare")
+        return 1
+    session_maker = new_session_maker(psql_config)
+    now = datetime.now(timezone.utc)
+    home = HomeEntity(id=uuid.uuid4(), name="replicas", address=None, created_at=now)
+    dms = [
+        SmartDeviceEntity(
+            id=uuid.uuid4(), home_id=home.id, name=f"device-{i}", type="lamp",
+            location=None, serial_number=None, manufacturer=None, model=None,
+            firmware_version=None, is_active=True, registered_at=now,
+            last_seen=now, custom_settings={}, ip_address=None,
+            mac_address=None, battery_level=100, connectivity="wifi",
+            status="on", last_error=None, updated_at=now,
+        )
+        for i in range(devices)
+    ]
+    uow = new_uow(session_maker)
+    async with uow:
+        await uow.home.create(home)
+        await uow.devices.create_many(dms)
+    await uow.session.close()  # type: ignore[attr-defined]
+
+    ids = [dm.id for dm in dms]
+    try:
+        while await read_device(session_maker, ids[-1], replica=True) is None:
+            await asyncio.sleep(0.1)
+        print(f"{'reads on':<9} {'ops/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+        for name, replica in (("primary", False), ("replicas", True)):
+            elapsed, latencies = await run(session_maker, ids, workers, reads, replica)
+            q = statistics.quantiles(latencies, n=100)
+            print(
+                f"{name:<9} {len(latencies) / elapsed:>8.0f} "
+                f"{q[49] * 1e3:>8.2f} {q[94] * 1e3:>8.2f}"
+            )
+            for stats in pool_stats(session_maker):
+                print(f"    {stats}")
+        stale = await stale_reads(session_maker, ids[0], trials)
+        print(f"read-your-writes: {stale}/{trials} stale reads after a commit")
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                text("DELETE FROM smart_devices WHERE home_id = :id"), {"id": home.id}
+            )
+            await session.execute(
+                text("DELETE FROM homes WHERE id = :id"), {"id": home.id}
+            )
+            await session.commit()
+        await dispose_engines(session_maker)
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=200, help="reads per worker")
+    parser.add_argument("--trials", type=int, default=200)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.workers, args.devices, args.reads, args.trials)))
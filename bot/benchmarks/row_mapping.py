@@ -0,0 +1,118 @@
+"""
+Row-to-entity mapping: ``Entity(**row_mapping)`` / ``asdict`` vs the
+precompiled tuple mappers.
+
+Builds in-memory SQLAlchemy results (no database needed) of synthetic
+rows for every repository entity and times, per row:
+
+* loading: ``result.mappings()`` + ``Entity(**row)`` against positional
+  ``result`` rows + ``EntityMapper.from_row``;
+* dumping: ``dataclasses.asdict`` against ``EntityMapper.to_params``.
+
+Run from the ``bot`` directory::
+
+    PYTHONPATH=src python benchmarks/row_mapping.py --rows 10000
+"""
+
+import argparse
+import timeit
+import uuid
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from domain.entities import HomeRole
+from infrastructure.repositories.mappers import (
+    HOME,
+    HOME_USER_ROLE,
+    SMART_DEVICE,
+    TELEGRAM_USER,
+    EntityMapper,
+)
+from sqlalchemy.engine.result import IteratorResult, SimpleResultMetaData
+
+
+def make_rows(mapper: EntityMapper[Any], count: int) -> list[tuple[Any, ...]]:
+    now = datetime.now(timezone.utc)
+    values: dict[str, Callable[[int], Any]] = {
+        "telegram_id": lambda i: 10_000 + i,
+        "role": lambda i: HomeRole.GUEST.value,
+        "is_active": lambda i: True,
+        "battery_level": lambda i: i % 100,
+        "custom_settings": lambda i: {
+            "brightness": i % 100,
+            "schedule": [{"at": "07:00", "on": True}, {"at": "23:00", "on": False}],
+            "scenes": {"evening": {"brightness": 30, "color": "warm"}},
+        },
+    }
+    rows = []
+    for i in range(count):
+        row = []
+        for column in mapper.columns:
+            if column in values:
+                row.append(values[column](i))
+            elif column == "id" or column.endswith("_id"):
+                row.append(uuid.uuid4())
+            elif column.endswith("_at") or column == "last_seen":
+                row.append(now)
+            else:
+                row.append(f"{column}-{i}")
+        rows.append(tuple(row))
+    return rows
+
+
+def result(mapper: EntityMapper[Any], rows: list[tuple[Any, ...]]) -> Any:
+    return IteratorResult(SimpleResultMetaData(mapper.columns), iter(rows))
+
+
+def load_kwargs(mapper: EntityMapper[Any], rows: list[tuple[Any, ...]]) -> None:
+    entity = mapper.entity
+    if mapper is HOME_USER_ROLE:
+        # The repository had to convert the enum by hand on this path.
+        for row in result(mapper, rows).mappings():
+            entity(**{**row, "role": HomeRole(row["role"])})
+    else:
+        for row in result(mapper, rows).mappings():
+            entity(**row)
+
+
+def load_tuples(mapper: EntityMapper[Any], rows: list[tuple[Any, ...]]) -> None:
+    mapper.from_rows(result(mapper, rows).all())
+
+
+def best(func: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main(count: int, repeat: int) -> None:
+    print(f"{'entity':<20} {'op':<5} {'baseline ns':>12} {'mapper ns':>10} {'x':>6}")
+    for mapper in (TELEGRAM_USER, HOME, HOME_USER_ROLE, SMART_DEVICE):
+        rows = make_rows(mapper, count)
+        entities = mapper.from_rows(rows)
+        cases = [
+            (
+                "load",
+                lambda: load_kwargs(mapper, rows),
+                lambda: load_tuples(mapper, rows),
+            ),
+            (
+                "dump",
+                lambda: [asdict(dm) for dm in entities],
+                lambda: [mapper.to_params(dm) for dm in entities],
+            ),
+        ]
+        for op, baseline, fast in cases:
+            old = best(baseline, repeat) / count * 1e9
+            new = best(fast, repeat) / count * 1e9
+            print(
+                f"{mapper.entity.__name__:<20} {op:<5} {old:>12.0f} "
+                f"{new:>10.0f} {old / new:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
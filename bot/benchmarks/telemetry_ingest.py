@@ -0,0 +1,176 @@
+"""
+Device telemetry as in-place updates vs appends to the partitioned table.
+
+Commits a home with ``--devices`` devices and plays ``--ticks`` rounds of
+telemetry (battery level, connectivity, status) for every device, either
+
+* ``update``: one ``UPDATE smart_devices`` per sample, in batches of
+  ``--batch`` per transaction, as the registry row used to be written, or
+* ``append``: `BufferedTelemetryWriter.record` for every sample, COPYed to
+  ``device_telemetry`` by the writer, followed by one snapshot refresh.
+
+Reports samples per second and the dead tuples each run left behind in
+``smart_devices`` (as counted by the statistics collector, so give it a
+moment on a busy server). The devices, the home and the samples are
+deleted at the end.
+
+Run from the ``bot`` directory against a migrated database configured
+through the usual ``DB_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/telemetry_ingest.py --devices 500 --ticks 20
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from config import PostgresConfig, TelemetryConfig
+from domain.entities import DeviceTelemetryEntity, HomeEntity, SmartDeviceEntity
+from infrastructure.adapters.postgres import dispose_engines, new_session_maker
+from infrastructure.adapters.telemetry import (
+    BufferedTelemetryWriter,
+    TelemetryMaintenance,
+)
+from infrastructure.repositories.home import HomeRepositorySQL
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+UPDATE_TICK = text(
+    """
+    UPDATE smart_devices
+    SET battery_level = :battery_level, connectivity = :connectivity,
+        status = :status, last_seen = :recorded_at
+    WHERE id = :device_id
+    """
+)
+
+DEAD_TUPLES = text(
+    "SELECT n_dead_tup FROM pg_stat_user_tables WHERE relname = 'smart_devices'"
+)
+
+
+def samples(
+    device_ids: list[uuid.UUID], ticks: int
+) -> list[DeviceTelemetryEntity]:
+    rng = random.Random(0)
+    start = datetime.now(timezone.utc)
+    return [
+        DeviceTelemetryEntity(
+            device_id=device_id,
+            recorded_at=start + timedelta(seconds=tick),
+            battery_level=rng.randint(0, 100),
+            connectivity=rng.choice(("wifi", "zigbee")),
+            status=rng.choice(("on", "off")),
+        )
+        for tick in range(ticks)
+        for device_id in device_ids
+    ]
+
+
+async def dead_tuples(session_maker: async_sessionmaker[AsyncSession]) -> int:
+    async with session_maker() as session:
+        return int((await session.execute(DEAD_TUPLES)).scalar_one())
+
+
+async def updates(
+    session_maker: async_sessionmaker[AsyncSession],
+    rows: list[DeviceTelemetryEntity],
+    batch: int,
+) -> None:
+    for i in range(0, len(rows), batch):
+        async with session_maker() as session:
+            for sample in rows[i:i + batch]:
+                await session.execute(
+                    UPDATE_TICK,
+                    {
+                        "device_id": sample.device_id,
+                        "recorded_at": sample.recorded_at,
+                        "battery_level": sample.battery_level,
+                        "connectivity": sample.connectivity,
+                        "status": sample.status,
+                    },
+                )
+            await session.commit()
+
+
+async def appends(
+    session_maker: async_sessionmaker[AsyncSession],
+    rows: list[DeviceTelemetryEntity],
+    config: TelemetryConfig,
+) -> None:
+    writer = BufferedTelemetryWriter(session_maker, config)
+    await writer.start()
+    for sample in rows:
+        while not writer.record(sample):
+            await asyncio.sleep(0.001)
+    await writer.stop()
+    await TelemetryMaintenance(session_maker, config).refresh_snapshots()
+
+
+async def main(devices: int, ticks: int, batch: int) -> None:
+    session_maker = new_session_maker(PostgresConfig.model_validate(os.environ))
+    config = TelemetryConfig.model_validate(os.environ)
+    await TelemetryMaintenance(session_maker, config).maintain_partitions()
+    now = datetime.now(timezone.utc)
+    home = HomeEntity(id=uuid.uuid4(), name="telemetry", address=None, created_at=now)
+    dms = [
+        SmartDeviceEntity(
+            id=uuid.uuid4(), home_id=home.id, name=f"device-{i}", type="sensor",
+            location=None, serial_number=None, manufacturer=None, model=None,
+            firmware_version=None, is_active=True, registered_at=now,
+            last_seen=None, custom_settings={}, ip_address=None,
+            mac_address=None, battery_level=100, connectivity="wifi",
+            status="on", last_error=None, updated_at=now,
+        )
+        for i in range(devices)
+    ]
+    async with session_maker() as session:
+        await HomeRepositorySQL(session).create(home)
+        await SmartDeviceRepositorySQL(session).create_many(dms)
+        await session.commit()
+
+    ids = [dm.id for dm in dms]
+    print(f"{'mode':<8} {'samples/s':>10} {'dead tuples':>12}")
+    try:
+        for name in ("update", "append"):
+            rows = samples(ids, ticks)
+            dead = await dead_tuples(session_maker)
+            started = time.perf_counter()
+            if name == "update":
+                await updates(session_maker, rows, batch)
+            else:
+                await appends(session_maker, rows, config)
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(1)
+            dead = await dead_tuples(session_maker) - dead
+            print(f"{name:<8} {len(rows) / elapsed:>10.0f} {dead:>12}")
+    finally:
+        async with session_maker() as session:
+            await session.execute(
+                text("DELETE FROM device_telemetry WHERE device_id = ANY(:ids)"),
+                {"ids": ids},
+            )
+            await session.execute(
+                text("DELETE FROM smart_devices WHERE home_id = :id"), {"id": home.id}
+            )
+            await session.execute(
+                text("DELETE FROM homes WHERE id = :id"), {"id": home.id}
+            )
+            await session.commit()
+        await dispose_engines(session_maker)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--ticks", type=int, default=20, help="samples per device")
+    parser.add_argument(
+        "--batch", type=int, default=100, help="updates per transaction"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.devices, args.ticks, args.batch))
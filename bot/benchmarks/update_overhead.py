@@ -0,0 +1,226 @@
+"""
+Per-update overhead harness for the bot's middleware and DI chain.
+
+Feeds synthetic text ``Message`` updates through the real ``Dispatcher``,
+``BotControllers`` and dishka container (``BotProvider`` + ``AiogramProvider``)
+with in-memory Redis and Telegram backends, and prints the time per update
+split by dispatch, middleware, provider resolution and handler.
+
+Run from the ``bot`` directory::
+
+    PYTHONPATH=src python benchmarks/update_overhead.py --updates 5000
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, AsyncGenerator, AsyncIterable
+
+from aiogram import Bot, Dispatcher, Router
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage, TelegramMethod
+from aiogram.methods.base import TelegramType
+from aiogram.types import Chat, Message, Update, User
+from application.dto import ThrottleDecision
+from application.interfaces import (
+    AdmissionControllerProtocol,
+    PermissionCacheProtocol,
+    RateLimiterProtocol,
+)
+from config import BotConfig, Config, PostgresConfig, RabbitMQConfig, RedisConfig
+from controllers.amqp_bot import BotControllers
+from controllers.middleware import DomainErrorMiddleware, ThrottlingMiddleware
+from controllers.profiling import (
+    UpdateProfiler,
+    instrument_dispatcher,
+    profiled_inject,
+)
+from controllers.states import CommandState
+from dishka import Provider, Scope, make_async_container, provide
+from dishka.integrations.aiogram import AiogramProvider, setup_dishka
+from faststream.rabbit import RabbitBroker, RabbitRouter
+from infrastructure.adapters.entity_cache import EntityCache
+from ioc import BotProvider
+from redis.asyncio import Redis
+
+CHAT_ID = 1000
+USER = User(id=42, is_bot=False, first_name="Bench")
+
+
+class FakeSession(BaseSession):
+    """Telegram API session that answers every call without network I/O."""
+
+    async def make_request(
+        self,
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+        timeout: int | None = None,
+    ) -> TelegramType:
+        if isinstance(method, SendMessage):
+            return Message(  # type: ignore[return-value]
+                message_id=1,
+                date=datetime.now(timezone.utc),
+                chat=Chat(id=CHAT_ID, type="private"),
+                text=method.text,
+            )
+        return True  # type: ignore[return-value]
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: dict[str, Any] | None = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    async def close(self) -> None:
+        pass
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+    async def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    async def get(self, key: str) -> Any:
+        return self.data.get(key)
+
+    async def close(self) -> None:
+        pass
+
+
+class AlwaysAdmit:
+    fallback = "reject"
+
+    def admit(self) -> bool:
+        return True
+
+
+class NoLimit:
+    async def acquire(self, key: str, cost: float = 1.0) -> ThrottleDecision:
+        return ThrottleDecision(True, 0.0, cached=True)
+
+
+class NoPermissions:
+    async def role_on_device(self, *args: Any) -> None:
+        return None
+
+    async def can_run(self, *args: Any) -> bool:
+        return False
+
+    async def invalidate(self, **kwargs: Any) -> None:
+        pass
+
+
+class FakeBackendsProvider(Provider):
+    @provide(scope=Scope.REQUEST, override=True)
+    async def get_redis_conn(self) -> AsyncIterable[Redis]:
+        yield FakeRedis()  # type: ignore[misc]
+
+    @provide(scope=Scope.APP, override=True)
+    def get_admission_controller(self) -> AdmissionControllerProtocol:
+        return AlwaysAdmit()
+
+    @provide(scope=Scope.APP, override=True)
+    def get_rate_limiter(self) -> RateLimiterProtocol:
+        return NoLimit()
+
+    @provide(scope=Scope.APP, override=True)
+    def get_permission_cache(self) -> PermissionCacheProtocol:
+        return NoPermissions()
+
+    @provide(scope=Scope.APP, override=True)
+    def get_entity_cache(self, config: Config) -> EntityCache:
+        # Never started: without its LISTEN connection the cache stays empty.
+        return EntityCache(config.postgres, config.entity_cache)
+
+
+def make_config() -> Config:
+    return Config.model_construct(
+        rabbit=RabbitMQConfig.model_construct(),
+        redis=RedisConfig.model_construct(),
+        bot=BotConfig.model_construct(
+            token="42:bench", profile=True, global_rate=1e6, chat_interval=0.0
+        ),
+        postgres=PostgresConfig.model_construct(
+            host="localhost", port=5432, login="bench",
+            password="bench", database="bench",
+        ),
+    )
+
+
+def make_update(update_id: int) -> Update:
+    return Update(
+        update_id=update_id,
+        message=Message(
+            message_id=update_id,
+            date=datetime.now(timezone.utc),
+            chat=Chat(id=CHAT_ID, type="private"),
+            from_user=USER,
+            text="turn on the kitchen light",
+        ),
+    )
+
+
+async def main(updates: int, warmup: int) -> None:
+    bot = Bot(token="42:bench", session=FakeSession())
+    dp = Dispatcher()
+    bot_router = Router()
+    amqp_router = RabbitRouter()
+    dp.include_router(bot_router)
+    config = make_config()
+    container = make_async_container(
+        BotProvider(),
+        AiogramProvider(),
+        FakeBackendsProvider(),
+        context={
+            Config: config,
+            RabbitBroker: RabbitBroker(),
+            Router: bot_router,
+            RabbitRouter: amqp_router,
+            Bot: bot,
+        },
+    )
+    BotControllers(
+        amqp_router=amqp_router,
+        bot_router=bot_router,
+        bot=bot,
+        midleware=await container.get(DomainErrorMiddleware),
+        throttling=await container.get(ThrottlingMiddleware),
+    )
+    profiler = UpdateProfiler()
+    setup_dishka(container=container, router=dp, auto_inject=profiled_inject(profiler))
+    instrument_dispatcher(dp, profiler)
+    await dp.emit_startup(bot=bot)
+    state = dp.fsm.get_context(bot=bot, chat_id=CHAT_ID, user_id=USER.id)
+    await state.set_state(CommandState.waiting_for_command)
+
+    try:
+        for i in range(warmup):
+            await dp.feed_update(bot, make_update(i))
+        profiler.reset()
+        started = time.perf_counter()
+        for i in range(updates):
+            await dp.feed_update(bot, make_update(warmup + i))
+        elapsed = time.perf_counter() - started
+    finally:
+        await container.close()
+
+    print(profiler.format_report())
+    print(
+        f"\n{updates / elapsed:.0f} updates/s, "
+        f"{elapsed / updates * 1e6:.1f} us/update"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.warmup))
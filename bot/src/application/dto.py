@@ -27,3 +27,17 @@ class CommandInputDTO:
     text: str | None = None
     voice: BinaryIO | None = None
     mime_type: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ReplyDTO:
+    chat_id: int
+    text: str
+    merge_key: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ThrottleDecision:
+    allowed: bool
+    retry_after: float
+    cached: bool
@@ -1,7 +1,17 @@
-from domain.entities import AudioFileEntity, TelegramUserEntity, TextEventEntity
+from datetime import datetime, timezone
+from uuid import UUID
+
+from domain.entities import (
+    AudioFileEntity,
+    CommandLogEntity,
+    OutboxMessageEntity,
+    TelegramUserEntity,
+    TextEventEntity,
+)
 
 from application.dto import CommandDTO, CommandInputDTO, UserDTO
 from application.interfaces import (
+    CommandLogWriterProtocol,
     MessageCacheProtocol,
     UnitOfWorkProtocol,
     UUIDGenerator,
@@ -28,14 +38,39 @@ class FirstTouchInteractor:
         await self._uow.users.create(dm)
 
 
+def _received(dto: CommandInputDTO, id: UUID, kind: str) -> CommandLogEntity:
+    return CommandLogEntity(
+        request_id=id,
+        telegram_id=dto.user_id,
+        chat_id=dto.chat_id,
+        message_id=dto.message_id,
+        kind=kind,
+        text=dto.text,
+        status="received",
+        created_at=datetime.now(timezone.utc),
+    )
+
+
 class VoiceCommandInteractor:
+    """
+    Caches a voice command and queues it for speech recognition.
+
+    The ``stt_command`` message goes through the outbox, so it is published
+    once its transaction commits, and only after the audio it points to is
+    in the message cache.
+    """
+
     def __init__(
         self, 
         id_gen: UUIDGenerator, 
-        msg_cache: MessageCacheProtocol
+        msg_cache: MessageCacheProtocol,
+        command_log: CommandLogWriterProtocol,
+        uow: UnitOfWorkProtocol,
     ) -> None:
         self._id_gen = id_gen
         self._msg_cache = msg_cache
+        self._command_log = command_log
+        self._uow = uow
 
     async def __call__(self, dto: CommandInputDTO) -> CommandDTO:
         id = self._id_gen()
@@ -49,6 +84,22 @@ class VoiceCommandInteractor:
             await self._msg_cache.save_message(audio_file)
         else:
             raise ValueError("No voice in message")
+        async with self._uow:
+            await self._uow.outbox.add(OutboxMessageEntity(
+                id=self._id_gen(),
+                exchange="",
+                routing_key="stt_command",
+                payload={
+                    "user_id": str(dto.user_id),
+                    "message_id": str(id),
+                    "chat_id": (
+                        str(dto.chat_id) if dto.chat_id is not None else None
+                    ),
+                },
+                headers=None,
+                created_at=datetime.now(timezone.utc),
+            ))
+        self._command_log.record(_received(dto, id, "voice"))
         return CommandDTO(
             id=id,
             user_id=dto.user_id,
@@ -58,9 +109,15 @@ class VoiceCommandInteractor:
 
 
 class TextCommandInteractor:
-    def __init__(self, id_gen: UUIDGenerator, msg_cache: MessageCacheProtocol) -> None:
+    def __init__(
+        self,
+        id_gen: UUIDGenerator,
+        msg_cache: MessageCacheProtocol,
+        command_log: CommandLogWriterProtocol,
+    ) -> None:
         self._id_gen = id_gen
         self._msg_cache = msg_cache
+        self._command_log = command_log
 
     async def __call__(
         self,
@@ -72,6 +129,7 @@ class TextCommandInteractor:
             await self._msg_cache.save_message(text_event)
         else:
             raise ValueError("No text in message")
+        self._command_log.record(_received(dto, id, "text"))
         return CommandDTO(
             id=id,
             user_id=dto.user_id,
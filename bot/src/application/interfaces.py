@@ -1,17 +1,37 @@
 import types
-from typing import Any, Optional, Protocol, Self, Type  # type: ignore [attr-defined]
+from datetime import date, datetime
+from typing import (  # type: ignore [attr-defined]
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Literal,
+    Optional,
+    Protocol,
+    Self,
+    Sequence,
+    Type,
+    TypeVar,
+    overload,
+)
 from uuid import UUID
 
+from application.dto import ReplyDTO, ThrottleDecision
 from domain.entities import (
     AudioFileEntity,
+    CommandLogEntity,
+    DeviceTelemetryEntity,
     HomeEntity,
     HomeRole,
     HomeUserRoleEntity,
+    OutboxMessageEntity,
     SmartDeviceEntity,
     TelegramUserEntity,
     TextEventEntity,
 )
 
+T = TypeVar("T")
+
 
 class UUIDGenerator(Protocol):
     def __call__(self) -> UUID:
@@ -28,8 +48,34 @@ class MessageCacheProtocol(Protocol):
         ...
 
 
+class ReplySenderProtocol(Protocol):
+    def send(self, reply: ReplyDTO) -> None:
+        ...
+
+
+class AdmissionControllerProtocol(Protocol):
+    @property
+    def fallback(self) -> str:
+        ...
+
+    def admit(self) -> bool:
+        ...
+
+
+class RateLimiterProtocol(Protocol):
+    async def acquire(self, key: str, cost: float = 1.0) -> ThrottleDecision:
+        ...
+
+
 class SessionProtocol(Protocol):
-    
+    routing: Literal["primary", "replica"] | None
+
+    async def execute(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        ...
+
+    async def stream(self, statement: Any, params: Any = None, **kwargs: Any) -> Any:
+        ...
+
     async def commit(self) -> None:
         ...
     
@@ -90,7 +136,8 @@ class HomeRepositoryProtocol(Protocol):
         self, 
         id: UUID, 
         name: str | None, 
-        address: str | None
+        address: str | None,
+        version: int | None = None,
     ) -> None: 
         ...
     
@@ -99,6 +146,9 @@ class HomeRepositoryProtocol(Protocol):
 
 
 class HomeUserRoleRepositoryProtocol(Protocol):
+    # Telegram ids of users whose roles were written through this instance.
+    changed_users: set[int]
+
     def __init__(self, session: SessionProtocol) -> None:
         ...
 
@@ -108,7 +158,9 @@ class HomeUserRoleRepositoryProtocol(Protocol):
     async def read(self, *, id: UUID, lock: Any) -> HomeUserRoleEntity | None: 
         ...
     
-    async def update(self, id: UUID, new_role: HomeRole) -> None: 
+    async def update(
+        self, id: UUID, new_role: HomeRole, version: int | None = None
+    ) -> None: 
         ...
     
     async def delete(self, id: UUID) -> None: 
@@ -116,6 +168,9 @@ class HomeUserRoleRepositoryProtocol(Protocol):
 
 
 class SmartDeviceRepositoryProtocol(Protocol):
+    # Devices whose home may have changed through this instance.
+    changed_devices: set[UUID]
+
     def __init__(self, session: SessionProtocol) -> None:
         ...
 
@@ -133,20 +188,170 @@ class SmartDeviceRepositoryProtocol(Protocol):
         lock: Any,
     ) -> SmartDeviceEntity | None:        
         ...
+
+    def remember(self, dm: SmartDeviceEntity) -> None:
+        ...
     
-    async def update(self, dm: SmartDeviceEntity) -> None: 
+    async def update(
+        self, dm: SmartDeviceEntity, *, check_version: bool = True
+    ) -> SmartDeviceEntity:
+        ...
+
+    async def create_many(self, dms: Sequence[SmartDeviceEntity]) -> list[UUID]:
+        ...
+
+    async def upsert_many(self, dms: Sequence[SmartDeviceEntity]) -> None:
+        ...
+
+    async def update_many(
+        self, dms: Sequence[SmartDeviceEntity], *, check_version: bool = True
+    ) -> None:
+        ...
+
+    @overload
+    def list_by_home(
+        self,
+        home_id: UUID,
+        *,
+        columns: None = None,
+        page_size: int = ...,
+        after: tuple[str, UUID] | None = None,
+        server_side: bool = False,
+    ) -> AsyncIterator[SmartDeviceEntity]:
+        ...
+
+    @overload
+    def list_by_home(
+        self,
+        home_id: UUID,
+        *,
+        columns: Sequence[str],
+        page_size: int = ...,
+        after: tuple[str, UUID] | None = None,
+        server_side: bool = False,
+    ) -> AsyncIterator[dict[str, Any]]:
+        ...
+
+    def list_by_home(
+        self,
+        home_id: UUID,
+        *,
+        columns: Sequence[str] | None = None,
+        page_size: int = ...,
+        after: tuple[str, UUID] | None = None,
+        server_side: bool = False,
+    ) -> AsyncIterator[SmartDeviceEntity] | AsyncIterator[dict[str, Any]]:
         ...
     
     async def delete(self, id: UUID) -> None: 
         ...
 
 
+class DeviceTelemetryRepositoryProtocol(Protocol):
+    def __init__(self, session: SessionProtocol) -> None:
+        ...
+
+    async def copy_many(self, samples: Sequence[DeviceTelemetryEntity]) -> None:
+        ...
+
+    async def ensure_partitions(self, first_day: date, days: int) -> list[str]:
+        ...
+
+    async def drop_partitions_before(self, day: date) -> list[str]:
+        ...
+
+    async def refresh_snapshots(self, since: datetime) -> int:
+        ...
+
+
+class TelemetryWriterProtocol(Protocol):
+    def record(self, sample: DeviceTelemetryEntity) -> bool:
+        ...
+
+
+class OutboxRepositoryProtocol(Protocol):
+    def __init__(self, session: SessionProtocol) -> None:
+        ...
+
+    async def add(self, message: OutboxMessageEntity) -> None:
+        ...
+
+    async def claim(self, limit: int) -> list[OutboxMessageEntity]:
+        ...
+
+    async def delete_many(self, ids: Sequence[UUID]) -> None:
+        ...
+
+
+class CommandLogRepositoryProtocol(Protocol):
+    def __init__(self, session: SessionProtocol) -> None:
+        ...
+
+    async def copy_many(self, entries: Sequence[CommandLogEntity]) -> None:
+        ...
+
+    async def ensure_partitions(self, first_day: date, days: int) -> list[str]:
+        ...
+
+    async def drop_partitions_before(self, day: date) -> list[str]:
+        ...
+
+
+class CommandLogWriterProtocol(Protocol):
+    def record(self, entry: CommandLogEntity) -> bool:
+        ...
+
+
+class PermissionRepositoryProtocol(Protocol):
+    def __init__(self, session: SessionProtocol) -> None:
+        ...
+
+    async def role_on_device(
+        self, telegram_id: int, device_id: UUID
+    ) -> HomeRole | None:
+        ...
+
+
+class PermissionCacheProtocol(Protocol):
+    async def role_on_device(
+        self, session: SessionProtocol, telegram_id: int, device_id: UUID
+    ) -> HomeRole | None:
+        ...
+
+    async def can_run(
+        self,
+        session: SessionProtocol,
+        telegram_id: int,
+        device_id: UUID,
+        command: str,
+    ) -> bool:
+        ...
+
+    async def invalidate(
+        self, *, users: Sequence[int] = (), devices: Sequence[UUID] = ()
+    ) -> None:
+        ...
+
+
 class UnitOfWorkProtocol(Protocol):
     session: SessionProtocol
     users: TelegramUserRepositoryProtocol
     home: HomeRepositoryProtocol
     roles: HomeUserRoleRepositoryProtocol
     devices: SmartDeviceRepositoryProtocol
+    outbox: OutboxRepositoryProtocol
+
+    def read_only(self) -> Self:
+        ...
+
+    async def retry(
+        self,
+        operation: Callable[[Self], Awaitable[T]],  # type: ignore [valid-type]
+        *,
+        attempts: int = ...,
+        base_delay: float = ...,
+    ) -> T:
+        ...
 
     async def __aenter__(self) -> Self:
         ...
@@ -1,4 +1,5 @@
 import os
+from typing import Literal
 
 from pydantic import BaseModel, Field
 
@@ -24,10 +25,107 @@ class PostgresConfig(BaseModel):
     login: str = Field(alias="DB_USER")
     password: str = Field(alias="DB_PASS")
     database: str = Field(alias="DB_NAME")
+    pipeline: bool = Field(default=False, alias="DB_PIPELINE")
+    replica_hosts: str = Field(default="", alias="DB_REPLICA_HOSTS")
+    read_your_writes: float = Field(default=1.0, alias="DB_READ_YOUR_WRITES")
+    pool_size: int = Field(default=15, alias="DB_POOL_SIZE")
+    max_overflow: int = Field(default=15, alias="DB_MAX_OVERFLOW")
+    pool_timeout: float = Field(default=30.0, alias="DB_POOL_TIMEOUT")
+    statement_timeout: float = Field(default=15.0, alias="DB_STATEMENT_TIMEOUT")
+    idle_in_transaction_timeout: float = Field(
+        default=60.0, alias="DB_IDLE_IN_TRANSACTION_TIMEOUT"
+    )
 
 
 class BotConfig(BaseModel):
     token: str = Field(alias="BOT_TOKEN")
+    profile: bool = Field(default=False, alias="BOT_PROFILE")
+    global_rate: float = Field(default=30.0, alias="BOT_GLOBAL_RATE")
+    chat_interval: float = Field(default=1.0, alias="BOT_CHAT_INTERVAL")
+
+
+class AdmissionConfig(BaseModel):
+    queue: str = Field(default="stt_command", alias="STT_QUEUE")
+    max_depth: int = Field(default=200, alias="STT_MAX_DEPTH")
+    max_lag: float = Field(default=30.0, alias="STT_MAX_LAG")
+    resume_ratio: float = Field(default=0.8, alias="STT_RESUME_RATIO")
+    poll_interval: float = Field(default=2.0, alias="STT_POLL_INTERVAL")
+    report_interval: float = Field(default=60.0, alias="STT_REPORT_INTERVAL")
+    fallback: Literal["reject", "text"] = Field(
+        default="reject", alias="STT_SHED_FALLBACK"
+    )
+
+
+class ThrottleConfig(BaseModel):
+    rate: float = Field(default=0.5, alias="THROTTLE_RATE")
+    capacity: float = Field(default=10.0, alias="THROTTLE_CAPACITY")
+    text_cost: float = Field(default=1.0, alias="THROTTLE_TEXT_COST")
+    voice_cost_per_second: float = Field(
+        default=0.2, alias="THROTTLE_VOICE_COST_PER_SECOND"
+    )
+    lease_size: float = Field(default=3.0, alias="THROTTLE_LEASE_SIZE")
+    lease_ttl: float = Field(default=2.0, alias="THROTTLE_LEASE_TTL")
+    max_local_keys: int = Field(default=10_000, alias="THROTTLE_MAX_LOCAL_KEYS")
+
+
+class PermissionConfig(BaseModel):
+    ttl: int = Field(default=300, alias="PERMISSIONS_TTL")
+    local_ttl: float = Field(default=30.0, alias="PERMISSIONS_LOCAL_TTL")
+    max_local_users: int = Field(default=10_000, alias="PERMISSIONS_MAX_LOCAL_USERS")
+    guest_commands: str = Field(
+        default="status,turn_on,turn_off,toggle", alias="PERMISSIONS_GUEST_COMMANDS"
+    )
+
+
+class EntityCacheConfig(BaseModel):
+    max_size: int = Field(default=10_000, alias="ENTITY_CACHE_SIZE")
+    ttl: float = Field(default=60.0, alias="ENTITY_CACHE_TTL")
+    channel: str = Field(default="entity_changed", alias="ENTITY_CACHE_CHANNEL")
+    settle: float = Field(default=0.0, alias="ENTITY_CACHE_SETTLE")
+
+
+class PoolMonitorConfig(BaseModel):
+    report_interval: float = Field(default=60.0, alias="DB_POOL_REPORT_INTERVAL")
+    adaptive: bool = Field(default=False, alias="DB_POOL_ADAPTIVE")
+    min_size: int = Field(default=5, alias="DB_POOL_MIN_SIZE")
+    max_size: int = Field(default=40, alias="DB_POOL_MAX_SIZE")
+    target_wait: float = Field(default=0.005, alias="DB_POOL_TARGET_WAIT")
+    adjust_interval: float = Field(default=10.0, alias="DB_POOL_ADJUST_INTERVAL")
+    step: int = Field(default=2, alias="DB_POOL_STEP")
+
+
+class TelemetryConfig(BaseModel):
+    batch_size: int = Field(default=5000, alias="TELEMETRY_BATCH_SIZE")
+    flush_interval: float = Field(default=1.0, alias="TELEMETRY_FLUSH_INTERVAL")
+    max_buffer: int = Field(default=100_000, alias="TELEMETRY_MAX_BUFFER")
+    retention_days: int = Field(default=30, alias="TELEMETRY_RETENTION_DAYS")
+    partitions_ahead: int = Field(default=3, alias="TELEMETRY_PARTITIONS_AHEAD")
+    snapshot_interval: float = Field(
+        default=30.0, alias="TELEMETRY_SNAPSHOT_INTERVAL"
+    )
+    snapshot_slack: float = Field(default=120.0, alias="TELEMETRY_SNAPSHOT_SLACK")
+    maintenance_interval: float = Field(
+        default=3600.0, alias="TELEMETRY_MAINTENANCE_INTERVAL"
+    )
+
+
+class CommandLogConfig(BaseModel):
+    batch_size: int = Field(default=1000, alias="COMMAND_LOG_BATCH_SIZE")
+    flush_interval: float = Field(default=0.5, alias="COMMAND_LOG_FLUSH_INTERVAL")
+    max_buffer: int = Field(default=50_000, alias="COMMAND_LOG_MAX_BUFFER")
+    retention_days: int = Field(default=90, alias="COMMAND_LOG_RETENTION_DAYS")
+    partitions_ahead: int = Field(default=3, alias="COMMAND_LOG_PARTITIONS_AHEAD")
+    maintenance_interval: float = Field(
+        default=3600.0, alias="COMMAND_LOG_MAINTENANCE_INTERVAL"
+    )
+
+
+class OutboxConfig(BaseModel):
+    batch_size: int = Field(default=500, alias="OUTBOX_BATCH_SIZE")
+    poll_interval: float = Field(default=5.0, alias="OUTBOX_POLL_INTERVAL")
+    listen: bool = Field(default=True, alias="OUTBOX_LISTEN")
+    channel: str = Field(default="outbox", alias="OUTBOX_CHANNEL")
+    publish_timeout: float = Field(default=10.0, alias="OUTBOX_PUBLISH_TIMEOUT")
 
 
 class Config(BaseModel):
@@ -42,4 +140,28 @@ class Config(BaseModel):
     )
     postgres: PostgresConfig = Field(
         default_factory=lambda: PostgresConfig.model_validate(os.environ)
-    )
\ No newline at end of file
+    )
+    admission: AdmissionConfig = Field(
+        default_factory=lambda: AdmissionConfig.model_validate(os.environ)
+    )
+    throttle: ThrottleConfig = Field(
+        default_factory=lambda: ThrottleConfig.model_validate(os.environ)
+    )
+    permissions: PermissionConfig = Field(
+        default_factory=lambda: PermissionConfig.model_validate(os.environ)
+    )
+    entity_cache: EntityCacheConfig = Field(
+        default_factory=lambda: EntityCacheConfig.model_validate(os.environ)
+    )
+    pool_monitor: PoolMonitorConfig = Field(
+        default_factory=lambda: PoolMonitorConfig.model_validate(os.environ)
+    )
+    telemetry: TelemetryConfig = Field(
+        default_factory=lambda: TelemetryConfig.model_validate(os.environ)
+    )
+    outbox: OutboxConfig = Field(
+        default_factory=lambda: OutboxConfig.model_validate(os.environ)
+    )
+    command_log: CommandLogConfig = Field(
+        default_factory=lambda: CommandLogConfig.model_validate(os.environ)
+    )
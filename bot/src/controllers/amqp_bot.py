@@ -2,16 +2,17 @@ from aiogram import Bot, Router
 from aiogram.filters import Command, StateFilter
 from aiogram.fsm.context import FSMContext
 from aiogram.types import Chat, Message, User
-from application.dto import CommandInputDTO, UserDTO
+from application.dto import CommandInputDTO, ReplyDTO, UserDTO
 from application.interactors import (
     FirstTouchInteractor,
     TextCommandInteractor,
     VoiceCommandInteractor,
 )
+from application.interfaces import AdmissionControllerProtocol, ReplySenderProtocol
 from dishka import FromDishka
 from faststream.rabbit import RabbitRouter
 
-from controllers.middleware import DomainErrorMiddleware
+from controllers.middleware import DomainErrorMiddleware, ThrottlingMiddleware
 from controllers.states import CommandState
 
 
@@ -22,22 +23,26 @@ class BotControllers:
         bot_router: Router,
         bot: Bot,
         midleware: DomainErrorMiddleware, 
+        throttling: ThrottlingMiddleware,
     ) -> None:
         self._bot = bot
         self._bot_router = bot_router
         self._amqp_router = amqp_router
         self._bot_router.message(Command("start"))(self.start_handler)
         self._bot_router.message(StateFilter(CommandState.waiting_for_command))(self.command_handler)
+        self._bot_router.message.outer_middleware(throttling)
         self._bot_router.message.middleware(midleware)
-        self._amqp_router.publisher("stt_command")(self.command_handler)
 
     async def start_handler(
         self,
         message: Message, 
-        user: FromDishka[User],
+        user: FromDishka[User | None],
         chat: FromDishka[Chat | None],
         interactor: FromDishka[FirstTouchInteractor],
         state: FSMContext) -> None:
+        if user is None:
+            await message.answer("Unknown sender")
+            return
         await interactor(UserDTO(
             telegram_id=user.id,
             username=user.username,
@@ -50,10 +55,12 @@ class BotControllers:
     async def command_handler(
         self,
         message: Message,
-        user: FromDishka[User],
+        user: FromDishka[User | None],
         chat: FromDishka[Chat | None],
         voice_interactor: FromDishka[VoiceCommandInteractor],
         text_interactor: FromDishka[TextCommandInteractor],
+        replies: FromDishka[ReplySenderProtocol],
+        admission: FromDishka[AdmissionControllerProtocol],
         state: FSMContext,
     ) -> None:
         chat_id = chat.id if chat else None
@@ -62,7 +69,15 @@ class BotControllers:
         if user_id is None:
             await message.answer("Unknown sender")
             return
-        if message.voice:
+        if message.voice and not admission.admit():
+            if admission.fallback == "text":
+                await message.answer(
+                    "Voice recognition is overloaded right now, "
+                    "please type your command ⌨️"
+                )
+            else:
+                await message.answer("Busy, please try again in a minute ⏳")
+        elif message.voice:
             mime_type = message.voice.mime_type
             audio_bytes_io = await self._bot.download(message.voice)
             if audio_bytes_io is None:
@@ -71,12 +86,18 @@ class BotControllers:
                 user_id, message_id, chat_id, 
                 voice=audio_bytes_io, mime_type=mime_type
             ))
-            await message.answer("Voice command sent ✅")
+            replies.send(ReplyDTO(
+                message.chat.id, "Voice command sent ✅",
+                merge_key="command_sent:voice"
+            ))
         elif text := message.text:
             await text_interactor(CommandInputDTO(
                 user_id, message_id, chat_id, text=text
             ))
-            await message.answer("Text command sent ✅")
+            replies.send(ReplyDTO(
+                message.chat.id, "Text command sent ✅",
+                merge_key="command_sent:text"
+            ))
         else:
             await message.answer("Only text and voice are supported 🎤")
 
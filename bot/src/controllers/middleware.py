@@ -2,6 +2,8 @@ from typing import Any, Awaitable, Callable
 
 from aiogram import BaseMiddleware
 from aiogram.types import Message, TelegramObject
+from application.interfaces import RateLimiterProtocol
+from config import ThrottleConfig
 from domain.errors import DomainError
 
 
@@ -24,3 +26,43 @@ class DomainErrorMiddleware(BaseMiddleware):
                 await event.answer(str(exc))
                 return None
             raise
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """
+    Ограничивает частоту сообщений от одного пользователя токен-бакетом.
+    Голосовые сообщения стоят пропорционально длительности. Пользователь
+    получает одно предупреждение на окно блокировки, остальные сообщения
+    в этом окне молча отбрасываются.
+    """
+
+    def __init__(self, limiter: RateLimiterProtocol, config: ThrottleConfig) -> None:
+        self._limiter = limiter
+        self._config = config
+
+    def cost(self, message: Message) -> float:
+        if message.voice:
+            return (
+                self._config.text_cost
+                + message.voice.duration * self._config.voice_cost_per_second
+            )
+        return self._config.text_cost
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not isinstance(event, Message) or event.from_user is None:
+            return await handler(event, data)
+        decision = await self._limiter.acquire(
+            f"user:{event.from_user.id}", self.cost(event)
+        )
+        if decision.allowed:
+            return await handler(event, data)
+        if not decision.cached:
+            await event.answer(
+                f"Too many commands, try again in {decision.retry_after:.0f} s ⏳"
+            )
+        return None
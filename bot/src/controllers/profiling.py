@@ -0,0 +1,188 @@
+import functools
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, ParamSpec, TypeVar
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject
+from dishka.integrations.aiogram import inject
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+class _Frame:
+    __slots__ = ("name", "children")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.children = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SpanStats:
+    name: str
+    count: int
+    mean_us: float
+    p50_us: float
+    p95_us: float
+    total_ms: float
+
+
+class UpdateProfiler:
+    """
+    Collects per-update timings split into nested named spans.
+
+    Each span records its *exclusive* time: the time spent inside it minus
+    the time spent in nested spans. For an update this yields a breakdown
+    of aiogram dispatch, every middleware, dishka provider resolution and
+    the handler body that sums up to the total update latency.
+
+    The current span is tracked in a context variable, so concurrently
+    processed updates do not mix their timings.
+    """
+
+    def __init__(self) -> None:
+        self._current: ContextVar[_Frame | None] = ContextVar(
+            f"profiler_frame_{id(self)}", default=None
+        )
+        self._samples: dict[str, list[float]] = defaultdict(list)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        parent = self._current.get()
+        frame = _Frame(name)
+        token = self._current.set(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._current.reset(token)
+            self._samples[name].append(elapsed - frame.children)
+            if parent is not None:
+                parent.children += elapsed
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    def report(self) -> list[SpanStats]:
+        """
+        Aggregate collected samples.
+
+        Returns
+        -------
+        list[SpanStats]
+            Per-span statistics in microseconds, slowest total first.
+        """
+        stats = []
+        for name, samples in self._samples.items():
+            ordered = sorted(samples)
+            stats.append(SpanStats(
+                name=name,
+                count=len(ordered),
+                mean_us=statistics.fmean(ordered) * 1e6,
+                p50_us=ordered[len(ordered) // 2] * 1e6,
+                p95_us=ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e6,
+                total_ms=sum(ordered) * 1e3,
+            ))
+        return sorted(stats, key=lambda s: s.total_ms, reverse=True)
+
+    def format_report(self) -> str:
+        lines = [
+            f"{'span':<40} {'count':>7} {'mean us':>9} "
+            f"{'p50 us':>9} {'p95 us':>9} {'total ms':>10}"
+        ]
+        for s in self.report():
+            lines.append(
+                f"{s.name:<40} {s.count:>7} {s.mean_us:>9.1f} "
+                f"{s.p50_us:>9.1f} {s.p95_us:>9.1f} {s.total_ms:>10.1f}"
+            )
+        return "\n".join(lines)
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """
+    Times an aiogram middleware, or the rest of the chain when `inner` is None.
+    """
+
+    def __init__(
+        self,
+        profiler: UpdateProfiler,
+        name: str,
+        inner: Callable[..., Awaitable[Any]] | None = None,
+    ) -> None:
+        self._profiler = profiler
+        self._name = name
+        self._inner = inner
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        with self._profiler.span(self._name):
+            if self._inner is None:
+                return await handler(event, data)
+            return await self._inner(handler, event, data)
+
+
+def instrument_dispatcher(dispatcher: Dispatcher, profiler: UpdateProfiler) -> None:
+    """
+    Wrap every middleware registered on `dispatcher` and its sub-routers.
+
+    Must be called after all middlewares (including dishka's container
+    middleware) are registered. A root "dispatch" span is installed as the
+    outermost update middleware; its exclusive time is aiogram's own routing
+    and filter overhead.
+    """
+    for router in dispatcher.chain_tail:
+        for observer in router.observers.values():
+            for manager in (observer.outer_middleware, observer.middleware):
+                middlewares = list(manager)
+                for middleware in middlewares:
+                    manager.unregister(middleware)
+                if manager is dispatcher.update.outer_middleware:
+                    manager.register(ProfilingMiddleware(profiler, "dispatch"))
+                for middleware in middlewares:
+                    manager.register(
+                        ProfilingMiddleware(
+                            profiler,
+                            f"middleware:{observer.event_name}:"
+                            f"{type(middleware).__name__}",
+                            middleware,
+                        )
+                    )
+
+
+def profiled_inject(
+    profiler: UpdateProfiler,
+) -> Callable[[Callable[P, Awaitable[T]]], Callable[P, Awaitable[T]]]:
+    """
+    Build an `auto_inject` function for dishka's `setup_dishka`.
+
+    The handler body is timed as "handler" and everything dishka does
+    around it (resolving REQUEST-scoped providers) as "resolve".
+    """
+
+    def inject_func(func: Callable[P, Awaitable[T]]) -> Callable[P, Awaitable[T]]:
+        @functools.wraps(func)
+        async def body(*args: P.args, **kwargs: P.kwargs) -> T:
+            with profiler.span("handler"):
+                return await func(*args, **kwargs)
+
+        injected = inject(body)
+
+        @functools.wraps(injected)
+        async def resolved(*args: P.args, **kwargs: P.kwargs) -> T:
+            with profiler.span("resolve"):
+                return await injected(*args, **kwargs)
+
+        return resolved
+
+    return inject_func
@@ -39,6 +39,7 @@ class HomeEntity:
     name: str
     address: str | None
     created_at: datetime
+    version: int = 0
 
 
 @dataclass(frozen=True, slots=True)
@@ -48,6 +49,7 @@ class HomeUserRoleEntity:
     user_id: UUID
     role: HomeRole
     created_at: datetime
+    version: int = 0
 
 
 @dataclass(frozen=True, slots=True)
@@ -72,3 +74,35 @@ class SmartDeviceEntity:
     status: str | None
     last_error: str | None
     updated_at: datetime
+    version: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceTelemetryEntity:
+    device_id: UUID
+    recorded_at: datetime
+    battery_level: int | None
+    connectivity: str | None
+    status: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class OutboxMessageEntity:
+    id: UUID
+    exchange: str
+    routing_key: str
+    payload: dict[str, Any]
+    headers: dict[str, Any] | None
+    created_at: datetime
+
+
+@dataclass(frozen=True, slots=True)
+class CommandLogEntity:
+    request_id: UUID
+    telegram_id: int
+    chat_id: int | None
+    message_id: int
+    kind: str
+    text: str | None
+    status: str
+    created_at: datetime
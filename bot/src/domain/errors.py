@@ -16,4 +16,8 @@ class EntityUpdateError(DomainError):
 
 
 class EntityDeleteError(DomainError):
-    """Ошибка при удалении пользователя."""
\ No newline at end of file
+    """Ошибка при удалении пользователя."""
+
+
+class ConcurrentUpdateError(EntityUpdateError):
+    """Запись была изменена другим запросом после чтения."""
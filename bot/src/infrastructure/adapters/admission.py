@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from application.interfaces import AdmissionControllerProtocol
+from config import AdmissionConfig
+from faststream.rabbit import RabbitBroker, RabbitQueue
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionMetrics:
+    queue: str
+    depth: int
+    consumers: int
+    drain_rate: float | None
+    estimated_lag: float | None
+    max_depth: int
+    max_lag: float
+    shedding: bool
+    admitted_total: int
+    shed_total: int
+
+
+class QueueDepthAdmissionController(AdmissionControllerProtocol):
+    """
+    Admission control for voice commands based on the STT queue backlog.
+
+    A background task passively re-declares the queue every `poll_interval`
+    seconds to read its depth and consumer count. The drain rate is derived
+    from the depth change and the number of commands this bot admitted in
+    the same interval (smoothed with an EWMA), which gives the expected
+    wait of a newly published command: ``depth / drain_rate``. Only
+    intervals that had a backlog throughout and drained something are
+    sampled: an idle queue drains only what arrives, and a poll that falls
+    inside one slow recognition drains nothing, and neither says how fast
+    STT can work. Stalled consumers still show up as a growing depth.
+
+    Shedding starts when the depth or the estimated lag crosses its
+    threshold (or when the queue has no consumers at all) and stops once
+    both fall below `resume_ratio` of their thresholds, so the decision
+    does not flap around the limit. The `AdmissionMetrics` are logged on
+    every change of the decision and every `report_interval` seconds.
+
+    Parameters
+    ----------
+    broker : RabbitBroker
+        Broker used to inspect the queue.
+    config : AdmissionConfig
+        Queue name, thresholds, polling and report intervals.
+    """
+
+    def __init__(self, broker: RabbitBroker, config: AdmissionConfig) -> None:
+        self._broker = broker
+        self._config = config
+        self._depth = 0
+        self._consumers = 0
+        self._drain_rate: float | None = None
+        self._polled = False
+        self._shedding = False
+        self._admitted_total = 0
+        self._shed_total = 0
+        self._admitted_since_poll = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def fallback(self) -> str:
+        return self._config.fallback
+
+    def admit(self) -> bool:
+        """Decide whether a new voice command may be sent to STT."""
+        if self._shedding:
+            self._shed_total += 1
+            return False
+        self._admitted_total += 1
+        self._admitted_since_poll += 1
+        return True
+
+    def metrics(self) -> AdmissionMetrics:
+        return AdmissionMetrics(
+            queue=self._config.queue,
+            depth=self._depth,
+            consumers=self._consumers,
+            drain_rate=self._drain_rate,
+            estimated_lag=self._estimated_lag(),
+            max_depth=self._config.max_depth,
+            max_lag=self._config.max_lag,
+            shedding=self._shedding,
+            admitted_total=self._admitted_total,
+            shed_total=self._shed_total,
+        )
+
+    def _estimated_lag(self) -> float | None:
+        if self._depth == 0:
+            return 0.0
+        if self._drain_rate is None:
+            return None
+        if self._drain_rate <= 0:
+            return float("inf")
+        return self._depth / self._drain_rate
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        queue = None
+        polled_at = time.monotonic()
+        report_at = polled_at + self._config.report_interval
+        while True:
+            try:
+                if queue is None:
+                    queue = await self._broker.declare_queue(
+                        RabbitQueue(self._config.queue, declare=False)
+                    )
+                declared = await queue.declare()
+                now = time.monotonic()
+                self._observe(
+                    depth=declared.message_count or 0,
+                    consumers=declared.consumer_count or 0,
+                    elapsed=now - polled_at,
+                )
+                polled_at = now
+                if now >= report_at:
+                    logger.info("Voice admission: %s", self.metrics())
+                    report_at = now + self._config.report_interval
+            except Exception:
+                logger.exception("Failed to poll queue %s", self._config.queue)
+            await asyncio.sleep(self._config.poll_interval)
+
+    def _observe(self, depth: int, consumers: int, elapsed: float) -> None:
+        drained = self._depth + self._admitted_since_poll - depth
+        self._admitted_since_poll = 0
+        if self._polled and elapsed > 0 and drained > 0 and self._depth and depth:
+            rate = drained / elapsed
+            self._drain_rate = (
+                rate if self._drain_rate is None
+                else 0.3 * rate + 0.7 * self._drain_rate
+            )
+        self._polled = True
+        self._depth = depth
+        self._consumers = consumers
+
+        lag = self._estimated_lag() or 0.0
+        overloaded = (
+            depth > self._config.max_depth
+            or lag > self._config.max_lag
+            or (consumers == 0 and depth > 0)
+        )
+        recovered = (
+            depth <= self._config.max_depth * self._config.resume_ratio
+            and lag <= self._config.max_lag * self._config.resume_ratio
+            and (consumers > 0 or depth == 0)
+        )
+        if not self._shedding and overloaded:
+            self._shedding = True
+            logger.warning("Shedding voice commands: %s", self.metrics())
+        elif self._shedding and recovered:
+            self._shedding = False
+            logger.info("Voice commands admitted again: %s", self.metrics())
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Generic, Sequence, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class BufferedWriter(ABC, Generic[T]):
+    """
+    Bounded in-memory buffer of rows written to Postgres in batches.
+
+    `record` only appends to the buffer, so callers never wait for the
+    database. A background task writes up to `batch_size` rows per
+    transaction every `flush_interval` seconds, or as soon as a full batch
+    is waiting. When a write fails or is cancelled before its commit, the
+    rows are put back and retried after the next interval or by `stop`.
+    Once `max_buffer` rows are waiting, new ones are rejected and counted
+    in `dropped`. `stop` writes whatever is left.
+
+    Subclasses implement `_write` for one batch.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions used for the writes.
+    batch_size : int
+        Rows per transaction.
+    flush_interval : float
+        Longest time, in seconds, a row waits in the buffer.
+    max_buffer : int
+        Rows the buffer holds at most.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        *,
+        batch_size: int,
+        flush_interval: float,
+        max_buffer: int,
+    ) -> None:
+        self._session_maker = session_maker
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_buffer = max_buffer
+        self._buffer: deque[T] = deque()
+        self._full_batch = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.written = 0
+        self.dropped = 0
+
+    def record(self, row: T) -> bool:
+        if len(self._buffer) >= self._max_buffer:
+            self.dropped += 1
+            return False
+        self._buffer.append(row)
+        if len(self._buffer) >= self._batch_size:
+            self._full_batch.set()
+        return True
+
+    async def flush(self) -> None:
+        """Write everything buffered so far, one transaction per batch."""
+        while self._buffer:
+            count = min(len(self._buffer), self._batch_size)
+            batch = [self._buffer.popleft() for _ in range(count)]
+            committed = False
+            try:
+                async with self._session_maker() as session:
+                    await self._write(session, batch)
+                    await session.commit()
+                    committed = True
+            except BaseException:
+                # Closing the session can still fail after the commit.
+                if committed:
+                    self.written += count
+                else:
+                    self._buffer.extendleft(reversed(batch))
+                raise
+            self.written += count
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                "%s lost %d rows on shutdown", type(self).__name__, len(self._buffer)
+            )
+
+    @abstractmethod
+    async def _write(self, session: AsyncSession, batch: Sequence[T]) -> None:
+        """Write `batch` in the transaction of `session`."""
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._full_batch.wait(), self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full_batch.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("%s flush failed", type(self).__name__)
+                await asyncio.sleep(self._flush_interval)
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from application.interfaces import CommandLogWriterProtocol
+from config import CommandLogConfig
+from domain.entities import CommandLogEntity
+from infrastructure.adapters.buffered_writer import BufferedWriter
+from infrastructure.repositories.advisory_lock import try_advisory_lock
+from infrastructure.repositories.command_log import CommandLogRepositorySQL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "command_log_retention"
+
+
+class BufferedCommandLogWriter(
+    BufferedWriter[CommandLogEntity], CommandLogWriterProtocol
+):
+    """
+    Buffers command log entries and COPYs them to Postgres in batches.
+
+    Logging a command costs an append to a list, so the database stays out
+    of the command's latency path. Entries still buffered are written on
+    shutdown; entries arriving while the database has been unreachable
+    for long enough to fill the buffer are dropped and counted.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions used for the COPYs.
+    config : CommandLogConfig
+        Batch size, flush interval and buffer bound.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        config: CommandLogConfig,
+    ) -> None:
+        super().__init__(
+            session_maker,
+            batch_size=config.batch_size,
+            flush_interval=config.flush_interval,
+            max_buffer=config.max_buffer,
+        )
+
+    async def _write(
+        self, session: AsyncSession, batch: Sequence[CommandLogEntity]
+    ) -> None:
+        await CommandLogRepositorySQL(session).copy_many(batch)
+
+
+class CommandLogRetention:
+    """
+    Keeps the daily partitions of ``command_log`` in place.
+
+    At start and then every `maintenance_interval` seconds, the partitions
+    for the next `partitions_ahead` days are created and those older than
+    `retention_days` are dropped. Like `TelemetryMaintenance`, each step
+    is skipped while another replica holds the job's advisory lock.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions on the primary.
+    config : CommandLogConfig
+        Partition horizon, retention and interval.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        config: CommandLogConfig,
+    ) -> None:
+        self._session_maker = session_maker
+        self._config = config
+        self._task: asyncio.Task[None] | None = None
+
+    async def maintain_partitions(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        created: list[str] = []
+        dropped: list[str] = []
+        async with self._session_maker() as session:
+            if await try_advisory_lock(session, LOCK_NAME):
+                created = await CommandLogRepositorySQL(session).ensure_partitions(
+                    today, self._config.partitions_ahead + 1
+                )
+            await session.commit()
+        async with self._session_maker() as session:
+            if await try_advisory_lock(session, LOCK_NAME):
+                dropped = await CommandLogRepositorySQL(
+                    session
+                ).drop_partitions_before(
+                    today - timedelta(days=self._config.retention_days)
+                )
+            await session.commit()
+        if created or dropped:
+            logger.info(
+                "Command log partitions created %s, dropped %s", created, dropped
+            )
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.maintain_partitions()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._config.maintenance_interval)
+            try:
+                await self.maintain_partitions()
+            except Exception:
+                logger.exception("Command log retention failed")
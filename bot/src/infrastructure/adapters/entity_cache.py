@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Hashable
+
+import psycopg
+from config import EntityCacheConfig, PostgresConfig
+from psycopg.conninfo import make_conninfo
+
+logger = logging.getLogger(__name__)
+
+
+class EntityCache:
+    """
+    Bounded LRU of entities read from Postgres, shared by a process.
+
+    Entries are keyed by ``(table, id)`` and expire after `ttl` seconds.
+    A background task LISTENs on the channel fed by the
+    ``notify_entity_changed`` triggers (``table:id`` payloads sent on
+    UPDATE/DELETE commit) and drops the matching entry, so every replica
+    forgets a changed row within one notification round trip. The cache
+    only serves entries while that listener is connected; after a
+    reconnect it starts empty, since notifications may have been missed.
+
+    Lookups by other unique keys go through aliases ``(table, column,
+    value) -> id``; callers must check that the entity found through an
+    alias still has that value.
+
+    `epoch` increases with every invalidation. A reader takes it before
+    querying the database and passes it to `put`, which refuses to store
+    the row if anything was invalidated meanwhile: the row may predate
+    that change. When reads are served by replicas, a row read after the
+    invalidation may still predate the change too; `config.settle` (set
+    it to the replication lag budget) keeps an invalidated key uncached
+    for that long.
+
+    Parameters
+    ----------
+    psql_config : PostgresConfig
+        Database the listener connects to.
+    config : EntityCacheConfig
+        Size, TTL and notification channel.
+    """
+
+    def __init__(self, psql_config: PostgresConfig, config: EntityCacheConfig) -> None:
+        self._conninfo = make_conninfo(
+            host=psql_config.host,
+            port=psql_config.port,
+            user=psql_config.login,
+            password=psql_config.password,
+            dbname=psql_config.database,
+        )
+        self._config = config
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._settling: dict[Hashable, float] = {}
+        self._listening = False
+        self._task: asyncio.Task[None] | None = None
+        self.epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        if not self._listening:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, epoch: int) -> None:
+        if not self._listening or epoch != self.epoch:
+            return
+        now = time.monotonic()
+        if self._settling:
+            until = self._settling.get(key)
+            if until is not None:
+                if until > now:
+                    return
+                del self._settling[key]
+        self._entries[key] = (now + self._config.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._config.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, table: str, id: uuid.UUID) -> None:
+        self.epoch += 1
+        self._entries.pop((table, id), None)
+        if self._config.settle > 0:
+            now = time.monotonic()
+            if len(self._settling) >= self._config.max_size:
+                self._settling = {
+                    k: t for k, t in self._settling.items() if t > now
+                }
+            self._settling[(table, id)] = now + self._config.settle
+
+    def clear(self) -> None:
+        self.epoch += 1
+        self._entries.clear()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._listening = False
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self._conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f'LISTEN "{self._config.channel}"')
+                    self.clear()
+                    self._listening = True
+                    async for notify in conn.notifies():
+                        table, _, id = notify.payload.partition(":")
+                        self.invalidate(table, uuid.UUID(id))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Entity cache listener failed")
+            self._listening = False
+            self.clear()
+            await asyncio.sleep(1.0)
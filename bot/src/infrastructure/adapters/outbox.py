@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+
+import psycopg
+from config import OutboxConfig, PostgresConfig
+from domain.entities import OutboxMessageEntity
+from faststream.rabbit import RabbitBroker
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from psycopg.conninfo import make_conninfo
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Publishes committed outbox messages to RabbitMQ.
+
+    Each round claims up to `batch_size` of the oldest messages with
+    ``FOR UPDATE SKIP LOCKED`` (so several bot replicas can relay side by
+    side), publishes them all at once and waits for the broker's publisher
+    confirms, then deletes the confirmed ones in the same transaction.
+    Rounds repeat while full batches come back. Between them the relay
+    sleeps until the outbox trigger NOTIFYs on `channel` or, should a
+    notification be missed, `poll_interval` seconds pass.
+
+    Delivery is at least once: a crash between the confirms and the commit
+    publishes the batch again, and a message whose publish failed is
+    retried in a later round, behind newer ones. Consumers deduplicate by
+    the AMQP ``message_id``, which is the outbox id.
+
+    `published` counts confirmed messages and `lag` is the age of the
+    oldest message of the last batch when it was confirmed.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions on the primary.
+    broker : RabbitBroker
+        Started broker to publish through.
+    psql_config : PostgresConfig
+        Database the listener connects to.
+    config : OutboxConfig
+        Batch size, poll interval and notification channel.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        broker: RabbitBroker,
+        psql_config: PostgresConfig,
+        config: OutboxConfig,
+    ) -> None:
+        self._session_maker = session_maker
+        self._broker = broker
+        self._conninfo = make_conninfo(
+            host=psql_config.host,
+            port=psql_config.port,
+            user=psql_config.login,
+            password=psql_config.password,
+            dbname=psql_config.database,
+        )
+        self._config = config
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+        self.published = 0
+        self.failed = 0
+        self.lag = 0.0
+
+    async def relay_batch(self) -> int:
+        """Publish one batch; return how many messages were claimed."""
+        async with self._session_maker() as session:
+            repo = OutboxRepositorySQL(session)
+            messages = await repo.claim(self._config.batch_size)
+            if not messages:
+                return 0
+            results = await asyncio.gather(
+                *(self._publish(message) for message in messages),
+                return_exceptions=True,
+            )
+            confirmed = [
+                message.id
+                for message, result in zip(messages, results)
+                if not isinstance(result, BaseException)
+            ]
+            await repo.delete_many(confirmed)
+            await session.commit()
+        now = datetime.now(timezone.utc)
+        self.lag = (now - min(m.created_at for m in messages)).total_seconds()
+        self.published += len(confirmed)
+        if len(confirmed) < len(messages):
+            self.failed += len(messages) - len(confirmed)
+            error = next(r for r in results if isinstance(r, BaseException))
+            raise RuntimeError(
+                f"{len(messages) - len(confirmed)} outbox messages not confirmed"
+            ) from error
+        return len(messages)
+
+    async def start(self) -> None:
+        if not self._tasks:
+            self._tasks.append(asyncio.create_task(self._run()))
+            if self._config.listen:
+                self._tasks.append(asyncio.create_task(self._listen()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _publish(self, message: OutboxMessageEntity) -> None:
+        await self._broker.publish(
+            message.payload,
+            exchange=message.exchange or None,
+            routing_key=message.routing_key,
+            headers=message.headers,
+            message_id=str(message.id),
+            timestamp=message.created_at,
+            persist=True,
+            timeout=self._config.publish_timeout,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            # Cleared before draining: a commit notified meanwhile gets
+            # another round instead of waiting for the next poll.
+            self._wake.clear()
+            try:
+                while await self.relay_batch() == self._config.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay failed")
+                await asyncio.sleep(self._config.poll_interval)
+                continue
+            try:
+                await asyncio.wait_for(
+                    self._wake.wait(), self._config.poll_interval
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self._conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f'LISTEN "{self._config.channel}"')
+                    # Messages committed while not listening.
+                    self._wake.set()
+                    async for _ in conn.notifies():
+                        self._wake.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox listener failed")
+            await asyncio.sleep(1.0)
@@ -0,0 +1,252 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+from application.interfaces import (
+    PermissionCacheProtocol,
+    PermissionRepositoryProtocol,
+    SessionProtocol,
+)
+from config import PermissionConfig
+from domain.entities import HomeRole
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "perm:invalidate"
+# Incremented by every invalidation, before it drops any key.
+VERSION_KEY = "perm:version"
+# Above this many devices a local invalidation drops the whole local cache
+# instead of scanning every cached user.
+LOCAL_SCAN_LIMIT = 100
+
+
+def _user_key(telegram_id: int) -> str:
+    return f"perm:user:{telegram_id}"
+
+
+def _device_key(device_id: uuid.UUID | str) -> str:
+    return f"perm:device:{device_id}"
+
+
+@dataclass(slots=True)
+class _UserPermissions:
+    expires_at: float
+    roles: dict[uuid.UUID, HomeRole | None] = field(default_factory=dict)
+
+
+class CachedPermissionResolver(PermissionCacheProtocol):
+    """
+    Per-user permission cache in front of `PermissionRepositoryProtocol`.
+
+    Answers "which role does Telegram user X have on device D" from, in
+    order: an in-process map, a Redis hash ``perm:user:{telegram_id}``
+    (device id -> role, empty for "no access") and finally the single
+    indexed query of the repository, whose answer is written back to both.
+    A reverse set ``perm:device:{device_id}`` records which users cached a
+    device, so a device write only touches the users that know about it.
+
+    `invalidate` is called by the UnitOfWork after a commit that wrote
+    roles or devices. It drops the Redis entries and publishes the change
+    on ``perm:invalidate`` so that every replica drops its in-process
+    entries too. Redis entries expire after `ttl` and in-process ones after
+    `local_ttl`, which bounds the damage of a lost invalidation message.
+    If Redis is unavailable the resolver falls back to the database.
+
+    A role read from the database just before an invalidation must not be
+    cached after it. Every invalidation increments ``perm:version`` first;
+    the write-back to Redis watches that key and is dropped if it changed
+    since the lookup began. In-process entries are guarded the same way by
+    `epoch`, which increases whenever local entries are dropped.
+
+    Guests may only run `guest_commands`; owners and admins may run any
+    command on the devices of their home.
+
+    Parameters
+    ----------
+    client : Redis
+        Long-lived Redis client.
+    repository : Callable[[SessionProtocol], PermissionRepositoryProtocol]
+        Factory of the repository used on cache misses.
+    config : PermissionConfig
+        TTLs, local cache size and the guest command list.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        repository: Callable[[SessionProtocol], PermissionRepositoryProtocol],
+        config: PermissionConfig,
+    ) -> None:
+        self._client = client
+        self._repository = repository
+        self._config = config
+        self._guest_commands = frozenset(
+            c.strip() for c in config.guest_commands.split(",") if c.strip()
+        )
+        self._local: dict[int, _UserPermissions] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.epoch = 0
+
+    async def can_run(
+        self,
+        session: SessionProtocol,
+        telegram_id: int,
+        device_id: uuid.UUID,
+        command: str,
+    ) -> bool:
+        role = await self.role_on_device(session, telegram_id, device_id)
+        if role is None:
+            return False
+        return role is not HomeRole.GUEST or command in self._guest_commands
+
+    async def role_on_device(
+        self, session: SessionProtocol, telegram_id: int, device_id: uuid.UUID
+    ) -> HomeRole | None:
+        now = time.monotonic()
+        entry = self._local.get(telegram_id)
+        if entry is not None and entry.expires_at > now and device_id in entry.roles:
+            return entry.roles[device_id]
+        epoch = self.epoch
+        role, current = await self._load(session, telegram_id, device_id)
+        if not current or epoch != self.epoch:
+            return role
+        entry = self._local.get(telegram_id)
+        if entry is None or entry.expires_at <= now:
+            if len(self._local) >= self._config.max_local_users:
+                self._prune(now)
+            entry = _UserPermissions(expires_at=now + self._config.local_ttl)
+            self._local[telegram_id] = entry
+        entry.roles[device_id] = role
+        return role
+
+    async def _load(
+        self, session: SessionProtocol, telegram_id: int, device_id: uuid.UUID
+    ) -> tuple[HomeRole | None, bool]:
+        """Return the role and whether it may be cached locally."""
+        user_key = _user_key(telegram_id)
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.hget(user_key, str(device_id))
+                pipe.get(VERSION_KEY)
+                cached, version = await pipe.execute()
+        except Exception:
+            logger.exception("Permission cache unavailable, reading %s", user_key)
+            return await self._query(session, telegram_id, device_id), True
+        if cached is not None:
+            if isinstance(cached, bytes):
+                cached = cached.decode()
+            return (HomeRole(cached) if cached else None), True
+
+        role = await self._query(session, telegram_id, device_id)
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                await pipe.watch(VERSION_KEY)
+                if await pipe.get(VERSION_KEY) != version:
+                    return role, False
+                pipe.multi()
+                pipe.hset(user_key, str(device_id), "" if role is None else role.value)
+                pipe.expire(user_key, self._config.ttl)
+                pipe.sadd(_device_key(device_id), telegram_id)
+                pipe.expire(_device_key(device_id), self._config.ttl)
+                await pipe.execute()
+        except WatchError:
+            return role, False
+        except Exception:
+            logger.exception("Failed to cache permissions of %s", user_key)
+        return role, True
+
+    async def _query(
+        self, session: SessionProtocol, telegram_id: int, device_id: uuid.UUID
+    ) -> HomeRole | None:
+        return await self._repository(session).role_on_device(telegram_id, device_id)
+
+    async def invalidate(
+        self, *, users: Sequence[int] = (), devices: Sequence[uuid.UUID] = ()
+    ) -> None:
+        """Drop cached permissions of users and devices on all replicas."""
+        if not users and not devices:
+            return
+        self._drop_local(users, [str(d) for d in devices])
+        try:
+            # Bumped before the members are read, so a write-back that
+            # adds a member after this point is refused.
+            async with self._client.pipeline(transaction=False) as pipe:
+                pipe.incr(VERSION_KEY)
+                for device_id in devices:
+                    pipe.smembers(_device_key(device_id))
+                _, *members = await pipe.execute()
+            async with self._client.pipeline(transaction=False) as pipe:
+                for device_id, device_members in zip(devices, members):
+                    for member in device_members:
+                        pipe.hdel(_user_key(int(member)), str(device_id))
+                    pipe.delete(_device_key(device_id))
+                for telegram_id in users:
+                    pipe.delete(_user_key(telegram_id))
+                pipe.publish(
+                    INVALIDATE_CHANNEL,
+                    json.dumps({
+                        "users": list(users),
+                        "devices": [str(d) for d in devices],
+                    }),
+                )
+                await pipe.execute()
+        except Exception:
+            logger.exception("Failed to invalidate cached permissions")
+
+    def _drop_local(self, users: Sequence[int], devices: Sequence[str]) -> None:
+        self.epoch += 1
+        for telegram_id in users:
+            self._local.pop(telegram_id, None)
+        if len(devices) > LOCAL_SCAN_LIMIT:
+            self._local.clear()
+        elif devices:
+            ids = [uuid.UUID(d) for d in devices]
+            for entry in self._local.values():
+                for device_id in ids:
+                    entry.roles.pop(device_id, None)
+
+    def _clear_local(self) -> None:
+        self.epoch += 1
+        self._local.clear()
+
+    def _prune(self, now: float) -> None:
+        self._local = {k: v for k, v in self._local.items() if v.expires_at > now}
+        # Still full: drop the oldest half (dicts keep insertion order).
+        if len(self._local) >= self._config.max_local_users:
+            keep = list(self._local.items())[len(self._local) // 2:]
+            self._local = dict(keep)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with self._client.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATE_CHANNEL)
+                    # Anything missed while unsubscribed is stale now.
+                    self._clear_local()
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        payload = json.loads(message["data"])
+                        self._drop_local(payload["users"], payload["devices"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Permission invalidation listener failed")
+                self._clear_local()
+                await asyncio.sleep(1.0)
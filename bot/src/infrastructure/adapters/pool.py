@@ -0,0 +1,136 @@
+import bisect
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+from sqlalchemy.util import queue as sqla_queue
+
+# Upper bounds of the checkout wait histogram buckets, in seconds; the last
+# bucket takes everything above.
+WAIT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+    2.5, 5.0, 10.0,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PoolStats:
+    engine: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    peak_checked_out: int
+    checkouts: int
+    timeouts: int
+    wait_p50: float
+    wait_p95: float
+    wait_p99: float
+    wait_histogram: tuple[int, ...]
+
+
+def wait_quantile(histogram: tuple[int, ...] | list[int], q: float) -> float:
+    """
+    Upper bound of the bucket holding the `q` quantile of a wait histogram.
+
+    Waits beyond the last bound are reported as infinity; an empty
+    histogram as zero.
+    """
+    total = sum(histogram)
+    if total == 0:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for bound, count in zip(WAIT_BUCKETS, histogram):
+        seen += count
+        if seen >= rank:
+            return bound
+    return float("inf")
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long checkouts wait and can be resized.
+
+    Every `connect` is timed, including the time spent opening a new
+    connection, into a histogram with `WAIT_BUCKETS` bounds; checkouts
+    that give up after the pool timeout are counted separately. The
+    highest number of connections checked out at once is tracked until
+    `reset_peak`.
+
+    `resize` changes the number of connections kept in the pool at run
+    time; the overflow limit on top of it stays the same.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS) + 1)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.peak_checked_out = 0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            conn = super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.wait_histogram[bisect.bisect_left(WAIT_BUCKETS, waited)] += 1
+        self.checkouts += 1
+        self.peak_checked_out = max(self.peak_checked_out, self.checkedout())
+        return conn
+
+    def recreate(self) -> "InstrumentedPool":
+        pool: InstrumentedPool = super().recreate()  # type: ignore[assignment]
+        pool.wait_histogram = self.wait_histogram
+        pool.checkouts = self.checkouts
+        pool.timeouts = self.timeouts
+        return pool
+
+    def reset_peak(self) -> None:
+        self.peak_checked_out = self.checkedout()
+
+    def resize(self, size: int) -> None:
+        # QueuePool counts connections as `_overflow + pool size`, so the
+        # overflow counter moves opposite to the size to keep that count.
+        # The asyncio queue behind the pool is created on first use and
+        # keeps its own copy of the bound.
+        with self._overflow_lock:
+            self._overflow -= size - self._pool.maxsize
+            self._pool.maxsize = size
+            queue = self._pool.__dict__.get("_queue")
+            if queue is not None:
+                queue._maxsize = size
+        # Idle connections above a smaller size would still be handed out
+        # without counting against the limit, so they are closed now;
+        # checked-out ones are closed when returned to the full queue.
+        while self._pool.qsize() > size:
+            try:
+                record = self._pool.get_nowait()
+            except sqla_queue.Empty:
+                break
+            try:
+                record.close()
+            finally:
+                self._dec_overflow()
+
+    def stats(self, engine: str) -> PoolStats:
+        histogram = tuple(self.wait_histogram)
+        return PoolStats(
+            engine=engine,
+            size=self.size(),
+            checked_in=self.checkedin(),
+            checked_out=self.checkedout(),
+            overflow=self.overflow(),
+            peak_checked_out=self.peak_checked_out,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            wait_p50=wait_quantile(histogram, 0.5),
+            wait_p95=wait_quantile(histogram, 0.95),
+            wait_p99=wait_quantile(histogram, 0.99),
+            wait_histogram=histogram,
+        )
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+
+from config import PoolMonitorConfig
+from infrastructure.adapters.pool import InstrumentedPool, wait_quantile
+from infrastructure.adapters.postgres import session_engines
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMonitor:
+    """
+    Periodic connection pool report and optional adaptive pool sizing.
+
+    Every `report_interval` seconds the `PoolStats` of each engine (gauges,
+    checkout counts, timeouts and wait percentiles since start) are logged.
+
+    With `adaptive` enabled, every `adjust_interval` seconds each pool is
+    resized by `step` within ``[min_size, max_size]`` from the checkouts of
+    the last interval: it grows when their p95 wait exceeded `target_wait`
+    or a checkout timed out, and shrinks when waits stayed within target
+    while the peak number of checked-out connections left at least `step`
+    connections unused. Growing only raises how many idle connections the
+    pool keeps; the overflow limit on top of that is unchanged, so
+    `max_size` plus ``DB_MAX_OVERFLOW`` (times the number of bot replicas)
+    must fit the server's ``max_connections``.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Session maker whose engines are monitored.
+    config : PoolMonitorConfig
+        Report interval and the adaptive policy.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        config: PoolMonitorConfig,
+    ) -> None:
+        self._engines = session_engines(session_maker)
+        self._config = config
+        self._seen: dict[str, tuple[list[int], int]] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def adjust(self) -> None:
+        config = self._config
+        for name, engine in self._engines.items():
+            pool: InstrumentedPool = engine.pool  # type: ignore[assignment]
+            histogram = list(pool.wait_histogram)
+            seen, seen_timeouts = self._seen.get(name, ([0] * len(histogram), 0))
+            self._seen[name] = (histogram, pool.timeouts)
+            waits = [now - before for now, before in zip(histogram, seen)]
+            timed_out = pool.timeouts > seen_timeouts
+            p95 = wait_quantile(waits, 0.95)
+            size = pool.size()
+            if (timed_out or p95 > config.target_wait) and size < config.max_size:
+                new_size = min(config.max_size, size + config.step)
+            elif (
+                p95 <= config.target_wait
+                and pool.peak_checked_out + config.step <= size
+                and size > config.min_size
+            ):
+                new_size = max(config.min_size, size - config.step)
+            else:
+                new_size = size
+            pool.reset_peak()
+            if new_size != size:
+                pool.resize(new_size)
+                logger.info(
+                    "Resized %s pool %d -> %d (p95 wait %.4fs, timeouts: %s)",
+                    name, size, new_size, p95, timed_out,
+                )
+
+    def report(self) -> None:
+        for name, engine in self._engines.items():
+            logger.info(
+                "Connection pool: %s",
+                engine.pool.stats(name),  # type: ignore[attr-defined]
+            )
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        config = self._config
+        interval = (
+            min(config.adjust_interval, config.report_interval)
+            if config.adaptive
+            else config.report_interval
+        )
+        report_at = time.monotonic() + config.report_interval
+        adjust_at = time.monotonic() + config.adjust_interval
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            try:
+                if config.adaptive and now >= adjust_at:
+                    self.adjust()
+                    adjust_at = now + config.adjust_interval
+                if now >= report_at:
+                    self.report()
+                    report_at = now + config.report_interval
+            except Exception:
+                logger.exception("Pool monitor failed")
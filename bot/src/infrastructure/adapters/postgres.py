@@ -1,26 +1,393 @@
+import itertools
+import time
+from contextlib import AbstractAsyncContextManager
+from typing import Any, Literal
+
+import psycopg
 from config import PostgresConfig
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from domain.errors import DomainError, EntityAlreadyExistsError
+from infrastructure.adapters.pool import InstrumentedPool, PoolStats
+from sqlalchemy import Executable, Result
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncResult,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session
 
+Routing = Literal["primary", "replica"] | None
 
-def new_session_maker(psql_config: PostgresConfig) -> async_sessionmaker[AsyncSession]:
+
+def _new_engine(psql_config: PostgresConfig, host: str, port: int) -> AsyncEngine:
     raw_url = "postgresql+psycopg://{login}:{password}@{host}:{port}/{database}"
     database_uri = raw_url.format(
         login=psql_config.login,
         password=psql_config.password,
-        host=psql_config.host,
-        port=psql_config.port,
+        host=host,
+        port=port,
         database=psql_config.database,
     )
-    engine = create_async_engine(
+    # Server-side limits, set at connect time so they cost no round trip:
+    # a runaway query or a transaction left open by a stuck handler cannot
+    # hold a pooled connection (and its locks) for longer than this.
+    options = " ".join(
+        f"-c {name}={int(seconds * 1000)}"
+        for name, seconds in (
+            ("statement_timeout", psql_config.statement_timeout),
+            (
+                "idle_in_transaction_session_timeout",
+                psql_config.idle_in_transaction_timeout,
+            ),
+        )
+    )
+    return create_async_engine(
         database_uri,
-        pool_size=15,
-        max_overflow=15,
-        connect_args={"connect_timeout": 5},
+        poolclass=InstrumentedPool,
+        pool_size=psql_config.pool_size,
+        max_overflow=psql_config.max_overflow,
+        pool_timeout=psql_config.pool_timeout,
+        connect_args={"connect_timeout": 5, "options": options},
     )
+
+
+class ReplicaRouter:
+    """
+    Primary and replica engines of a routing session maker.
+
+    Replicas are handed out round-robin. After a commit that used the
+    primary, every read goes to the primary for `read_your_writes`
+    seconds, so the process sees its own writes even though the replicas
+    lag behind. The window is per process: keep it close to the replication
+    lag, or a steady stream of writes keeps all reads on the primary.
+
+    Parameters
+    ----------
+    primary : AsyncEngine
+        Engine of the primary, used for writes and locked reads.
+    replicas : dict[str, AsyncEngine]
+        Replica engines by name.
+    read_your_writes : float
+        Seconds after a commit during which reads stay on the primary.
+    """
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: dict[str, AsyncEngine],
+        read_your_writes: float,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self._next_replica = itertools.cycle(list(replicas.values()))
+        self._read_your_writes = read_your_writes
+        self._primary_until = 0.0
+
+    @property
+    def engines(self) -> dict[str, AsyncEngine]:
+        return {"primary": self.primary, **self.replicas}
+
+    def replica(self) -> AsyncEngine | None:
+        if time.monotonic() < self._primary_until:
+            return None
+        return next(self._next_replica)
+
+    def written(self) -> None:
+        self._primary_until = time.monotonic() + self._read_your_writes
+
+
+class RoutingSession(Session):
+    """
+    Session that picks the engine of every statement.
+
+    Statements go to a replica when the session is routed to replicas
+    (``info["routing"] == "replica"``, set for read-only units of work) or
+    when they are marked with the ``replica`` execution option (repository
+    reads without a lock), unless the router is inside its read-your-writes
+    window. Everything else goes to the primary, and once a transaction has
+    used the primary all its later reads follow it, so it sees its own
+    uncommitted writes.
+    """
+
+    def get_bind(  # type: ignore[override]
+        self, mapper: Any = None, clause: Any = None, **kwargs: Any
+    ) -> Engine:
+        router: ReplicaRouter = self.info["router"]
+        routing = self.info.get("routing")
+        if routing != "primary" and not self.info.get("on_primary"):
+            if routing == "replica" or (
+                clause is not None
+                and clause.get_execution_options().get("replica", False)
+            ):
+                replica = router.replica()
+                if replica is not None:
+                    return replica.sync_engine
+        self.info["on_primary"] = True
+        return router.primary.sync_engine
+
+    def commit(self) -> None:
+        super().commit()
+        if self.info.pop("on_primary", False):
+            self.info["router"].written()
+
+    def rollback(self) -> None:
+        super().rollback()
+        self.info.pop("on_primary", None)
+
+
+def new_session_maker(psql_config: PostgresConfig) -> async_sessionmaker[AsyncSession]:
+    """
+    Build the session maker of the bot.
+
+    Without ``DB_REPLICA_HOSTS`` all sessions are bound to the primary.
+    With replicas, sessions are `RoutingSession` instances that share a
+    `ReplicaRouter`; the replicas use the credentials and database of the
+    primary.
+    """
+    primary = _new_engine(psql_config, psql_config.host, psql_config.port)
+    options: dict[str, Any] = {
+        "class_": AsyncSession,
+        "autoflush": False,
+        "autocommit": False,
+        "expire_on_commit": False,
+    }
+    hosts = [h.strip() for h in psql_config.replica_hosts.split(",") if h.strip()]
+    if not hosts:
+        return async_sessionmaker(bind=primary, **options)
+    replicas = {}
+    for host in hosts:
+        name, _, port = host.partition(":")
+        replicas[host] = _new_engine(
+            psql_config, name, int(port) if port else psql_config.port
+        )
+    router = ReplicaRouter(primary, replicas, psql_config.read_your_writes)
     return async_sessionmaker(
-        bind=engine,
-        class_=AsyncSession,
-        autoflush=False,
-        autocommit=False,
-        expire_on_commit=False,
-    )
\ No newline at end of file
+        sync_session_class=RoutingSession, info={"router": router}, **options
+    )
+
+
+def session_engines(
+    session_maker: async_sessionmaker[AsyncSession],
+) -> dict[str, AsyncEngine]:
+    router = session_maker.kw.get("info", {}).get("router")
+    if router is not None:
+        return router.engines
+    return {"primary": session_maker.kw["bind"]}
+
+
+async def dispose_engines(session_maker: async_sessionmaker[AsyncSession]) -> None:
+    for engine in session_engines(session_maker).values():
+        await engine.dispose()
+
+
+def pool_stats(session_maker: async_sessionmaker[AsyncSession]) -> list[PoolStats]:
+    """Connection pool usage and checkout waits of every engine."""
+    return [
+        engine.pool.stats(name)  # type: ignore[attr-defined]
+        for name, engine in session_engines(session_maker).items()
+    ]
+
+
+class LazySession:
+    """
+    Session proxy that defers opening an `AsyncSession` until the first
+    statement is executed.
+
+    Handlers that resolve a UnitOfWork but never query Postgres (text and
+    voice commands) therefore never check out a pool connection. `begin`
+    on an unopened proxy is a no-op: the real session autobegins on the
+    first `execute`, and `commit`/`rollback` of an unopened proxy have
+    nothing to finish.
+
+    `routing` is handed to a `RoutingSession` (see `new_session_maker`):
+    ``"replica"`` sends every statement to a replica, ``"primary"`` keeps
+    unlocked reads on the primary too. Without replicas it has no effect.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Factory used to open the underlying session on first use.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        self._session_maker = session_maker
+        self._session: AsyncSession | None = None
+        self._routing: Routing = None
+
+    @property
+    def opened(self) -> bool:
+        """Whether the underlying `AsyncSession` has been created."""
+        return self._session is not None
+
+    @property
+    def routing(self) -> Routing:
+        return self._routing
+
+    @routing.setter
+    def routing(self, routing: Routing) -> None:
+        self._routing = routing
+        if self._session is not None:
+            self._session.info["routing"] = routing
+
+    def _get(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._session_maker()
+            self._session.info["routing"] = self._routing
+        return self._session
+
+    async def execute(
+        self,
+        statement: Executable,
+        params: Any = None,
+        **kwargs: Any,
+    ) -> Result[Any]:
+        return await self._get().execute(statement, params, **kwargs)
+
+    async def stream(
+        self,
+        statement: Executable,
+        params: Any = None,
+        **kwargs: Any,
+    ) -> AsyncResult[Any]:
+        return await self._get().stream(statement, params, **kwargs)
+
+    async def connection(self) -> AsyncConnection:
+        return await self._get().connection()
+
+    async def begin(self) -> None:
+        if self._session is not None and not self._session.in_transaction():
+            await self._session.begin()
+
+    async def commit(self) -> None:
+        if self._session is not None:
+            await self._session.commit()
+
+    async def flush(self) -> None:
+        if self._session is not None:
+            await self._session.flush()
+
+    async def rollback(self) -> None:
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class PipelinedSession(LazySession):
+    """
+    `LazySession` that batches writes with psycopg pipeline mode.
+
+    Statements marked with the ``pipeline`` execution option (inserts whose
+    result the repository never reads) are queued on the connection instead
+    of waiting for the server, together with the implicit ``BEGIN``. Any
+    other statement, `stream`, `connection` and `flush` first sync the
+    pipeline: the queued statements complete in one round trip and then the
+    statement runs normally, since its result is needed right away. `commit`
+    queues ``COMMIT`` behind the pending statements, so an insert-only unit
+    of work costs a single round trip.
+
+    Errors of queued statements surface at the next sync instead of at the
+    repository call and are mapped to EntityAlreadyExistsError (unique
+    violations) or DomainError; a failed `commit` rolls the transaction
+    back.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Factory used to open the underlying session on first use.
+    """
+
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]) -> None:
+        super().__init__(session_maker)
+        self._pipeline: AbstractAsyncContextManager[Any] | None = None
+
+    async def _driver_connection(self) -> psycopg.AsyncConnection[Any]:
+        conn = await self._get().connection()
+        raw = await conn.get_raw_connection()
+        return raw.driver_connection  # type: ignore[return-value]
+
+    async def _enter(self) -> None:
+        if self._pipeline is None:
+            pipeline = (await self._driver_connection()).pipeline()
+            await pipeline.__aenter__()
+            self._pipeline = pipeline
+
+    async def _sync(self) -> None:
+        if self._pipeline is None:
+            return
+        pipeline, self._pipeline = self._pipeline, None
+        try:
+            await pipeline.__aexit__(None, None, None)
+        except (psycopg.Error, SQLAlchemyError) as e:
+            cause = e.orig if isinstance(e, DBAPIError) else e
+            if isinstance(cause, psycopg.errors.UniqueViolation):
+                raise EntityAlreadyExistsError(
+                    "Pipelined statement violates a unique constraint"
+                ) from e
+            raise DomainError("Database error in pipelined statement") from e
+
+    async def execute(
+        self,
+        statement: Executable,
+        params: Any = None,
+        **kwargs: Any,
+    ) -> Result[Any]:
+        if statement.get_execution_options().get("pipeline"):
+            await self._enter()
+        else:
+            await self._sync()
+        return await super().execute(statement, params, **kwargs)
+
+    async def stream(
+        self,
+        statement: Executable,
+        params: Any = None,
+        **kwargs: Any,
+    ) -> AsyncResult[Any]:
+        await self._sync()
+        return await super().stream(statement, params, **kwargs)
+
+    async def connection(self) -> AsyncConnection:
+        await self._sync()
+        return await super().connection()
+
+    async def commit(self) -> None:
+        if self._pipeline is not None:
+            # psycopg's own commit() would queue COMMIT and sync, and leaving
+            # the pipeline would then sync a second time. Queued as a
+            # statement on the session's connection, COMMIT completes with
+            # the pending statements in one sync, and the session's commit
+            # below only ends its own transaction state.
+            conn = await self._get().connection()
+            await conn.exec_driver_sql("COMMIT")
+            try:
+                await self._sync()
+            except DomainError:
+                await super().rollback()
+                raise
+        await super().commit()
+
+    async def flush(self) -> None:
+        await self._sync()
+        await super().flush()
+
+    async def rollback(self) -> None:
+        try:
+            await self._sync()
+        except DomainError:
+            pass  # The transaction is being discarded anyway.
+        await super().rollback()
+
+    async def close(self) -> None:
+        try:
+            await self._sync()
+        except DomainError:
+            pass
+        await super().close()
@@ -0,0 +1,139 @@
+import logging
+import time
+from dataclasses import dataclass
+
+from application.dto import ThrottleDecision
+from application.interfaces import RateLimiterProtocol
+from config import ThrottleConfig
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Refills the bucket from the Redis clock, puts back the ARGV[5] tokens of
+# an expired lease and grants up to ARGV[3] tokens if at least ARGV[4] are
+# available. Returns {granted, retry_after_seconds}
+# as strings because Lua numbers are truncated to integers on the way out.
+TOKEN_BUCKET_LUA = """
+local key = KEYS[1]
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local minimum = tonumber(ARGV[4])
+local returned = tonumber(ARGV[5])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate + returned)
+local granted = 0
+local retry_after = 0
+if tokens >= minimum then
+    granted = math.min(tokens, requested)
+    tokens = tokens - granted
+else
+    retry_after = (minimum - tokens) / rate
+end
+redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', key, math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {tostring(granted), tostring(retry_after)}
+"""
+
+
+@dataclass(slots=True)
+class _Lease:
+    tokens: float
+    expires_at: float
+
+
+class RedisTokenBucketLimiter(RateLimiterProtocol):
+    """
+    Token buckets shared between bot replicas through Redis.
+
+    Each bucket is a Redis hash updated atomically by a Lua script. To keep
+    Redis out of the hot path, a replica leases up to `lease_size` tokens
+    per round trip and spends them locally until the lease runs out or
+    expires; a denial is cached locally until the bucket is expected to
+    have refilled enough. Leased tokens are already subtracted in Redis, so
+    leasing never admits more than the shared budget, it only lets a
+    replica spend its share without asking again. Tokens left in an expired
+    lease are put back in the bucket by the next request for its key.
+
+    A request never costs more than the bucket's `capacity`, so a long
+    voice message empties the bucket instead of waiting forever for more
+    tokens than it can hold.
+
+    If Redis is unavailable the limiter fails open.
+
+    Parameters
+    ----------
+    client : Redis
+        Long-lived Redis client.
+    config : ThrottleConfig
+        Bucket rate, capacity and lease parameters.
+    """
+
+    def __init__(self, client: Redis, config: ThrottleConfig) -> None:
+        self._client = client
+        self._config = config
+        self._script = client.register_script(TOKEN_BUCKET_LUA)
+        self._leases: dict[str, _Lease] = {}
+        self._blocked_until: dict[str, float] = {}
+
+    async def acquire(self, key: str, cost: float = 1.0) -> ThrottleDecision:
+        now = time.monotonic()
+        cost = min(cost, self._config.capacity)
+        blocked_until = self._blocked_until.get(key)
+        if blocked_until is not None:
+            if blocked_until > now:
+                return ThrottleDecision(False, blocked_until - now, cached=True)
+            del self._blocked_until[key]
+
+        lease = self._leases.get(key)
+        remaining = returned = 0.0
+        if lease is not None and lease.expires_at > now:
+            remaining = lease.tokens
+            if remaining >= cost:
+                lease.tokens -= cost
+                return ThrottleDecision(True, 0.0, cached=True)
+        elif lease is not None:
+            # Taken out before the await so the tokens go back only once.
+            returned = self._leases.pop(key).tokens
+
+        minimum = cost - remaining
+        try:
+            granted_raw, retry_raw = await self._script(
+                keys=[f"throttle:{key}"],
+                args=[
+                    self._config.rate,
+                    self._config.capacity,
+                    max(minimum, self._config.lease_size),
+                    minimum,
+                    returned,
+                ],
+            )
+        except Exception:
+            logger.exception("Rate limiter unavailable, admitting %s", key)
+            return ThrottleDecision(True, 0.0, cached=False)
+
+        self._prune(now)
+        granted = float(granted_raw)
+        if granted < minimum:
+            retry_after = float(retry_raw)
+            self._blocked_until[key] = now + retry_after
+            return ThrottleDecision(False, retry_after, cached=False)
+        self._leases[key] = _Lease(
+            tokens=remaining + granted - cost,
+            expires_at=now + self._config.lease_ttl,
+        )
+        return ThrottleDecision(True, 0.0, cached=False)
+
+    def _prune(self, now: float) -> None:
+        if len(self._leases) > self._config.max_local_keys:
+            self._leases = {
+                k: v for k, v in self._leases.items() if v.expires_at > now
+            }
+        if len(self._blocked_until) > self._config.max_local_keys:
+            self._blocked_until = {
+                k: v for k, v in self._blocked_until.items() if v > now
+            }
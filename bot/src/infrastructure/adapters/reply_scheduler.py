@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramAPIError, TelegramRetryAfter
+from application.dto import ReplyDTO
+from application.interfaces import ReplySenderProtocol
+
+from infrastructure.adapters.token_bucket import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+class ReplyScheduler(ReplySenderProtocol):
+    """
+    Outbound delivery of bot replies within Telegram rate limits.
+
+    Replies are queued per chat and sent by a background dispatcher, so
+    callers (aiogram handlers, AMQP consumers) never wait on the Telegram
+    API. Two limits are enforced:
+
+    * a global token bucket shared by all chats (Telegram allows about 30
+      messages per second per bot);
+    * a minimum interval between two messages to the same chat.
+
+    If the last reply waiting in the chat queue has the same `merge_key`,
+    the newer text replaces it instead of being queued: a burst of
+    acknowledgements of one kind reaches the chat as a single message. A
+    `TelegramRetryAfter` puts the reply back at the head of its chat queue
+    and pauses that chat for the requested time.
+
+    Parameters
+    ----------
+    bot : Bot
+        Bot used to send messages.
+    global_rate : float
+        Messages per second across all chats.
+    chat_interval : float
+        Minimum seconds between two messages to one chat.
+    max_per_chat : int
+        Pending replies kept per chat; the oldest one is dropped on overflow.
+    max_in_flight : int
+        Maximum concurrent `sendMessage` calls.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        *,
+        global_rate: float = 30.0,
+        chat_interval: float = 1.0,
+        max_per_chat: int = 20,
+        max_in_flight: int = 16,
+    ) -> None:
+        self._bot = bot
+        self._bucket = TokenBucket(rate=global_rate, capacity=global_rate)
+        self._chat_interval = chat_interval
+        self._max_per_chat = max_per_chat
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+        self._queues: dict[int, deque[ReplyDTO]] = {}
+        self._next_allowed: dict[int, float] = {}
+        self._schedule: list[tuple[float, int, int]] = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._dispatcher: asyncio.Task[None] | None = None
+
+    def send(self, reply: ReplyDTO) -> None:
+        """Queue a reply for delivery. Never blocks."""
+        queue = self._queues.get(reply.chat_id)
+        if queue is None:
+            self._queues[reply.chat_id] = deque([reply])
+            ready_at = self._next_allowed.pop(reply.chat_id, 0.0)
+            self._push(reply.chat_id, max(ready_at, time.monotonic()))
+            return
+        if (
+            reply.merge_key is not None
+            and queue
+            and queue[-1].merge_key == reply.merge_key
+        ):
+            queue[-1] = reply
+            return
+        if len(queue) >= self._max_per_chat:
+            dropped = queue.popleft()
+            logger.warning("Reply queue for chat %s is full, dropping %r",
+                           dropped.chat_id, dropped.text)
+        queue.append(reply)
+
+    def _push(self, chat_id: int, ready_at: float) -> None:
+        heapq.heappush(self._schedule, (ready_at, next(self._sequence), chat_id))
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if self._dispatcher is None:
+            self._dispatcher = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Stop dispatching, giving queued replies up to `timeout` to drain."""
+        deadline = time.monotonic() + timeout
+        while self._queues and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            if not self._schedule:
+                now = time.monotonic()
+                self._next_allowed = {
+                    chat_id: ready_at
+                    for chat_id, ready_at in self._next_allowed.items()
+                    if ready_at > now
+                }
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            ready_at, _, chat_id = self._schedule[0]
+            delay = ready_at - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._schedule)
+            await self._bucket.acquire()
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._deliver(chat_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _deliver(self, chat_id: int) -> None:
+        queue = self._queues[chat_id]
+        reply = queue.popleft()
+        ready_at = time.monotonic() + self._chat_interval
+        try:
+            await self._bot.send_message(chat_id=chat_id, text=reply.text)
+        except TelegramRetryAfter as e:
+            queue.appendleft(reply)
+            ready_at = time.monotonic() + e.retry_after
+        except TelegramAPIError:
+            logger.exception("Failed to deliver reply to chat %s", chat_id)
+        finally:
+            self._in_flight.release()
+            if queue:
+                self._push(chat_id, ready_at)
+            else:
+                del self._queues[chat_id]
+                self._next_allowed[chat_id] = ready_at
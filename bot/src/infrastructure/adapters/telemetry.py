@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from application.interfaces import TelemetryWriterProtocol
+from config import TelemetryConfig
+from domain.entities import DeviceTelemetryEntity
+from infrastructure.adapters.buffered_writer import BufferedWriter
+from infrastructure.repositories.advisory_lock import try_advisory_lock
+from infrastructure.repositories.device_telemetry import DeviceTelemetryRepositorySQL
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = "telemetry_maintenance"
+
+
+class BufferedTelemetryWriter(
+    BufferedWriter[DeviceTelemetryEntity], TelemetryWriterProtocol
+):
+    """
+    Buffers telemetry samples and COPYs them to Postgres in batches.
+
+    Device ticks never wait for the database. When the buffer is full new
+    samples are dropped: telemetry is lossy by nature, and the next sample
+    of the device supersedes the lost one.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions used for the COPYs.
+    config : TelemetryConfig
+        Batch size, flush interval and buffer bound.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        config: TelemetryConfig,
+    ) -> None:
+        super().__init__(
+            session_maker,
+            batch_size=config.batch_size,
+            flush_interval=config.flush_interval,
+            max_buffer=config.max_buffer,
+        )
+
+    async def _write(
+        self, session: AsyncSession, batch: Sequence[DeviceTelemetryEntity]
+    ) -> None:
+        await DeviceTelemetryRepositorySQL(session).copy_many(batch)
+
+
+class TelemetryMaintenance:
+    """
+    Background upkeep of the partitioned ``device_telemetry`` table.
+
+    Every `snapshot_interval` seconds the latest samples are copied into
+    the ``smart_devices`` snapshot columns. Every `maintenance_interval`
+    seconds (and once at start, before anything is written) the daily
+    partitions for the next `partitions_ahead` days are created and those
+    older than `retention_days` are dropped.
+
+    Every replica runs the loop, but each round takes an advisory lock
+    first and is skipped while another replica holds it.
+
+    Parameters
+    ----------
+    session_maker : async_sessionmaker[AsyncSession]
+        Sessions on the primary.
+    config : TelemetryConfig
+        Intervals, partition horizon and retention.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        config: TelemetryConfig,
+    ) -> None:
+        self._session_maker = session_maker
+        self._config = config
+        self._refreshed_at: datetime | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    async def maintain_partitions(self) -> None:
+        today = datetime.now(timezone.utc).date()
+        created: list[str] = []
+        dropped: list[str] = []
+        async with self._session_maker() as session:
+            if await try_advisory_lock(session, LOCK_NAME):
+                repo = DeviceTelemetryRepositorySQL(session)
+                created = await repo.ensure_partitions(
+                    today, self._config.partitions_ahead + 1
+                )
+            await session.commit()
+        async with self._session_maker() as session:
+            if await try_advisory_lock(session, LOCK_NAME):
+                dropped = await DeviceTelemetryRepositorySQL(
+                    session
+                ).drop_partitions_before(
+                    today - timedelta(days=self._config.retention_days)
+                )
+            await session.commit()
+        if created or dropped:
+            logger.info("Telemetry partitions created %s, dropped %s", created, dropped)
+
+    async def refresh_snapshots(self) -> int:
+        started = datetime.now(timezone.utc)
+        since = (self._refreshed_at or started) - timedelta(
+            seconds=self._config.snapshot_slack
+        )
+        async with self._session_maker() as session:
+            if not await try_advisory_lock(session, LOCK_NAME):
+                return 0
+            updated = await DeviceTelemetryRepositorySQL(session).refresh_snapshots(
+                since
+            )
+            await session.commit()
+        self._refreshed_at = started
+        return updated
+
+    async def start(self) -> None:
+        if self._task is None:
+            await self.maintain_partitions()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        maintain_at = time.monotonic() + self._config.maintenance_interval
+        while True:
+            await asyncio.sleep(self._config.snapshot_interval)
+            try:
+                await self.refresh_snapshots()
+                if time.monotonic() >= maintain_at:
+                    await self.maintain_partitions()
+                    maintain_at = time.monotonic() + self._config.maintenance_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Telemetry maintenance failed")
@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    In-process token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+
+    Parameters
+    ----------
+    rate : float
+        Refill rate in tokens per second.
+    capacity : float
+        Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive")
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated) * self._rate
+        )
+        self._updated = now
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+        """
+        Take `cost` tokens if available.
+
+        Returns
+        -------
+        float
+            0.0 if the tokens were taken, otherwise the number of seconds
+            until enough tokens will be available.
+        """
+        self._refill(time.monotonic())
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return 0.0
+        return (cost - self._tokens) / self._rate
+
+    async def acquire(self, cost: float = 1.0) -> None:
+        """Wait until `cost` tokens are available and take them."""
+        while (delay := self.try_acquire(cost)) > 0:
+            await asyncio.sleep(delay)
@@ -1,13 +1,27 @@
+import asyncio
+import random
+from functools import cached_property
 from types import TracebackType
-from typing import Callable, Self, Type  # type: ignore [attr-defined]
+from typing import (  # type: ignore [attr-defined]
+    Awaitable,
+    Callable,
+    Self,
+    Type,
+    TypeVar,
+)
 
 from application.interfaces import (
     HomeRepositoryProtocol,
     HomeUserRoleRepositoryProtocol,
+    OutboxRepositoryProtocol,
+    PermissionCacheProtocol,
     SessionProtocol,
     SmartDeviceRepositoryProtocol,
     TelegramUserRepositoryProtocol,
 )
+from domain.errors import ConcurrentUpdateError
+
+T = TypeVar("T")
 
 
 class UnitOfWork:
@@ -32,6 +46,12 @@ class UnitOfWork:
         Repository class for managing user roles within a home.
     devices : type[SmartDeviceRepositoryProtocol]
         Repository class for managing smart devices.
+    outbox : type[OutboxRepositoryProtocol]
+        Repository class for messages published once the transaction
+        commits.
+    permissions : PermissionCacheProtocol
+        Permission cache invalidated after commits that changed roles or
+        moved/deleted devices.
 
     Notes
     -----
@@ -39,6 +59,9 @@ class UnitOfWork:
     protocols, not protocol instances themselves. This allows passing different
     concrete implementations (e.g., SQL-based or in-memory fakes) while keeping
     the UnitOfWork generic.
+
+    Repositories are built lazily on first attribute access, so a UnitOfWork
+    that is resolved but never used costs nothing beyond the object itself.
     """
 
     def __init__(
@@ -48,19 +71,63 @@ class UnitOfWork:
         home: Callable[[SessionProtocol], HomeRepositoryProtocol],
         roles: Callable[[SessionProtocol], HomeUserRoleRepositoryProtocol],
         devices: Callable[[SessionProtocol], SmartDeviceRepositoryProtocol],
+        outbox: Callable[[SessionProtocol], OutboxRepositoryProtocol],
+        permissions: PermissionCacheProtocol,
     ) -> None:
         """
         Initialize the UnitOfWork.
 
-        Stores the session and instantiates repository objects using the provided
-        repository classes. Each repository is expected to accept the session in
-        its constructor.
+        Stores the session and the repository factories. Each repository is
+        instantiated with the session on first access.
         """
         self._session = session
-        self._users = users(session)
-        self.home = home(session)
-        self.roles = roles(session)
-        self.devices = devices(session)
+        self._users_factory = users
+        self._home_factory = home
+        self._roles_factory = roles
+        self._devices_factory = devices
+        self._outbox_factory = outbox
+        self._permissions = permissions
+
+    @property
+    def session(self) -> SessionProtocol:
+        return self._session
+
+    @cached_property
+    def users(self) -> TelegramUserRepositoryProtocol:
+        return self._users_factory(self._session)
+
+    @cached_property
+    def home(self) -> HomeRepositoryProtocol:
+        return self._home_factory(self._session)
+
+    @cached_property
+    def roles(self) -> HomeUserRoleRepositoryProtocol:
+        return self._roles_factory(self._session)
+
+    @cached_property
+    def devices(self) -> SmartDeviceRepositoryProtocol:
+        return self._devices_factory(self._session)
+
+    @cached_property
+    def outbox(self) -> OutboxRepositoryProtocol:
+        return self._outbox_factory(self._session)
+
+    def read_only(self) -> Self:  # type: ignore [attr-defined]
+        """
+        Route the next transaction to a read replica.
+
+        Use as ``async with uow.read_only():`` for units of work that only
+        read. Writes in such a transaction fail on the replica. Without
+        replicas, or right after this process committed a write, the
+        statements go to the primary as usual.
+
+        Returns
+        -------
+        Self
+            This UnitOfWork, to be entered.
+        """
+        self._session.routing = "replica"
+        return self
 
     async def __aenter__(self) -> Self:  # type: ignore [attr-defined]
         """
@@ -102,7 +169,69 @@ class UnitOfWork:
         cleanup steps. If commit fails, callers should ensure rollback is performed
         to avoid leaving the session in an inconsistent state.
         """
+        self._session.routing = None
         if exc_type:
             await self._session.rollback()
         else:
             await self._session.commit()
+            await self._invalidate_permissions()
+
+    async def retry(
+        self,
+        operation: Callable[[Self], Awaitable[T]],  # type: ignore [valid-type]
+        *,
+        attempts: int = 5,
+        base_delay: float = 0.005,
+    ) -> T:
+        """
+        Run `operation` in a transaction, retrying on version conflicts.
+
+        Compare-and-swap updates raise ConcurrentUpdateError when another
+        transaction changed the row first. The transaction is then rolled
+        back and `operation` is run again from scratch, after a jittered
+        exponential backoff, so it must re-read what it updates. The
+        retries read from the primary: a replica may still serve the row
+        the conflicting transaction replaced.
+
+        Parameters
+        ----------
+        operation : Callable[[Self], Awaitable[T]]
+            Receives this UnitOfWork (with an open transaction) and returns
+            the result of the unit of work.
+        attempts : int
+            Maximum number of runs before the conflict is re-raised.
+        base_delay : float
+            Backoff before the second run, in seconds; doubled after each
+            further conflict.
+
+        Returns
+        -------
+        T
+            Result of the first run that committed.
+        """
+        for attempt in range(attempts):
+            try:
+                async with self:
+                    return await operation(self)
+            except ConcurrentUpdateError:
+                if attempt + 1 == attempts:
+                    raise
+                # Repositories hold snapshots read in the aborted transaction.
+                for name in ("users", "home", "roles", "devices", "outbox"):
+                    self.__dict__.pop(name, None)
+                self._session.routing = "primary"
+                await asyncio.sleep(random.uniform(0, base_delay * 2**attempt))
+        raise AssertionError("unreachable")
+
+    async def _invalidate_permissions(self) -> None:
+        # Only repositories that were actually built can have written.
+        roles = self.__dict__.get("roles")
+        devices = self.__dict__.get("devices")
+        users = list(roles.changed_users) if roles is not None else []
+        moved = list(devices.changed_devices) if devices is not None else []
+        if users or moved:
+            await self._permissions.invalidate(users=users, devices=moved)
+            if roles is not None:
+                roles.changed_users.clear()
+            if devices is not None:
+                devices.changed_devices.clear()
@@ -0,0 +1,17 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+TRY_LOCK_STMT = text("SELECT pg_try_advisory_xact_lock(hashtext(:name))")
+
+
+async def try_advisory_lock(session: AsyncSession, name: str) -> bool:
+    """
+    Take the advisory lock `name` for the session's transaction, if free.
+
+    Periodic jobs that every replica runs take it first, so that only one
+    replica does a round at a time and the others skip theirs. The lock
+    is released when the transaction ends. SQLAlchemy errors are left to
+    the caller to translate.
+    """
+    result = await session.execute(TRY_LOCK_STMT, {"name": name})
+    return bool(result.scalar_one())
@@ -0,0 +1,23 @@
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def copy_rows(
+    session: AsyncSession, statement: str, rows: Iterable[Sequence[Any]]
+) -> None:
+    """
+    Stream `rows` to Postgres with a ``COPY ... FROM STDIN`` `statement`.
+
+    The rows are written through the psycopg connection under the
+    session's, so they are part of its current transaction. Driver and
+    SQLAlchemy errors are left to the caller to translate.
+    """
+    conn = await session.connection()
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    assert driver is not None, "COPY needs the session's psycopg connection"
+    async with driver.cursor() as cursor:
+        async with cursor.copy(statement) as copy:
+            for row in rows:
+                await copy.write_row(row)
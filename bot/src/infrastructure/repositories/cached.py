@@ -0,0 +1,240 @@
+import uuid
+from typing import Any, AsyncIterator, Literal, Sequence
+
+from application.interfaces import (
+    HomeRepositoryProtocol,
+    HomeUserRoleRepositoryProtocol,
+    SmartDeviceRepositoryProtocol,
+)
+from domain.entities import (
+    HomeEntity,
+    HomeRole,
+    HomeUserRoleEntity,
+    SmartDeviceEntity,
+)
+from infrastructure.adapters.entity_cache import EntityCache
+
+Lock = Literal["update", "no_key_update", "share", "key_share"] | None
+
+# Cached entities are shared between requests: treat them, including the
+# custom_settings dict of devices, as read-only.
+
+
+class _CachedRepository:
+    """
+    Common part of the read-through repository decorators.
+
+    Unlocked reads are served from the cache; locked reads and all writes
+    go to the wrapped repository. A write drops the local entry right away
+    (other replicas drop theirs on the NOTIFY sent at commit) and stops
+    this instance from filling the cache: its session may now see
+    uncommitted rows, which must not leak to other requests.
+    """
+
+    def __init__(self, cache: EntityCache) -> None:
+        self._cache = cache
+        self._wrote = False
+
+    def _put(self, key: tuple[Any, ...], value: Any, epoch: int) -> None:
+        if not self._wrote:
+            self._cache.put(key, value, epoch)
+
+    def _written(self, table: str, ids: Sequence[uuid.UUID]) -> None:
+        self._wrote = True
+        for id in ids:
+            self._cache.invalidate(table, id)
+
+
+class CachedHomeRepository(_CachedRepository, HomeRepositoryProtocol):
+    """Read-through `EntityCache` in front of a home repository."""
+
+    def __init__(self, inner: HomeRepositoryProtocol, cache: EntityCache) -> None:
+        super().__init__(cache)
+        self._inner = inner
+
+    async def create(self, dm: HomeEntity) -> uuid.UUID:
+        self._written("homes", ())
+        return await self._inner.create(dm)
+
+    async def read(self, *, id: uuid.UUID, lock: Lock = None) -> HomeEntity | None:
+        if lock is not None:
+            return await self._inner.read(id=id, lock=lock)
+        key = ("homes", id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        epoch = self._cache.epoch
+        dm = await self._inner.read(id=id, lock=None)
+        if dm is not None:
+            self._put(key, dm, epoch)
+        return dm
+
+    async def update(
+        self,
+        id: uuid.UUID,
+        name: str | None,
+        address: str | None,
+        version: int | None = None,
+    ) -> None:
+        self._written("homes", [id])
+        await self._inner.update(id, name, address, version)
+
+    async def delete(self, id: uuid.UUID) -> None:
+        self._written("homes", [id])
+        await self._inner.delete(id)
+
+
+class CachedHomeUserRoleRepository(
+    _CachedRepository, HomeUserRoleRepositoryProtocol
+):
+    """Read-through `EntityCache` in front of a role repository."""
+
+    def __init__(
+        self, inner: HomeUserRoleRepositoryProtocol, cache: EntityCache
+    ) -> None:
+        super().__init__(cache)
+        self._inner = inner
+
+    @property
+    def changed_users(self) -> set[int]:  # type: ignore[override]
+        return self._inner.changed_users
+
+    async def create(self, dm: HomeUserRoleEntity) -> uuid.UUID:
+        self._written("home_user_roles", ())
+        return await self._inner.create(dm)
+
+    async def read(
+        self, *, id: uuid.UUID, lock: Lock = None
+    ) -> HomeUserRoleEntity | None:
+        if lock is not None:
+            return await self._inner.read(id=id, lock=lock)
+        key = ("home_user_roles", id)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        epoch = self._cache.epoch
+        dm = await self._inner.read(id=id, lock=None)
+        if dm is not None:
+            self._put(key, dm, epoch)
+        return dm
+
+    async def update(
+        self, id: uuid.UUID, new_role: HomeRole, version: int | None = None
+    ) -> None:
+        self._written("home_user_roles", [id])
+        await self._inner.update(id, new_role, version)
+
+    async def delete(self, id: uuid.UUID) -> None:
+        self._written("home_user_roles", [id])
+        await self._inner.delete(id)
+
+
+class CachedSmartDeviceRepository(_CachedRepository, SmartDeviceRepositoryProtocol):
+    """
+    Read-through `EntityCache` in front of a device repository.
+
+    Unlocked reads by id, serial number or MAC address are cached; the
+    latter two through aliases that are checked against the cached device.
+    A cache hit is handed to the wrapped repository with `remember`, so a
+    following `update` still writes only the changed fields.
+    """
+
+    def __init__(
+        self, inner: SmartDeviceRepositoryProtocol, cache: EntityCache
+    ) -> None:
+        super().__init__(cache)
+        self._inner = inner
+
+    @property
+    def changed_devices(self) -> set[uuid.UUID]:  # type: ignore[override]
+        return self._inner.changed_devices
+
+    def _lookup(self, column: str, value: Any) -> SmartDeviceEntity | None:
+        if column == "id":
+            return self._cache.get(("smart_devices", value))
+        id = self._cache.get(("smart_devices", column, value))
+        if id is None:
+            return None
+        dm = self._cache.get(("smart_devices", id))
+        if dm is None or getattr(dm, column) != value:
+            return None
+        return dm
+
+    def _store(self, dm: SmartDeviceEntity, epoch: int) -> None:
+        self._put(("smart_devices", dm.id), dm, epoch)
+        for column in ("serial_number", "mac_address"):
+            value = getattr(dm, column)
+            if value is not None:
+                self._put(("smart_devices", column, value), dm.id, epoch)
+
+    async def create(self, dm: SmartDeviceEntity) -> uuid.UUID:
+        self._written("smart_devices", ())
+        return await self._inner.create(dm)
+
+    async def read(
+        self,
+        *,
+        id: uuid.UUID | None = None,
+        serial_number: str | None = None,
+        mac_address: str | None = None,
+        home_id: uuid.UUID | None = None,
+        name: str | None = None,
+        lock: Lock = None,
+    ) -> SmartDeviceEntity | None:
+        key: tuple[str, Any] | None = None
+        if lock is None:
+            if id is not None:
+                key = ("id", id)
+            elif serial_number is not None:
+                key = ("serial_number", serial_number)
+            elif mac_address is not None:
+                key = ("mac_address", mac_address)
+        if key is not None:
+            cached = self._lookup(*key)
+            if cached is not None:
+                self._inner.remember(cached)
+                return cached
+        epoch = self._cache.epoch
+        dm = await self._inner.read(
+            id=id,
+            serial_number=serial_number,
+            mac_address=mac_address,
+            home_id=home_id,
+            name=name,
+            lock=lock,
+        )
+        if dm is not None and lock is None:
+            self._store(dm, epoch)
+        return dm
+
+    def remember(self, dm: SmartDeviceEntity) -> None:
+        self._inner.remember(dm)
+
+    async def update(
+        self, dm: SmartDeviceEntity, *, check_version: bool = True
+    ) -> SmartDeviceEntity:
+        self._written("smart_devices", [dm.id])
+        return await self._inner.update(dm, check_version=check_version)
+
+    async def create_many(self, dms: Sequence[SmartDeviceEntity]) -> list[uuid.UUID]:
+        self._written("smart_devices", ())
+        return await self._inner.create_many(dms)
+
+    async def upsert_many(self, dms: Sequence[SmartDeviceEntity]) -> None:
+        self._written("smart_devices", [dm.id for dm in dms])
+        await self._inner.upsert_many(dms)
+
+    async def update_many(
+        self, dms: Sequence[SmartDeviceEntity], *, check_version: bool = True
+    ) -> None:
+        self._written("smart_devices", [dm.id for dm in dms])
+        await self._inner.update_many(dms, check_version=check_version)
+
+    def list_by_home(  # type: ignore[override]
+        self, home_id: uuid.UUID, **kwargs: Any
+    ) -> AsyncIterator[Any]:
+        return self._inner.list_by_home(home_id, **kwargs)
+
+    async def delete(self, id: uuid.UUID) -> None:
+        self._written("smart_devices", [id])
+        await self._inner.delete(id)
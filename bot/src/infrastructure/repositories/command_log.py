@@ -0,0 +1,47 @@
+from datetime import date
+from typing import Sequence
+
+from application.interfaces import CommandLogRepositoryProtocol
+from domain.entities import CommandLogEntity
+from domain.errors import DomainError
+from infrastructure.repositories.bulk_copy import copy_rows
+from infrastructure.repositories.mappers import COMMAND_LOG
+from infrastructure.repositories.partitions import DailyPartitions
+from psycopg import Error as PsycopgError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COLUMNS = COMMAND_LOG.columns
+COPY_STMT = f"COPY command_log ({', '.join(COLUMNS)}) FROM STDIN"
+
+PARTITIONS = DailyPartitions("command_log")
+
+
+class CommandLogRepositorySQL(CommandLogRepositoryProtocol):
+    """
+    Append-only history of commands, range-partitioned by UTC day.
+
+    Every status change of a command is a new row with the command's
+    `request_id`; old days are dropped whole by retention.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def copy_many(self, entries: Sequence[CommandLogEntity]) -> None:
+        if not entries:
+            return
+        try:
+            await copy_rows(
+                self.session,
+                COPY_STMT,
+                (tuple(getattr(entry, c) for c in COLUMNS) for entry in entries),
+            )
+        except (PsycopgError, SQLAlchemyError) as e:
+            raise DomainError("Database error while copying command log") from e
+
+    async def ensure_partitions(self, first_day: date, days: int) -> list[str]:
+        return await PARTITIONS.ensure(self.session, first_day, days)
+
+    async def drop_partitions_before(self, day: date) -> list[str]:
+        return await PARTITIONS.drop_before(self.session, day)
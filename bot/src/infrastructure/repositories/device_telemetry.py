@@ -0,0 +1,95 @@
+from datetime import date, datetime
+from typing import Sequence
+
+from application.interfaces import DeviceTelemetryRepositoryProtocol
+from domain.entities import DeviceTelemetryEntity
+from domain.errors import DomainError
+from infrastructure.repositories.bulk_copy import copy_rows
+from infrastructure.repositories.mappers import DEVICE_TELEMETRY
+from infrastructure.repositories.partitions import DailyPartitions
+from psycopg import Error as PsycopgError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+COLUMNS = DEVICE_TELEMETRY.columns
+COPY_STMT = f"COPY device_telemetry ({', '.join(COLUMNS)}) FROM STDIN"
+
+PARTITIONS = DailyPartitions("device_telemetry")
+
+# Latest sample of every device seen since :since, copied into the registry
+# row unless that row already holds a newer one. The window overlaps the
+# previous refresh, so late rows are still picked up and replays are no-ops.
+# version is left alone: the snapshot columns are not part of what writers
+# compare-and-swap on, and the entity_changed trigger only fires on a
+# version change, so refreshes don't flush the device caches either.
+REFRESH_SNAPSHOTS_STMT = text(
+    """
+    UPDATE smart_devices d
+    SET last_seen = t.recorded_at,
+        battery_level = COALESCE(t.battery_level, d.battery_level),
+        connectivity = COALESCE(t.connectivity, d.connectivity),
+        status = COALESCE(t.status, d.status),
+        updated_at = now()
+    FROM (
+        SELECT DISTINCT ON (device_id)
+            device_id, recorded_at, battery_level, connectivity, status
+        FROM device_telemetry
+        WHERE recorded_at >= :since
+        ORDER BY device_id, recorded_at DESC
+    ) t
+    WHERE d.id = t.device_id
+      AND (d.last_seen IS NULL OR d.last_seen < t.recorded_at)
+    """
+)
+
+
+class DeviceTelemetryRepositorySQL(DeviceTelemetryRepositoryProtocol):
+    """
+    Append-only device telemetry, range-partitioned by UTC day.
+
+    Samples are only ever COPYed in; whole days are dropped by retention
+    instead of deleting rows, so the table never accumulates dead tuples.
+    The fast-changing columns of ``smart_devices`` are a snapshot that
+    `refresh_snapshots` periodically brings up to date.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def copy_many(self, samples: Sequence[DeviceTelemetryEntity]) -> None:
+        if not samples:
+            return
+        try:
+            await copy_rows(
+                self.session,
+                COPY_STMT,
+                (
+                    (
+                        sample.device_id,
+                        sample.recorded_at,
+                        sample.battery_level,
+                        sample.connectivity,
+                        sample.status,
+                    )
+                    for sample in samples
+                ),
+            )
+        except (PsycopgError, SQLAlchemyError) as e:
+            raise DomainError("Database error while copying telemetry") from e
+
+    async def ensure_partitions(self, first_day: date, days: int) -> list[str]:
+        return await PARTITIONS.ensure(self.session, first_day, days)
+
+    async def drop_partitions_before(self, day: date) -> list[str]:
+        return await PARTITIONS.drop_before(self.session, day)
+
+    async def refresh_snapshots(self, since: datetime) -> int:
+        """Copy the latest samples since `since` into ``smart_devices``."""
+        try:
+            result = await self.session.execute(
+                REFRESH_SNAPSHOTS_STMT, {"since": since}
+            )
+            return result.rowcount  # type: ignore[attr-defined, no-any-return]
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while refreshing snapshots") from e
@@ -1,15 +1,17 @@
 import uuid
-from typing import Literal
+from typing import Any, Literal
 
 from application.interfaces import HomeRepositoryProtocol
 from domain.entities import HomeEntity
 from domain.errors import (
+    ConcurrentUpdateError,
     DomainError,
     EntityAlreadyExistsError,
     EntityDeleteError,
     EntityNotFoundError,
     EntityUpdateError,
 )
+from infrastructure.repositories.mappers import HOME
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -22,19 +24,14 @@ class HomeRepositorySQL(HomeRepositoryProtocol):
     async def create(self, dm: HomeEntity) -> uuid.UUID:
         stmt = text(
             """
-            INSERT INTO homes (id, name, address, created_at)
-            VALUES (:id, :name, :address, :created_at)
+            INSERT INTO homes (id, name, address, created_at, version)
+            VALUES (:id, :name, :address, :created_at, :version)
             """
-        )
+        ).execution_options(pipeline=True)
         try:
             await self.session.execute(
                 stmt,
-                {
-                    "id": dm.id,
-                    "name": dm.name,
-                    "address": dm.address,
-                    "created_at": dm.created_at,
-                },
+                HOME.to_params(dm),
             )
             return dm.id
         except IntegrityError as e:
@@ -48,10 +45,7 @@ class HomeRepositorySQL(HomeRepositoryProtocol):
         id: uuid.UUID,
         lock: Literal["update", "no_key_update", "share", "key_share"] | None = None,
     ) -> HomeEntity | None:
-        query = """
-            SELECT * FROM homes 
-            WHERE id = :id
-        """
+        query = f"{HOME.select} WHERE id = :id"
         if lock is not None:
             if lock == "update":
                 query += " FOR UPDATE"
@@ -62,9 +56,11 @@ class HomeRepositorySQL(HomeRepositoryProtocol):
             elif lock == "key_share":
                 query += " FOR KEY SHARE"
         try:
-            result = await self.session.execute(text(query), {"id": id})
-            row = result.mappings().first()
-            return None if row is None else HomeEntity(**row)
+            result = await self.session.execute(
+                text(query).execution_options(replica=lock is None), {"id": id}
+            )
+            row = result.first()
+            return None if row is None else HOME.from_row(row)
         except SQLAlchemyError as e:
             raise DomainError("Database error while reading home") from e
 
@@ -72,27 +68,45 @@ class HomeRepositorySQL(HomeRepositoryProtocol):
         self, 
         id: uuid.UUID, 
         name: str | None, 
-        address: str | None
+        address: str | None,
+        version: int | None = None,
     ) -> None:
-        stmt = text(
-            """
+        """
+        Update a home, optionally only if it is still at `version`.
+
+        Raises ConcurrentUpdateError if `version` is given and the home has
+        been changed since.
+        """
+        query = """
             UPDATE homes
             SET name = :name,
-                address = :address
+                address = :address,
+                version = version + 1
             WHERE id = :id
-            """
-        )
+        """
+        params: dict[str, Any] = {"id": id, "name": name, "address": address}
+        if version is not None:
+            query += " AND version = :version"
+            params["version"] = version
         try:
-            result = await self.session.execute(
-                stmt, {"id": id, "name": name, "address": address}
-            )
+            result = await self.session.execute(text(query), params)
             if getattr(result, "rowcount", 0) == 0:
+                if version is not None and await self._exists(id):
+                    raise ConcurrentUpdateError("Home was changed concurrently")
                 raise EntityNotFoundError("Home not found for update")
         except EntityNotFoundError:
             raise
+        except EntityUpdateError:
+            raise
         except SQLAlchemyError as e:
             raise EntityUpdateError("Error updating home") from e
 
+    async def _exists(self, id: uuid.UUID) -> bool:
+        result = await self.session.execute(
+            text("SELECT 1 FROM homes WHERE id = :id"), {"id": id}
+        )
+        return result.first() is not None
+
     async def delete(self, id: uuid.UUID) -> None:
         stmt = text("DELETE FROM homes WHERE id = :id")
         try:
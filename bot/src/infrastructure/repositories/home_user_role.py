@@ -1,42 +1,57 @@
 import uuid
-from typing import Literal
+from typing import Any, Literal
 
 from application.interfaces import HomeUserRoleRepositoryProtocol
 from domain.entities import HomeRole, HomeUserRoleEntity
 from domain.errors import (
+    ConcurrentUpdateError,
     DomainError,
     EntityAlreadyExistsError,
     EntityDeleteError,
     EntityNotFoundError,
     EntityUpdateError,
 )
+from infrastructure.repositories.mappers import HOME_USER_ROLE
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 
+# Writes return the Telegram id of the affected user so that the UnitOfWork
+# can invalidate that user's cached permissions after commit.
+RETURNING_TELEGRAM_ID = """
+    RETURNING (
+        SELECT telegram_id FROM telegram_users
+        WHERE telegram_users.id = home_user_roles.user_id
+    )
+"""
+
+
 class HomeUserRoleRepositorySQL(HomeUserRoleRepositoryProtocol):
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self.changed_users: set[int] = set()
+
+    def _changed(self, telegram_id: int | None) -> None:
+        if telegram_id is not None:
+            self.changed_users.add(telegram_id)
 
     async def create(self, dm: HomeUserRoleEntity) -> uuid.UUID:
         stmt = text(
             """
-            INSERT INTO home_user_roles (id, home_id, user_id, role, created_at)
-            VALUES (:id, :home_id, :user_id, :role, :created_at)
+            INSERT INTO home_user_roles (
+                id, home_id, user_id, role, created_at, version
+            )
+            VALUES (:id, :home_id, :user_id, :role, :created_at, :version)
             """
+            + RETURNING_TELEGRAM_ID
         )
         try:
-            await self.session.execute(
+            result = await self.session.execute(
                 stmt,
-                {
-                    "id": dm.id,
-                    "home_id": dm.home_id,
-                    "user_id": dm.user_id,
-                    "role": dm.role.value,
-                    "created_at": dm.created_at,
-                },
+                HOME_USER_ROLE.to_params(dm),
             )
+            self._changed(result.scalar_one_or_none())
             return dm.id
         except IntegrityError as e:
             raise EntityAlreadyExistsError("Role already exists") from e
@@ -49,10 +64,7 @@ class HomeUserRoleRepositorySQL(HomeUserRoleRepositoryProtocol):
         id: uuid.UUID,
         lock: Literal["update", "no_key_update", "share", "key_share"] | None = None,
     ) -> HomeUserRoleEntity | None:
-        query = """
-            SELECT * FROM home_user_roles 
-            WHERE id = :id
-        """
+        query = f"{HOME_USER_ROLE.select} WHERE id = :id"
         if lock is not None:
             if lock == "update":
                 query += " FOR UPDATE"
@@ -63,48 +75,67 @@ class HomeUserRoleRepositorySQL(HomeUserRoleRepositoryProtocol):
             elif lock == "key_share":
                 query += " FOR KEY SHARE"
         try:
-            result = await self.session.execute(text(query), {"id": id})
-            row = result.mappings().first()
-            if row is None:
-                return None
-            return HomeUserRoleEntity(
-                id=row["id"],
-                home_id=row["home_id"],
-                user_id=row["user_id"],
-                role=HomeRole(row["role"]),
-                created_at=row["created_at"],
+            result = await self.session.execute(
+                text(query).execution_options(replica=lock is None), {"id": id}
             )
+            row = result.first()
+            return None if row is None else HOME_USER_ROLE.from_row(row)
         except SQLAlchemyError as e:
             raise DomainError("Database error while reading role") from e
 
-    async def update(self, id: uuid.UUID, new_role: HomeRole) -> None:
-        stmt = text(
-            """
+    async def update(
+        self, id: uuid.UUID, new_role: HomeRole, version: int | None = None
+    ) -> None:
+        """
+        Change a role, optionally only if it is still at `version`.
+
+        Raises ConcurrentUpdateError if `version` is given and the role has
+        been changed since.
+        """
+        query = """
             UPDATE home_user_roles
-            SET role = :role
+            SET role = :role,
+                version = version + 1
             WHERE id = :id
-            """
-        )
+        """
+        params: dict[str, Any] = {"id": id, "role": new_role.value}
+        if version is not None:
+            query += " AND version = :version"
+            params["version"] = version
         try:
             result = await self.session.execute(
-                stmt, {"id": id, "role": new_role.value}
+                text(query + RETURNING_TELEGRAM_ID), params
             )
-            if getattr(result, "rowcount", 0) == 0:
+            row = result.first()
+            if row is None:
+                if version is not None and await self._exists(id):
+                    raise ConcurrentUpdateError("Role was changed concurrently")
                 raise EntityNotFoundError("Role not found for update")
+            self._changed(row[0])
         except EntityNotFoundError:
             raise
+        except EntityUpdateError:
+            raise
         except SQLAlchemyError as e:
             raise EntityUpdateError("Error updating role") from e
 
+    async def _exists(self, id: uuid.UUID) -> bool:
+        result = await self.session.execute(
+            text("SELECT 1 FROM home_user_roles WHERE id = :id"), {"id": id}
+        )
+        return result.first() is not None
+
     async def delete(self, id: uuid.UUID) -> None:
         stmt = text("""
             DELETE FROM home_user_roles 
             WHERE id = :id
-        """)
+        """ + RETURNING_TELEGRAM_ID)
         try:
             result = await self.session.execute(stmt, {"id": id})
-            if getattr(result, "rowcount", 0) == 0:
+            row = result.first()
+            if row is None:
                 raise EntityNotFoundError("Role not found for delete")
+            self._changed(row[0])
         except EntityNotFoundError:
             raise
         except SQLAlchemyError as e:
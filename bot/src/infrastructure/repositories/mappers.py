@@ -0,0 +1,92 @@
+from dataclasses import fields
+from typing import Any, Callable, Generic, Mapping, Sequence, TypeVar
+
+from domain.entities import (
+    CommandLogEntity,
+    DeviceTelemetryEntity,
+    HomeEntity,
+    HomeRole,
+    HomeUserRoleEntity,
+    OutboxMessageEntity,
+    SmartDeviceEntity,
+    TelegramUserEntity,
+)
+
+E = TypeVar("E")
+
+# (load, dump) pair for a column whose database value differs from the
+# entity attribute, e.g. an Enum stored as its value.
+Converter = tuple[Callable[[Any], Any], Callable[[Any], Any]]
+
+
+class EntityMapper(Generic[E]):
+    """
+    Precompiled mapping between an entity dataclass and its table row.
+
+    The column list is the entity's field order, so repositories select
+    exactly `columns` and get positional rows that map straight onto the
+    constructor. `from_row` and `to_params` are generated once per entity,
+    which avoids `Entity(**row_mapping)` (a `RowMapping` lookup per field)
+    and `dataclasses.asdict` (a recursive deep copy of nested dicts such as
+    `custom_settings`).
+
+    Parameters
+    ----------
+    entity : type[E]
+        Dataclass whose fields match the table columns.
+    table : str
+        Table name used to build `select`.
+    converters : Mapping[str, Converter] | None
+        Per-column (load, dump) functions for values that need conversion.
+    """
+
+    def __init__(
+        self,
+        entity: type[E],
+        table: str,
+        converters: Mapping[str, Converter] | None = None,
+    ) -> None:
+        self.entity = entity
+        self.table = table
+        self.columns: tuple[str, ...] = tuple(
+            f.name for f in fields(entity)  # type: ignore[arg-type]
+        )
+        self.select = f"SELECT {', '.join(self.columns)} FROM {table}"
+        converters = converters or {}
+        namespace: dict[str, Any] = {"entity": entity}
+        loads, dumps = [], []
+        for i, column in enumerate(self.columns):
+            if column in converters:
+                load, dump = converters[column]
+                namespace[f"load_{column}"] = load
+                namespace[f"dump_{column}"] = dump
+                loads.append(f"load_{column}(row[{i}])")
+                dumps.append(f"{column!r}: dump_{column}(dm.{column})")
+            else:
+                loads.append(f"row[{i}]")
+                dumps.append(f"{column!r}: dm.{column}")
+        if converters:
+            from_row = f"def from_row(row):\n    return entity({', '.join(loads)})\n"
+        else:
+            from_row = "def from_row(row):\n    return entity(*row)\n"
+        to_params = f"def to_params(dm):\n    return {{{', '.join(dumps)}}}\n"
+        exec(from_row + to_params, namespace)
+        self.from_row: Callable[[Sequence[Any]], E] = namespace["from_row"]
+        self.to_params: Callable[[E], dict[str, Any]] = namespace["to_params"]
+
+    def from_rows(self, rows: Sequence[Sequence[Any]]) -> list[E]:
+        from_row = self.from_row
+        return [from_row(row) for row in rows]
+
+
+TELEGRAM_USER = EntityMapper(TelegramUserEntity, "telegram_users")
+HOME = EntityMapper(HomeEntity, "homes")
+HOME_USER_ROLE = EntityMapper(
+    HomeUserRoleEntity,
+    "home_user_roles",
+    converters={"role": (HomeRole, lambda role: role.value)},
+)
+SMART_DEVICE = EntityMapper(SmartDeviceEntity, "smart_devices")
+DEVICE_TELEMETRY = EntityMapper(DeviceTelemetryEntity, "device_telemetry")
+OUTBOX_MESSAGE = EntityMapper(OutboxMessageEntity, "outbox")
+COMMAND_LOG = EntityMapper(CommandLogEntity, "command_log")
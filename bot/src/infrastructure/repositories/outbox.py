@@ -0,0 +1,74 @@
+import uuid
+from typing import Sequence
+
+from application.interfaces import OutboxRepositoryProtocol
+from domain.entities import OutboxMessageEntity
+from domain.errors import DomainError, EntityAlreadyExistsError, EntityDeleteError
+from infrastructure.repositories.mappers import OUTBOX_MESSAGE
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+INSERT_STMT = (
+    text(
+        f"""
+        INSERT INTO outbox ({', '.join(OUTBOX_MESSAGE.columns)})
+        VALUES ({', '.join(f':{c}' for c in OUTBOX_MESSAGE.columns)})
+        """
+    )
+    .bindparams(
+        bindparam("payload", type_=JSONB), bindparam("headers", type_=JSONB)
+    )
+    .execution_options(pipeline=True)
+)
+
+# Oldest pending messages not already claimed by another relay. The row
+# locks last until the claiming transaction deletes the rows and commits.
+CLAIM_STMT = text(
+    f"""
+    {OUTBOX_MESSAGE.select}
+    ORDER BY created_at
+    LIMIT :limit
+    FOR UPDATE SKIP LOCKED
+    """
+)
+
+DELETE_STMT = text("DELETE FROM outbox WHERE id = ANY(:ids)")
+
+
+class OutboxRepositorySQL(OutboxRepositoryProtocol):
+    """
+    Messages to publish, written in the transaction of the change they
+    announce.
+
+    `add` is all a unit of work needs: the message becomes visible to the
+    relay exactly when the transaction commits, and disappears with it on
+    rollback. `claim` and `delete_many` are the relay's side.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def add(self, message: OutboxMessageEntity) -> None:
+        try:
+            await self.session.execute(INSERT_STMT, OUTBOX_MESSAGE.to_params(message))
+        except IntegrityError as e:
+            raise EntityAlreadyExistsError("Outbox message already exists") from e
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while adding outbox message") from e
+
+    async def claim(self, limit: int) -> list[OutboxMessageEntity]:
+        try:
+            result = await self.session.execute(CLAIM_STMT, {"limit": limit})
+            return [OUTBOX_MESSAGE.from_row(row) for row in result]
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while claiming outbox messages") from e
+
+    async def delete_many(self, ids: Sequence[uuid.UUID]) -> None:
+        if not ids:
+            return
+        try:
+            await self.session.execute(DELETE_STMT, {"ids": list(ids)})
+        except SQLAlchemyError as e:
+            raise EntityDeleteError("Error deleting outbox messages") from e
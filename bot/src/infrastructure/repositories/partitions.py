@@ -0,0 +1,89 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+from domain.errors import DomainError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PARTITIONS_STMT = text(
+    """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:table AS regclass)
+    """
+)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+
+class DailyPartitions:
+    """
+    Daily range partitions of a table partitioned by a ``timestamptz``.
+
+    Partitions are named ``{table}_pYYYYMMDD`` after their UTC day, so
+    their names sort by date. The table's DEFAULT partition, if any, only
+    catches rows outside the prepared range and is never dropped.
+
+    Parameters
+    ----------
+    table : str
+        Partitioned parent table.
+    """
+
+    def __init__(self, table: str) -> None:
+        self.table = table
+        self.prefix = f"{table}_p"
+
+    def name(self, day: date) -> str:
+        return f"{self.prefix}{day:%Y%m%d}"
+
+    async def ensure(
+        self, session: AsyncSession, first_day: date, days: int
+    ) -> list[str]:
+        """Create the missing partitions of `days` days from `first_day` on."""
+        existing = set(await self._list(session))
+        created = []
+        try:
+            for offset in range(days):
+                day = first_day + timedelta(days=offset)
+                name = self.name(day)
+                if name in existing:
+                    continue
+                await session.execute(
+                    text(
+                        f"CREATE TABLE IF NOT EXISTS {name} "
+                        f"PARTITION OF {self.table} FOR VALUES "
+                        f"FROM ('{_day_start(day).isoformat()}') "
+                        f"TO ('{_day_start(day + timedelta(days=1)).isoformat()}')"
+                    )
+                )
+                created.append(name)
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while creating partitions") from e
+        return created
+
+    async def drop_before(self, session: AsyncSession, day: date) -> list[str]:
+        """Drop the partitions of the days before `day`."""
+        cutoff = self.name(day)
+        dropped = []
+        try:
+            # Dropping a partition briefly locks the parent; give up rather
+            # than queue the writers behind a long-running query.
+            await session.execute(text("SET LOCAL lock_timeout = '2s'"))
+            for name in sorted(await self._list(session)):
+                if name.startswith(self.prefix) and name < cutoff:
+                    await session.execute(text(f"DROP TABLE {name}"))
+                    dropped.append(name)
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while dropping partitions") from e
+        return dropped
+
+    async def _list(self, session: AsyncSession) -> list[str]:
+        try:
+            result = await session.execute(PARTITIONS_STMT, {"table": self.table})
+            return list(result.scalars())
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while listing partitions") from e
@@ -0,0 +1,50 @@
+import uuid
+
+from application.interfaces import PermissionRepositoryProtocol
+from domain.entities import HomeRole
+from domain.errors import DomainError
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# One probe per index: telegram_users.telegram_id (unique), smart_devices
+# primary key, then an index-only lookup of (user_id, home_id) INCLUDE role.
+# If a user somehow holds several roles in a home the strongest one wins;
+# the enum sorts in declaration order (owner, admin, guest).
+# Not routed to read replicas: its result is cached right after an
+# invalidation, and a lagging replica could re-cache a revoked role.
+ROLE_ON_DEVICE_STMT = text(
+    """
+    SELECT r.role
+    FROM telegram_users u
+    JOIN smart_devices d ON d.id = :device_id
+    JOIN home_user_roles r ON r.user_id = u.id AND r.home_id = d.home_id
+    WHERE u.telegram_id = :telegram_id
+    ORDER BY r.role
+    LIMIT 1
+    """
+)
+
+
+class PermissionRepositorySQL(PermissionRepositoryProtocol):
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def role_on_device(
+        self, telegram_id: int, device_id: uuid.UUID
+    ) -> HomeRole | None:
+        """
+        Role of a Telegram user in the home that owns a device.
+
+        Returns None if the user or the device does not exist, or if the
+        user has no role in the device's home.
+        """
+        try:
+            result = await self.session.execute(
+                ROLE_ON_DEVICE_STMT,
+                {"telegram_id": telegram_id, "device_id": device_id},
+            )
+            role = result.scalar_one_or_none()
+            return None if role is None else HomeRole(role)
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while resolving permissions") from e
@@ -1,46 +1,242 @@
+import copy
+import json
 import uuid
-from dataclasses import asdict
-from typing import Any, Literal
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Literal, Sequence
 
 from application.interfaces import SmartDeviceRepositoryProtocol
 from domain.entities import SmartDeviceEntity
 from domain.errors import (
+    ConcurrentUpdateError,
     DomainError,
     EntityAlreadyExistsError,
     EntityDeleteError,
     EntityNotFoundError,
     EntityUpdateError,
 )
-from sqlalchemy import text
+from infrastructure.repositories.bulk_copy import copy_rows
+from infrastructure.repositories.mappers import SMART_DEVICE
+from psycopg import Error as PsycopgError
+from psycopg import IntegrityError as PsycopgIntegrityError
+from psycopg.types.json import Jsonb
+from sqlalchemy import bindparam, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+COLUMNS = SMART_DEVICE.columns
+# Columns a resync may overwrite; id and registered_at are kept and the
+# version is bumped instead of copied.
+UPSERT_COLUMNS = tuple(
+    c for c in COLUMNS if c not in ("id", "registered_at", "version")
+)
+
+# Inserts and upserts are marked ``pipeline``: their results are never read,
+# so a PipelinedSession may queue them instead of waiting for the server.
+INSERT_STMT = text(
+    """
+    INSERT INTO smart_devices (
+        id, home_id, name, type, location, serial_number,
+        manufacturer, model, firmware_version, is_active,
+        registered_at, last_seen, custom_settings,
+        ip_address, mac_address, battery_level,
+        connectivity, status, last_error, updated_at, version
+    )
+    VALUES (
+        :id, :home_id, :name, :type, :location, :serial_number,
+        :manufacturer, :model, :firmware_version, :is_active,
+        :registered_at, :last_seen, :custom_settings,
+        :ip_address, :mac_address, :battery_level,
+        :connectivity, :status, :last_error, :updated_at, :version
+    )
+    """
+).bindparams(bindparam("custom_settings", type_=JSONB)).execution_options(
+    pipeline=True
+)
+
+UPSERT_STMT = text(
+    INSERT_STMT.text
+    + " ON CONFLICT (id) DO UPDATE SET "
+    + ", ".join(f"{c} = EXCLUDED.{c}" for c in UPSERT_COLUMNS)
+    + ", version = smart_devices.version + 1"
+).bindparams(bindparam("custom_settings", type_=JSONB)).execution_options(
+    pipeline=True
+)
+
+UPDATE_SQL = """
+    UPDATE smart_devices
+    SET home_id = :home_id,
+        name = :name,
+        type = :type,
+        location = :location,
+        serial_number = :serial_number,
+        manufacturer = :manufacturer,
+        model = :model,
+        firmware_version = :firmware_version,
+        is_active = :is_active,
+        registered_at = :registered_at,
+        last_seen = :last_seen,
+        custom_settings = :custom_settings,
+        ip_address = :ip_address,
+        mac_address = :mac_address,
+        battery_level = :battery_level,
+        connectivity = :connectivity,
+        status = :status,
+        last_error = :last_error,
+        updated_at = :updated_at,
+        version = version + 1
+    WHERE id = :id
+"""
+
+COPY_STMT = f"COPY smart_devices ({', '.join(COLUMNS)}) FROM STDIN"
+
+_params = SMART_DEVICE.to_params
+
+
+def _copy_row(dm: SmartDeviceEntity) -> tuple[Any, ...]:
+    return tuple(
+        Jsonb(dm.custom_settings)
+        if c == "custom_settings" and dm.custom_settings is not None
+        else getattr(dm, c)
+        for c in COLUMNS
+    )
+
+
+@lru_cache(maxsize=4)
+def _update_stmt(check_version: bool, returning: bool) -> Any:
+    query = UPDATE_SQL
+    if check_version:
+        query += " AND version = :version"
+    if returning:
+        query += " RETURNING version"
+    return text(query).bindparams(bindparam("custom_settings", type_=JSONB))
+
+
+@lru_cache(maxsize=256)
+def _partial_update_stmt(
+    columns: tuple[str, ...],
+    settings: Literal["keys", "replace"] | None,
+    check_version: bool,
+) -> Any:
+    assignments = [f"{c} = :{c}" for c in columns] + ["version = version + 1"]
+    if settings == "replace":
+        assignments.append("custom_settings = :custom_settings")
+    elif settings == "keys":
+        assignments.append(
+            "custom_settings = (COALESCE(custom_settings, '{}'::jsonb)"
+            " || CAST(:settings_set AS jsonb))"
+            " - CAST(:settings_removed AS text[])"
+        )
+    query = f"UPDATE smart_devices SET {', '.join(assignments)} WHERE id = :id"
+    if check_version:
+        query += " AND version = :version"
+    stmt = text(query + " RETURNING version")
+    if settings == "replace":
+        stmt = stmt.bindparams(bindparam("custom_settings", type_=JSONB))
+    return stmt
+
+
+@lru_cache(maxsize=64)
+def _list_stmt(columns: tuple[str, ...], keyset: bool, paged: bool) -> Any:
+    query = f"SELECT {', '.join(columns)} FROM smart_devices WHERE home_id = :home_id"
+    if keyset:
+        query += " AND (name, id) > (:after_name, :after_id)"
+    query += " ORDER BY name, id"
+    if paged:
+        query += " LIMIT :limit"
+    return text(query).execution_options(replica=True)
+
+
+def _diff(
+    old: SmartDeviceEntity,
+    old_settings: dict[str, Any] | None,
+    new: SmartDeviceEntity,
+    check_version: bool,
+) -> tuple[Any, dict[str, Any]] | None:
+    """
+    Build an UPDATE for the fields that differ between two versions.
+
+    `custom_settings` is diffed per top-level key: changed keys are merged
+    in with `||`, removed keys dropped with `-`. Returns None if nothing
+    changed.
+    """
+    columns = tuple(
+        c for c in COLUMNS
+        if c not in ("id", "custom_settings", "version")
+        and getattr(old, c) != getattr(new, c)
+    )
+    params: dict[str, Any] = {c: getattr(new, c) for c in columns}
+    settings: Literal["keys", "replace"] | None = None
+    new_settings = new.custom_settings
+    if new_settings != old_settings:
+        if old_settings is None or new_settings is None:
+            settings = "replace"
+            params["custom_settings"] = new_settings
+        else:
+            settings = "keys"
+            params["settings_set"] = json.dumps({
+                k: v for k, v in new_settings.items()
+                if k not in old_settings or old_settings[k] != v
+            })
+            params["settings_removed"] = [
+                k for k in old_settings if k not in new_settings
+            ]
+    if not columns and settings is None:
+        return None
+    params["id"] = new.id
+    params["version"] = new.version
+    return _partial_update_stmt(columns, settings, check_version), params
+
 
 class SmartDeviceRepositorySQL(SmartDeviceRepositoryProtocol):
+    """
+    SmartDevice repository with dirty-field updates.
+
+    Devices read or created through an instance are remembered as
+    snapshots; `update` then writes only the columns that changed since
+    (and only the changed `custom_settings` keys). Leaving unchanged
+    columns out of the SET list keeps the old TOAST value of
+    `custom_settings` and lets Postgres do HOT updates when no indexed
+    column changed, which is what keeps frequent battery or status ticks
+    cheap. Devices without a snapshot get a full-row UPDATE.
+
+    Updates are compare-and-swap on the `version` column: they only apply
+    if the row is still at the version of the entity passed in, and raise
+    ConcurrentUpdateError otherwise, so concurrent writers need no row
+    locks (see `UnitOfWork.retry`). With ``check_version=False`` they
+    apply whatever the stored version, like home and role updates without
+    a `version`; use it for writes that hold a row lock or may overwrite
+    concurrent changes.
+    """
+
+    # create_many switches from executemany to COPY at this batch size.
+    COPY_THRESHOLD = 1000
+    # Rows per keyset page (or per server-side cursor fetch) in list_by_home.
+    PAGE_SIZE = 500
+
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+        self._snapshots: dict[
+            uuid.UUID, tuple[SmartDeviceEntity, dict[str, Any] | None]
+        ] = {}
+        # Devices whose home may have changed, for permission invalidation.
+        # New devices are not tracked: nobody can have cached them yet.
+        self.changed_devices: set[uuid.UUID] = set()
+
+    def remember(self, dm: SmartDeviceEntity) -> None:
+        """Use `dm` as the stored state of the device for dirty-field updates."""
+        # Entities are frozen, but custom_settings is a mutable dict.
+        self._snapshots[dm.id] = (dm, copy.deepcopy(dm.custom_settings))
+
+    def _forget(self, dms: Sequence[SmartDeviceEntity]) -> None:
+        for dm in dms:
+            self._snapshots.pop(dm.id, None)
 
     async def create(self, dm: SmartDeviceEntity) -> uuid.UUID:
-        stmt = text(
-            """
-            INSERT INTO smart_devices (
-                id, home_id, name, type, location, serial_number,
-                manufacturer, model, firmware_version, is_active,
-                registered_at, last_seen, custom_settings,
-                ip_address, mac_address, battery_level,
-                connectivity, status, last_error, updated_at
-            )
-            VALUES (
-                :id, :home_id, :name, :type, :location, :serial_number,
-                :manufacturer, :model, :firmware_version, :is_active,
-                :registered_at, :last_seen, :custom_settings,
-                :ip_address, :mac_address, :battery_level,
-                :connectivity, :status, :last_error, :updated_at
-            )
-            """
-        )
         try:
-            await self.session.execute(stmt, asdict(dm))
+            await self.session.execute(INSERT_STMT, _params(dm))
+            self.remember(dm)
             return dm.id
         except IntegrityError as e:
             raise EntityAlreadyExistsError("SmartDevice already exists") from e
@@ -57,7 +253,7 @@ class SmartDeviceRepositorySQL(SmartDeviceRepositoryProtocol):
         name: str | None = None,
         lock: Literal["update", "no_key_update", "share", "key_share"] | None = None,
     ) -> SmartDeviceEntity | None:
-        query = "SELECT * FROM smart_devices WHERE "
+        query = f"{SMART_DEVICE.select} WHERE "
         params: dict[str, Any] = {}
         if id is not None:
             query += "id = :id"
@@ -84,48 +280,244 @@ class SmartDeviceRepositorySQL(SmartDeviceRepositoryProtocol):
             elif lock == "key_share":
                 query += " FOR KEY SHARE"
         try:
-            result = await self.session.execute(text(query), params)
-            row = result.mappings().first()
-            return None if row is None else SmartDeviceEntity(**row)
+            result = await self.session.execute(
+                text(query).execution_options(replica=lock is None), params
+            )
+            row = result.first()
+            if row is None:
+                return None
+            dm = SMART_DEVICE.from_row(row)
+            self.remember(dm)
+            return dm
         except SQLAlchemyError as e:
             raise DomainError("Database error while reading SmartDevice") from e
 
-    async def update(self, dm: SmartDeviceEntity) -> None:
-        stmt = text(
-            """
-            UPDATE smart_devices
-            SET home_id = :home_id,
-                name = :name,
-                type = :type,
-                location = :location,
-                serial_number = :serial_number,
-                manufacturer = :manufacturer,
-                model = :model,
-                firmware_version = :firmware_version,
-                is_active = :is_active,
-                registered_at = :registered_at,
-                last_seen = :last_seen,
-                custom_settings = :custom_settings,
-                ip_address = :ip_address,
-                mac_address = :mac_address,
-                battery_level = :battery_level,
-                connectivity = :connectivity,
-                status = :status,
-                last_error = :last_error,
-                updated_at = :updated_at
-            WHERE id = :id
-            """
-        )
+    async def list_by_home(
+        self,
+        home_id: uuid.UUID,
+        *,
+        columns: Sequence[str] | None = None,
+        page_size: int = PAGE_SIZE,
+        after: tuple[str, uuid.UUID] | None = None,
+        server_side: bool = False,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over the devices of a home ordered by `(name, id)`.
+
+        Devices are fetched in keyset pages of `page_size` rows, so each
+        page is a short indexed query and no transaction-long cursor is
+        held while the caller processes them. With `server_side=True` a
+        single query is streamed through a server-side cursor instead,
+        which avoids re-planning per page for very large homes but keeps
+        the cursor open until the iterator is exhausted or closed.
+
+        Listed devices are not remembered for dirty-field updates.
+
+        Parameters
+        ----------
+        home_id : uuid.UUID
+            Home whose devices are listed.
+        columns : Sequence[str] | None
+            Columns to fetch. If given, dicts with these columns (plus `id`
+            and `name`, which the keyset needs) are yielded instead of
+            entities.
+        page_size : int
+            Rows per page or per cursor fetch.
+        after : tuple[str, uuid.UUID] | None
+            `(name, id)` of the last device already seen, to resume
+            listing after it.
+        server_side : bool
+            Stream through a server-side cursor instead of keyset pages.
+
+        Raises
+        ------
+        ValueError
+            If `columns` contains an unknown column.
+        DomainError
+            If the database query fails.
+        """
+        convert: Callable[[Any], Any]
+        if columns is None:
+            selected = COLUMNS
+            convert = SMART_DEVICE.from_row
+        else:
+            unknown = set(columns).difference(COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown SmartDevice columns: {sorted(unknown)}")
+            selected = tuple(dict.fromkeys(("id", "name", *columns)))
+
+            def convert(row: Any) -> dict[str, Any]:
+                return dict(zip(selected, row))
+
+        params: dict[str, Any] = {"home_id": home_id}
+        if after is not None:
+            params["after_name"], params["after_id"] = after
+
+        if server_side:
+            stmt = _list_stmt(selected, after is not None, False)
+            try:
+                result = await self.session.stream(
+                    stmt.execution_options(yield_per=page_size), params
+                )
+            except SQLAlchemyError as e:
+                raise DomainError("Database error while listing SmartDevices") from e
+            try:
+                async for row in result:
+                    yield convert(row)
+            except SQLAlchemyError as e:
+                raise DomainError("Database error while listing SmartDevices") from e
+            finally:
+                await result.close()
+            return
+
+        params["limit"] = page_size
+        name_at, id_at = selected.index("name"), selected.index("id")
+        stmt = _list_stmt(selected, after is not None, True)
+        while True:
+            try:
+                rows = (await self.session.execute(stmt, params)).all()
+            except SQLAlchemyError as e:
+                raise DomainError("Database error while listing SmartDevices") from e
+            for row in rows:
+                yield convert(row)
+            if len(rows) < page_size:
+                return
+            last = rows[-1]
+            params["after_name"], params["after_id"] = last[name_at], last[id_at]
+            stmt = _list_stmt(selected, True, True)
+
+    async def update(
+        self, dm: SmartDeviceEntity, *, check_version: bool = True
+    ) -> SmartDeviceEntity:
+        """
+        Update a device, by default only if it is still at `dm.version`.
+
+        Returns the device as stored, with its new version.
+
+        Raises
+        ------
+        ConcurrentUpdateError
+            If `check_version` is set and the device has been changed since
+            `dm` was read.
+        EntityNotFoundError
+            If the device does not exist.
+        """
+        snapshot = self._snapshots.get(dm.id)
+        if snapshot is None:
+            stmt, params = _update_stmt(check_version, True), _params(dm)
+            moved = True
+        else:
+            diff = _diff(*snapshot, dm, check_version)
+            if diff is None:
+                return dm
+            stmt, params = diff
+            moved = snapshot[0].home_id != dm.home_id
         try:
-            result = await self.session.execute(stmt, asdict(dm))
-            if getattr(result, "rowcount", 0) == 0:
+            result = await self.session.execute(stmt, params)
+            version = result.scalar_one_or_none()
+            if version is None:
+                if check_version and await self._count([dm.id]):
+                    raise ConcurrentUpdateError("SmartDevice was changed concurrently")
                 raise EntityNotFoundError("SmartDevice not found for update")
-        except EntityNotFoundError:
+            stored = replace(dm, version=version)
+            self.remember(stored)
+            if moved:
+                self.changed_devices.add(dm.id)
+            return stored
+        except (EntityNotFoundError, EntityUpdateError):
             raise
         except SQLAlchemyError as e:
             raise EntityUpdateError("Error updating SmartDevice") from e
 
+    async def _count(self, ids: Sequence[uuid.UUID]) -> int:
+        result = await self.session.execute(
+            text("SELECT count(*) FROM smart_devices WHERE id = ANY(:ids)"),
+            {"ids": list(ids)},
+        )
+        return result.scalar_one()
+
+    async def create_many(self, dms: Sequence[SmartDeviceEntity]) -> list[uuid.UUID]:
+        """
+        Insert devices in one round trip.
+
+        Batches below `COPY_THRESHOLD` are sent as a pipelined executemany,
+        larger ones are streamed with COPY.
+        """
+        if not dms:
+            return []
+        if len(dms) >= self.COPY_THRESHOLD:
+            await self._copy(dms)
+            return [dm.id for dm in dms]
+        try:
+            await self.session.execute(INSERT_STMT, [_params(dm) for dm in dms])
+            return [dm.id for dm in dms]
+        except IntegrityError as e:
+            raise EntityAlreadyExistsError("SmartDevice already exists") from e
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while creating SmartDevices") from e
+
+    async def _copy(self, dms: Sequence[SmartDeviceEntity]) -> None:
+        try:
+            await copy_rows(self.session, COPY_STMT, map(_copy_row, dms))
+        except PsycopgIntegrityError as e:
+            raise EntityAlreadyExistsError("SmartDevice already exists") from e
+        except (PsycopgError, SQLAlchemyError) as e:
+            raise DomainError("Database error while copying SmartDevices") from e
+
+    async def upsert_many(self, dms: Sequence[SmartDeviceEntity]) -> None:
+        """
+        Insert devices or overwrite existing ones with the same id.
+
+        `registered_at` of existing devices is preserved.
+        """
+        if not dms:
+            return
+        self._forget(dms)
+        try:
+            await self.session.execute(UPSERT_STMT, [_params(dm) for dm in dms])
+            self.changed_devices.update(dm.id for dm in dms)
+        except IntegrityError as e:
+            raise EntityAlreadyExistsError(
+                "SmartDevice conflicts with another device"
+            ) from e
+        except SQLAlchemyError as e:
+            raise DomainError("Database error while upserting SmartDevices") from e
+
+    async def update_many(
+        self, dms: Sequence[SmartDeviceEntity], *, check_version: bool = True
+    ) -> None:
+        """
+        Update existing devices in one round trip.
+
+        Unless `check_version` is False, each device must still be at its
+        `version`. Raises EntityNotFoundError if any of them does not
+        exist, and ConcurrentUpdateError if any of them was changed since
+        it was read.
+        """
+        if not dms:
+            return
+        self._forget(dms)
+        try:
+            result = await self.session.execute(
+                _update_stmt(check_version, False), [_params(dm) for dm in dms]
+            )
+            if getattr(result, "rowcount", len(dms)) < len(dms):
+                if (
+                    check_version
+                    and await self._count([dm.id for dm in dms]) == len(dms)
+                ):
+                    raise ConcurrentUpdateError(
+                        "SmartDevices were changed concurrently"
+                    )
+                raise EntityNotFoundError("SmartDevice not found for update")
+            self.changed_devices.update(dm.id for dm in dms)
+        except (EntityNotFoundError, EntityUpdateError):
+            raise
+        except SQLAlchemyError as e:
+            raise EntityUpdateError("Error updating SmartDevices") from e
+
     async def delete(self, id: uuid.UUID) -> None:
+        self._snapshots.pop(id, None)
         stmt = text("""
             DELETE FROM smart_devices 
             WHERE id = :id
@@ -134,6 +526,7 @@ class SmartDeviceRepositorySQL(SmartDeviceRepositoryProtocol):
             result = await self.session.execute(stmt, {"id": id})
             if getattr(result, "rowcount", 0) == 0:
                 raise EntityNotFoundError("SmartDevice not found for delete")
+            self.changed_devices.add(id)
         except EntityNotFoundError:
             raise
         except SQLAlchemyError as e:
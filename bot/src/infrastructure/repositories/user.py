@@ -10,6 +10,7 @@ from domain.errors import (
     EntityNotFoundError,
     EntityUpdateError,
 )
+from infrastructure.repositories.mappers import TELEGRAM_USER
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -40,17 +41,11 @@ class TelegramUserRepositorySQL(TelegramUserRepositoryProtocol):
                 :last_name
             )
             """
-        )
+        ).execution_options(pipeline=True)
         try:
             await self.session.execute(
                 stmt,
-                {
-                    "id": dm.id,
-                    "telegram_id": dm.telegram_id,
-                    "username": dm.username,
-                    "first_name": dm.first_name,
-                    "last_name": dm.last_name,
-                },
+                TELEGRAM_USER.to_params(dm),
             )
             return dm.id
         except IntegrityError as e:
@@ -70,22 +65,13 @@ class TelegramUserRepositorySQL(TelegramUserRepositoryProtocol):
     ) -> TelegramUserEntity | None:
         params: dict[str, Any] = {}
         if id is not None:
-            query = """
-                SELECT * FROM telegram_users 
-                WHERE id = :id
-            """
+            query = f"{TELEGRAM_USER.select} WHERE id = :id"
             params["id"] = id
         elif telegram_id is not None:
-            query = """
-                SELECT * FROM telegram_users 
-                WHERE telegram_id = :telegram_id
-            """
+            query = f"{TELEGRAM_USER.select} WHERE telegram_id = :telegram_id"
             params["telegram_id"] = telegram_id
         elif username is not None:
-            query = """
-                SELECT * FROM telegram_users 
-                WHERE username = :username
-            """
+            query = f"{TELEGRAM_USER.select} WHERE username = :username"
             params["username"] = username
         else:
             raise ValueError("You must specify at least one unique key.")
@@ -99,11 +85,11 @@ class TelegramUserRepositorySQL(TelegramUserRepositoryProtocol):
             elif lock == "key_share":
                 query += " FOR KEY SHARE"
         try:
-            result = await self.session.execute(text(query), params)
-            row = result.mappings().first()
-            if row is None:
-                return None
-            return TelegramUserEntity(**row)
+            result = await self.session.execute(
+                text(query).execution_options(replica=lock is None), params
+            )
+            row = result.first()
+            return None if row is None else TELEGRAM_USER.from_row(row)
         except SQLAlchemyError as e:
             raise DomainError("Database error while reading user") from e
 
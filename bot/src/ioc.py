@@ -1,25 +1,61 @@
-from typing import Any, AsyncIterable
-from uuid import UUID, uuid7  # type: ignore[attr-defined]
+import logging
+from typing import AsyncIterable, Callable
+from uuid import uuid7  # type: ignore[attr-defined]
 
 from aiogram import Bot, Router
-from aiogram.types import Chat, Message, User
+from aiogram.types import Chat, User
 from application import interfaces
+from application.interactors import (
+    FirstTouchInteractor,
+    TextCommandInteractor,
+    VoiceCommandInteractor,
+)
 from config import Config
-from controllers.middleware import DomainErrorMiddleware
+from controllers.middleware import DomainErrorMiddleware, ThrottlingMiddleware
 from dishka import AnyOf, Provider, Scope, from_context, provide
 from dishka.integrations.aiogram import AiogramMiddlewareData
 from faststream.rabbit import RabbitBroker, RabbitRouter
-from infrastructure.adapters.postgres import new_session_maker
+from infrastructure.adapters.admission import QueueDepthAdmissionController
+from infrastructure.adapters.command_log import (
+    BufferedCommandLogWriter,
+    CommandLogRetention,
+)
+from infrastructure.adapters.entity_cache import EntityCache
+from infrastructure.adapters.outbox import OutboxRelay
+from infrastructure.adapters.permissions import CachedPermissionResolver
+from infrastructure.adapters.pool_monitor import PoolMonitor
+from infrastructure.adapters.postgres import (
+    LazySession,
+    PipelinedSession,
+    dispose_engines,
+    new_session_maker,
+    pool_stats,
+)
+from infrastructure.adapters.rate_limiter import RedisTokenBucketLimiter
 from infrastructure.adapters.redis import new_redis_client
+from infrastructure.adapters.reply_scheduler import ReplyScheduler
+from infrastructure.adapters.telemetry import (
+    BufferedTelemetryWriter,
+    TelemetryMaintenance,
+)
 from infrastructure.adapters.uow import UnitOfWork
+from infrastructure.repositories.cached import (
+    CachedHomeRepository,
+    CachedHomeUserRoleRepository,
+    CachedSmartDeviceRepository,
+)
 from infrastructure.repositories.home import HomeRepositorySQL
 from infrastructure.repositories.home_user_role import HomeUserRoleRepositorySQL
 from infrastructure.repositories.message_cache import MessageCacheRepository
+from infrastructure.repositories.outbox import OutboxRepositorySQL
+from infrastructure.repositories.permission import PermissionRepositorySQL
 from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
 from infrastructure.repositories.user import TelegramUserRepositorySQL
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+logger = logging.getLogger(__name__)
+
 
 class BotProvider(Provider):
     config = from_context(provides=Config, scope=Scope.APP)
@@ -33,14 +69,17 @@ class BotProvider(Provider):
             self,
             middleware_data: AiogramMiddlewareData,
     ) -> Chat | None:
-        return middleware_data.get("chat")
+        return middleware_data.get("event_chat")
 
-    @provide(scope=Scope.REQUEST) 
-    async def get_user(self, message: Message) -> User | None: 
-        return message.from_user
+    @provide(scope=Scope.REQUEST)
+    async def get_user(
+            self,
+            middleware_data: AiogramMiddlewareData,
+    ) -> User | None:
+        return middleware_data.get("event_from_user")
 
     @provide(scope=Scope.REQUEST)
-    async def get_redis_conn(self, config: Config) -> AsyncIterable[Redis[Any]]:
+    async def get_redis_conn(self, config: Config) -> AsyncIterable[Redis]:
         conn = new_redis_client(config.redis)
         try:
             yield conn
@@ -48,41 +87,226 @@ class BotProvider(Provider):
             await conn.close()
 
     @provide(scope=Scope.APP)
-    def get_session_maker(self, config: Config) -> async_sessionmaker[AsyncSession]:
-        return new_session_maker(config.postgres)
+    async def get_reply_scheduler(
+        self, bot: Bot, config: Config
+    ) -> AsyncIterable[AnyOf[ReplyScheduler, interfaces.ReplySenderProtocol]]:
+        scheduler = ReplyScheduler(
+            bot,
+            global_rate=config.bot.global_rate,
+            chat_interval=config.bot.chat_interval,
+        )
+        await scheduler.start()
+        try:
+            yield scheduler
+        finally:
+            await scheduler.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_admission_controller(
+        self, broker: RabbitBroker, config: Config
+    ) -> AsyncIterable[
+        AnyOf[QueueDepthAdmissionController, interfaces.AdmissionControllerProtocol]
+    ]:
+        controller = QueueDepthAdmissionController(broker, config.admission)
+        await controller.start()
+        try:
+            yield controller
+        finally:
+            await controller.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_rate_limiter(
+        self, config: Config
+    ) -> AsyncIterable[interfaces.RateLimiterProtocol]:
+        conn = new_redis_client(config.redis)
+        try:
+            yield RedisTokenBucketLimiter(conn, config.throttle)
+        finally:
+            await conn.close()
+
+    @provide(scope=Scope.APP)
+    def get_throttling_middleware(
+        self, limiter: interfaces.RateLimiterProtocol, config: Config
+    ) -> ThrottlingMiddleware:
+        return ThrottlingMiddleware(limiter, config.throttle)
+
+    @provide(scope=Scope.APP)
+    async def get_session_maker(
+        self, config: Config
+    ) -> AsyncIterable[async_sessionmaker[AsyncSession]]:
+        session_maker = new_session_maker(config.postgres)
+        try:
+            yield session_maker
+        finally:
+            for stats in pool_stats(session_maker):
+                logger.info("Connection pool: %s", stats)
+            await dispose_engines(session_maker)
+
+    @provide(scope=Scope.APP)
+    async def get_pool_monitor(
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[PoolMonitor]:
+        monitor = PoolMonitor(session_maker, config.pool_monitor)
+        await monitor.start()
+        try:
+            yield monitor
+        finally:
+            await monitor.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_telemetry_writer(
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[
+        AnyOf[BufferedTelemetryWriter, interfaces.TelemetryWriterProtocol]
+    ]:
+        writer = BufferedTelemetryWriter(session_maker, config.telemetry)
+        await writer.start()
+        try:
+            yield writer
+        finally:
+            await writer.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_telemetry_maintenance(
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[TelemetryMaintenance]:
+        maintenance = TelemetryMaintenance(session_maker, config.telemetry)
+        await maintenance.start()
+        try:
+            yield maintenance
+        finally:
+            await maintenance.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_command_log_writer(
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[
+        AnyOf[BufferedCommandLogWriter, interfaces.CommandLogWriterProtocol]
+    ]:
+        writer = BufferedCommandLogWriter(session_maker, config.command_log)
+        await writer.start()
+        try:
+            yield writer
+        finally:
+            await writer.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_command_log_retention(
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[CommandLogRetention]:
+        retention = CommandLogRetention(session_maker, config.command_log)
+        await retention.start()
+        try:
+            yield retention
+        finally:
+            await retention.stop()
 
     @provide(scope=Scope.REQUEST)
     async def get_session(
-        self, session_maker: async_sessionmaker[AsyncSession]
-    ) -> AsyncIterable[AnyOf[AsyncSession, interfaces.SessionProtocol]]:
-        async with session_maker() as session:
+        self, session_maker: async_sessionmaker[AsyncSession], config: Config
+    ) -> AsyncIterable[AnyOf[LazySession, interfaces.SessionProtocol]]:
+        if config.postgres.pipeline:
+            session = PipelinedSession(session_maker)
+        else:
+            session = LazySession(session_maker)
+        try:
             yield session
+        finally:
+            await session.close()
 
-    @provide(interfaces.UUIDGenerator, scope=Scope.APP)
-    def get_uuid(self) -> UUID:
-        return uuid7()
+    @provide(scope=Scope.APP)
+    def get_uuid(self) -> interfaces.UUIDGenerator:
+        return uuid7
 
     message_cache_repo = provide(
         source=MessageCacheRepository,
-        scope=Scope.APP,
+        scope=Scope.REQUEST,
         provides=interfaces.MessageCacheProtocol
     )
 
-    @provide(interfaces.TelegramUserRepositoryProtocol, scope=Scope.REQUEST)
-    def get_user_repo(self) -> type[TelegramUserRepositorySQL]:
+    @provide(scope=Scope.APP)
+    def get_user_repo(self) -> Callable[
+        [interfaces.SessionProtocol], interfaces.TelegramUserRepositoryProtocol
+    ]:
         return TelegramUserRepositorySQL
 
-    @provide(interfaces.HomeUserRoleRepositoryProtocol, scope=Scope.REQUEST)
-    def get_home_user_role_repo(self) -> type[HomeUserRoleRepositorySQL]:
-        return HomeUserRoleRepositorySQL
+    @provide(scope=Scope.APP)
+    async def get_entity_cache(self, config: Config) -> AsyncIterable[EntityCache]:
+        cache = EntityCache(config.postgres, config.entity_cache)
+        await cache.start()
+        try:
+            yield cache
+        finally:
+            await cache.stop()
 
-    @provide(interfaces.HomeRepositoryProtocol, scope=Scope.REQUEST)
-    def get_home_repo(self) -> type[HomeRepositorySQL]:
-        return HomeRepositorySQL
-    
-    @provide(interfaces.SmartDeviceRepositoryProtocol, scope=Scope.REQUEST)
-    def get_smart_device_repo(self) -> type[SmartDeviceRepositorySQL]:
-        return SmartDeviceRepositorySQL
+    @provide(scope=Scope.APP)
+    def get_home_user_role_repo(self, cache: EntityCache) -> Callable[
+        [interfaces.SessionProtocol], interfaces.HomeUserRoleRepositoryProtocol
+    ]:
+        return lambda session: CachedHomeUserRoleRepository(
+            HomeUserRoleRepositorySQL(session), cache  # type: ignore[arg-type]
+        )
+
+    @provide(scope=Scope.APP)
+    def get_home_repo(self, cache: EntityCache) -> Callable[
+        [interfaces.SessionProtocol], interfaces.HomeRepositoryProtocol
+    ]:
+        return lambda session: CachedHomeRepository(
+            HomeRepositorySQL(session), cache  # type: ignore[arg-type]
+        )
+
+    @provide(scope=Scope.APP)
+    def get_smart_device_repo(self, cache: EntityCache) -> Callable[
+        [interfaces.SessionProtocol], interfaces.SmartDeviceRepositoryProtocol
+    ]:
+        return lambda session: CachedSmartDeviceRepository(
+            SmartDeviceRepositorySQL(session), cache  # type: ignore[arg-type]
+        )
+
+    @provide(scope=Scope.APP)
+    def get_outbox_repo(self) -> Callable[
+        [interfaces.SessionProtocol], interfaces.OutboxRepositoryProtocol
+    ]:
+        return OutboxRepositorySQL
+
+    @provide(scope=Scope.APP)
+    async def get_outbox_relay(
+        self,
+        session_maker: async_sessionmaker[AsyncSession],
+        broker: RabbitBroker,
+        config: Config,
+    ) -> AsyncIterable[OutboxRelay]:
+        relay = OutboxRelay(session_maker, broker, config.postgres, config.outbox)
+        await relay.start()
+        try:
+            yield relay
+        finally:
+            await relay.stop()
+
+    @provide(scope=Scope.APP)
+    def get_permission_repo(self) -> Callable[
+        [interfaces.SessionProtocol], interfaces.PermissionRepositoryProtocol
+    ]:
+        return PermissionRepositorySQL
+
+    @provide(scope=Scope.APP)
+    async def get_permission_cache(
+        self,
+        config: Config,
+        repository: Callable[
+            [interfaces.SessionProtocol], interfaces.PermissionRepositoryProtocol
+        ],
+    ) -> AsyncIterable[
+        AnyOf[CachedPermissionResolver, interfaces.PermissionCacheProtocol]
+    ]:
+        conn = new_redis_client(config.redis)
+        resolver = CachedPermissionResolver(conn, repository, config.permissions)
+        await resolver.start()
+        try:
+            yield resolver
+        finally:
+            await resolver.stop()
+            await conn.close()
 
     uow_adapter = provide(
         source=UnitOfWork, 
@@ -90,6 +314,21 @@ class BotProvider(Provider):
         provides=interfaces.UnitOfWorkProtocol
     )
 
+    first_touch_interactor = provide(
+        source=FirstTouchInteractor,
+        scope=Scope.REQUEST
+    )
+
+    voice_command_interactor = provide(
+        source=VoiceCommandInteractor,
+        scope=Scope.REQUEST
+    )
+
+    text_command_interactor = provide(
+        source=TextCommandInteractor,
+        scope=Scope.REQUEST
+    )
+
     error_midleware = provide(
         source=DomainErrorMiddleware,
         scope=Scope.APP
@@ -1,7 +1,15 @@
 import asyncio
+import logging
 
 from aiogram import Bot, Dispatcher, Router
 from config import Config
+from controllers.amqp_bot import BotControllers
+from controllers.middleware import DomainErrorMiddleware, ThrottlingMiddleware
+from controllers.profiling import (
+    UpdateProfiler,
+    instrument_dispatcher,
+    profiled_inject,
+)
 from dishka import make_async_container
 from dishka.integrations.aiogram import (
     AiogramProvider,
@@ -12,7 +20,12 @@ from dishka.integrations.aiogram import (
 from dishka.integrations.faststream import FastStreamProvider
 from dishka.integrations.faststream import setup_dishka as faststream_setup
 from faststream.rabbit import RabbitBroker, RabbitRouter
+from infrastructure.adapters.admission import QueueDepthAdmissionController
+from infrastructure.adapters.command_log import CommandLogRetention
+from infrastructure.adapters.outbox import OutboxRelay
+from infrastructure.adapters.pool_monitor import PoolMonitor
 from infrastructure.adapters.rabbit import new_broker
+from infrastructure.adapters.telemetry import TelemetryMaintenance
 from ioc import BotProvider
 
 bot_router = Router()
@@ -21,6 +34,7 @@ config = Config()
 bot = Bot(token=config.bot.token)
 broker = new_broker(config.rabbit)
 dp = Dispatcher()
+logger = logging.getLogger(__name__)
 
 
 async def main(
@@ -44,12 +58,41 @@ async def main(
             Bot: bot
         },
     )
-    aiogram_setup(container=container, router=dp, auto_inject=True)
+    BotControllers(
+        amqp_router=amqp_router,
+        bot_router=bot_router,
+        bot=bot,
+        midleware=await container.get(DomainErrorMiddleware),
+        throttling=await container.get(ThrottlingMiddleware),
+    )
+    await container.get(PoolMonitor)
+    await container.get(TelemetryMaintenance)
+    await container.get(CommandLogRetention)
+    profiler = UpdateProfiler() if config.bot.profile else None
+    aiogram_setup(
+        container=container,
+        router=dp,
+        auto_inject=True if profiler is None else profiled_inject(profiler),
+    )
+    if profiler is not None:
+        instrument_dispatcher(dp, profiler)
     faststream_setup(container=container, broker=broker, auto_inject=True)
+    relay: OutboxRelay | None = None
+    admission: QueueDepthAdmissionController | None = None
     try:
         await broker.start()
+        # Started after the broker, which they publish through and poll.
+        relay = await container.get(OutboxRelay)
+        admission = await container.get(QueueDepthAdmissionController)
         await dp.start_polling(bot)
     finally:
+        if profiler is not None:
+            logger.info("Per-update overhead:\n%s", profiler.format_report())
+        # And stopped before it; closing the container stops them again.
+        if relay is not None:
+            await relay.stop()
+        if admission is not None:
+            await admission.stop()
         await broker.stop()
         await container.close()
         await bot.session.close()
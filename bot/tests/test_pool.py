@@ -0,0 +1,114 @@
+import asyncio
+from typing import Callable
+
+import pytest
+from infrastructure.adapters.pool import InstrumentedPool
+from sqlalchemy import exc
+from sqlalchemy.pool import PoolProxiedConnection
+from sqlalchemy.util import greenlet_spawn
+
+
+class FakeConnection:
+    closed = 0
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        FakeConnection.closed += 1
+
+
+@pytest.fixture(autouse=True)
+def reset_closed() -> None:
+    FakeConnection.closed = 0
+
+
+def run(scenario: Callable[[], None]) -> None:
+    # AsyncAdaptedQueuePool waits on an asyncio queue from a greenlet, as
+    # it does under an AsyncEngine.
+    asyncio.run(greenlet_spawn(scenario))
+
+
+def new_pool(size: int, max_overflow: int) -> InstrumentedPool:
+    return InstrumentedPool(
+        FakeConnection, pool_size=size, max_overflow=max_overflow, timeout=0.01
+    )
+
+
+def checkout(pool: InstrumentedPool, count: int) -> list[PoolProxiedConnection]:
+    return [pool.connect() for _ in range(count)]
+
+
+def assert_limit_reached(pool: InstrumentedPool) -> None:
+    timeouts = pool.timeouts
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+    assert pool.timeouts == timeouts + 1
+
+
+def test_resize_up_raises_the_checkout_limit() -> None:
+    def scenario() -> None:
+        pool = new_pool(2, 1)
+        held = checkout(pool, 3)
+        assert_limit_reached(pool)
+
+        pool.resize(4)
+        assert pool.size() == 4
+        assert pool.overflow() == -1
+        held += checkout(pool, 2)
+        assert pool.checkedout() == 5
+        assert_limit_reached(pool)
+
+        for conn in held:
+            conn.close()
+        assert pool.checkedin() == 4
+        assert pool.overflow() == 0
+        assert FakeConnection.closed == 1
+
+    run(scenario)
+
+
+def test_resize_down_closes_idle_connections() -> None:
+    def scenario() -> None:
+        pool = new_pool(4, 1)
+        for conn in checkout(pool, 4):
+            conn.close()
+        assert pool.checkedin() == 4
+
+        pool.resize(1)
+        assert pool.size() == 1
+        assert pool.checkedin() == 1
+        assert pool.overflow() == 0
+        assert FakeConnection.closed == 3
+        held = checkout(pool, 2)
+        assert_limit_reached(pool)
+
+        for conn in held:
+            conn.close()
+        assert pool.checkedin() == 1
+        assert pool.overflow() == 0
+
+    run(scenario)
+
+
+def test_resize_down_with_connections_checked_out() -> None:
+    def scenario() -> None:
+        pool = new_pool(4, 1)
+        held = checkout(pool, 4)
+
+        pool.resize(2)
+        assert pool.size() == 2
+        assert pool.overflow() == 2
+        assert_limit_reached(pool)
+
+        for conn in held:
+            conn.close()
+        assert pool.checkedin() == 2
+        assert pool.overflow() == 0
+        assert FakeConnection.closed == 2
+        held = checkout(pool, 3)
+        assert_limit_reached(pool)
+        for conn in held:
+            conn.close()
+
+    run(scenario)
@@ -0,0 +1,198 @@
+"""
+Query plans and latency of the repository lookup paths.
+
+Loads synthetic homes, users, roles and devices, runs ``ANALYZE`` and then
+``EXPLAIN (ANALYZE, FORMAT JSON)`` on every lookup the repositories issue.
+Each query must stay off sequential scans of its table and within its
+latency budget. Everything runs in one transaction that is rolled back.
+
+Needs a migrated database configured through the usual ``DB_*``
+environment variables; skipped without one.
+"""
+
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+import pytest
+from config import PostgresConfig
+from domain.entities import (
+    HomeEntity,
+    HomeRole,
+    HomeUserRoleEntity,
+    SmartDeviceEntity,
+    TelegramUserEntity,
+)
+from infrastructure.adapters.postgres import dispose_engines, new_session_maker
+from infrastructure.repositories.mappers import (
+    HOME,
+    HOME_USER_ROLE,
+    SMART_DEVICE,
+    TELEGRAM_USER,
+    EntityMapper,
+)
+from infrastructure.repositories.permission import ROLE_ON_DEVICE_STMT
+from infrastructure.repositories.smart_device import SmartDeviceRepositorySQL
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+HOMES = 2000
+DEVICES_PER_HOME = 50
+
+# name -> (SQL, table that must not be sequentially scanned, budget in ms)
+QUERIES: dict[str, tuple[str, str, float]] = {
+    "device by mac_address": (
+        f"{SMART_DEVICE.select} WHERE mac_address = :mac_address",
+        "smart_devices", 1.0,
+    ),
+    "device by (home_id, name)": (
+        f"{SMART_DEVICE.select} WHERE home_id = :home_id AND name = :name",
+        "smart_devices", 1.0,
+    ),
+    "devices by home_id, first page": (
+        f"{SMART_DEVICE.select} WHERE home_id = :home_id"
+        " ORDER BY name, id LIMIT 500",
+        "smart_devices", 5.0,
+    ),
+    "devices by home_id, keyset page": (
+        f"{SMART_DEVICE.select} WHERE home_id = :home_id"
+        " AND (name, id) > (:name, :id) ORDER BY name, id LIMIT 500",
+        "smart_devices", 5.0,
+    ),
+    "role by (user_id, home_id)": (
+        "SELECT role FROM home_user_roles"
+        " WHERE user_id = :user_id AND home_id = :home_id",
+        "home_user_roles", 1.0,
+    ),
+    "permission on device": (
+        ROLE_ON_DEVICE_STMT.text, "home_user_roles", 1.0,
+    ),
+    "roles by user_id": (
+        f"{HOME_USER_ROLE.select} WHERE user_id = :user_id",
+        "home_user_roles", 1.0,
+    ),
+    "roles by home_id": (
+        f"{HOME_USER_ROLE.select} WHERE home_id = :home_id",
+        "home_user_roles", 1.0,
+    ),
+}
+
+Plan = tuple[float, list[tuple[str, str | None]]]
+
+
+def insert_stmt(mapper: EntityMapper[Any]) -> Any:
+    return text(
+        f"INSERT INTO {mapper.table} ({', '.join(mapper.columns)}) "
+        f"VALUES ({', '.join(':' + c for c in mapper.columns)})"
+    )
+
+
+async def load(
+    session: AsyncSession, homes: int, devices: int
+) -> dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    rng = random.Random(0)
+    home_rows = [HomeEntity(uuid.uuid4(), f"home-{i}", None, now) for i in range(homes)]
+    users = [
+        TelegramUserEntity(uuid.uuid4(), 10**12 + i, f"user{i}", None, None)
+        for i in range(homes * 2)
+    ]
+    roles = [
+        HomeUserRoleEntity(
+            uuid.uuid4(), home.id, users[i * 2 + j].id,
+            HomeRole.OWNER if j == 0 else HomeRole.GUEST, now,
+        )
+        for i, home in enumerate(home_rows)
+        for j in range(2)
+    ]
+    for mapper, rows in (
+        (HOME, home_rows), (TELEGRAM_USER, users), (HOME_USER_ROLE, roles)
+    ):
+        await session.execute(insert_stmt(mapper), [mapper.to_params(r) for r in rows])
+
+    def device_rows() -> Iterator[SmartDeviceEntity]:
+        for home in home_rows:
+            for i in range(devices):
+                yield SmartDeviceEntity(
+                    id=uuid.uuid4(), home_id=home.id, name=f"device-{i % 40}",
+                    type="lamp", location=None, serial_number=None,
+                    manufacturer=None, model=None, firmware_version=None,
+                    is_active=True, registered_at=now, last_seen=now,
+                    custom_settings={"brightness": i}, ip_address=None,
+                    mac_address=(
+                        f"02:00:{rng.getrandbits(32):08x}" if i % 2 else None
+                    ),
+                    battery_level=100, connectivity="wifi", status="on",
+                    last_error=None, updated_at=now,
+                )
+
+    all_devices = list(device_rows())
+    await SmartDeviceRepositorySQL(session).create_many(all_devices)
+    await session.execute(
+        text("ANALYZE homes, telegram_users, home_user_roles, smart_devices")
+    )
+    probe = next(d for d in all_devices[len(all_devices) // 2:] if d.mac_address)
+    role = roles[len(roles) // 2]
+    member = next(r for r in roles if r.home_id == probe.home_id)
+    telegram_ids = {u.id: u.telegram_id for u in users}
+    return {
+        "mac_address": probe.mac_address,
+        "home_id": probe.home_id,
+        "name": probe.name,
+        "id": probe.id,
+        "user_id": role.user_id,
+        "device_id": probe.id,
+        "telegram_id": telegram_ids[member.user_id],
+    }
+
+
+def scans(node: dict[str, Any]) -> Iterator[tuple[str, str | None]]:
+    if "Scan" in node["Node Type"]:
+        yield node["Node Type"], node.get("Relation Name")
+    for child in node.get("Plans", ()):
+        yield from scans(child)
+
+
+async def explain_all(config: PostgresConfig) -> dict[str, Plan]:
+    session_maker = new_session_maker(config)
+    plans: dict[str, Plan] = {}
+    try:
+        async with session_maker() as session:
+            params = await load(session, HOMES, DEVICES_PER_HOME)
+            for name, (sql, _, _) in QUERIES.items():
+                result = await session.execute(
+                    text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"), params
+                )
+                plan = result.scalar_one()[0]
+                plans[name] = plan["Execution Time"], list(scans(plan["Plan"]))
+            await session.rollback()
+    finally:
+        await dispose_engines(session_maker)
+    return plans
+
+
+@pytest.fixture(scope="module")
+def plans() -> dict[str, Plan]:
+    try:
+        config = PostgresConfig.model_validate(os.environ)
+    except ValidationError:
+        pytest.skip("no database configured (DB_* environment variables)")
+    return asyncio.run(explain_all(config))
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_lookup_avoids_sequential_scan(plans: dict[str, Plan], name: str) -> None:
+    _, table, _ = QUERIES[name]
+    _, nodes = plans[name]
+    assert ("Seq Scan", table) not in nodes, nodes
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_lookup_within_budget(plans: dict[str, Plan], name: str) -> None:
+    _, _, budget = QUERIES[name]
+    elapsed, nodes = plans[name]
+    assert elapsed <= budget, f"{elapsed:.3f} ms > {budget} ms: {nodes}"
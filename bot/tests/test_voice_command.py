@@ -0,0 +1,76 @@
+import asyncio
+import importlib.util
+import io
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+import pytest
+from application.dto import CommandInputDTO
+from application.interactors import VoiceCommandInteractor
+from domain.entities import AudioFileEntity, CommandLogEntity, OutboxMessageEntity
+from pydantic import TypeAdapter
+
+STT_DTO = Path(__file__).parents[2] / "stt" / "src" / "application" / "dto.py"
+
+
+class FakeOutbox:
+    def __init__(self) -> None:
+        self.messages: list[OutboxMessageEntity] = []
+
+    async def add(self, message: OutboxMessageEntity) -> None:
+        self.messages.append(message)
+
+
+class FakeUnitOfWork:
+    def __init__(self) -> None:
+        self.outbox = FakeOutbox()
+        self.committed = False
+
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.committed = exc_info[0] is None
+
+
+class FakeMessageCache:
+    def __init__(self) -> None:
+        self.saved: list[str] = []
+
+    async def save_message(self, message: AudioFileEntity) -> None:
+        self.saved.append(message.id)
+
+
+class FakeCommandLog:
+    def record(self, entry: CommandLogEntity) -> bool:
+        return True
+
+
+def stt_command_dto() -> Any:
+    if not STT_DTO.exists():
+        pytest.skip("STT service sources are not available")
+    spec = importlib.util.spec_from_file_location("stt_dto", STT_DTO)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.CommandDTO
+
+
+@pytest.mark.parametrize("chat_id", [42, None])
+def test_voice_command_payload_matches_stt_command(chat_id: int | None) -> None:
+    uow, cache = FakeUnitOfWork(), FakeMessageCache()
+    interactor = VoiceCommandInteractor(
+        uuid4, cache, FakeCommandLog(), uow  # type: ignore[arg-type]
+    )
+    asyncio.run(interactor(CommandInputDTO(
+        7, 1, chat_id, voice=io.BytesIO(b"ogg"), mime_type="audio/ogg"
+    )))
+
+    assert uow.committed
+    [message] = uow.outbox.messages
+    assert message.routing_key == "stt_command"
+    command = TypeAdapter(stt_command_dto()).validate_python(message.payload)
+    assert command.user_id == "7"
+    assert command.message_id == cache.saved[0]
+    assert command.chat_id == (None if chat_id is None else "42")
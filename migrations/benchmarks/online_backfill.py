@@ -0,0 +1,200 @@
+"""
+Chunked online backfill vs a single UPDATE on a large synthetic table.
+
+Creates ``online_backfill_bench`` with ``--rows`` rows keyed by ``uuid`` and
+holding a ``json`` settings document (the shape of ``smart_devices``), adds a
+``jsonb`` column and fills it, once with one ``UPDATE`` over the table and
+once with `OnlineMigrator.backfill`. Meanwhile a writer thread keeps
+updating random rows, as the application would. Reports the duration of
+each run and the writer's latency percentiles and worst case, which is
+what a long-held row lock costs the application.
+
+With ``--interrupt-after`` the chunked run is aborted after that many rows
+and started again, to show it resuming from its checkpoint. The table and
+the checkpoint are dropped at the end.
+
+Run from the repository root against a local database configured through
+the usual ``DB_*`` environment variables::
+
+    python -m migrations.benchmarks.online_backfill --rows 2000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+from uuid import UUID
+
+from sqlalchemy import Connection, Engine, create_engine, text
+
+from migrations.online import Backfill, BackfillProgress, OnlineMigrator
+
+TABLE = "online_backfill_bench"
+
+BACKFILL = Backfill(
+    name=TABLE,
+    table=TABLE,
+    set="settings_jsonb = custom_settings::jsonb",
+    where="settings_jsonb IS NULL",
+)
+
+
+class Interrupted(Exception):
+    pass
+
+
+class Writer(threading.Thread):
+    def __init__(self, engine: Engine, ids: list[UUID]) -> None:
+        super().__init__(daemon=True)
+        self._engine = engine
+        self._ids = ids
+        self._stopped = threading.Event()
+        self.latencies: list[float] = []
+
+    def run(self) -> None:
+        rng = random.Random(0)
+        with self._engine.connect() as conn:
+            while not self._stopped.is_set():
+                started = time.perf_counter()
+                conn.execute(
+                    text(f"UPDATE {TABLE} SET status = :status WHERE id = :id"),
+                    {"status": rng.choice(("on", "off")), "id": rng.choice(self._ids)},
+                )
+                conn.commit()
+                self.latencies.append(time.perf_counter() - started)
+                time.sleep(0.001)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+
+def create_table(engine: Engine, rows: int) -> list[UUID]:
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE TABLE {TABLE} (
+                    id UUID PRIMARY KEY,
+                    status TEXT,
+                    custom_settings JSON
+                )
+                """
+            )
+        )
+        conn.execute(
+            text(
+                f"""
+                INSERT INTO {TABLE}
+                SELECT gen_random_uuid(), 'on', json_build_object(
+                    'brightness', i % 100, 'color', 'warm', 'schedule', i % 7
+                )
+                FROM generate_series(1, :rows) i
+                """
+            ),
+            {"rows": rows},
+        )
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text(f"VACUUM ANALYZE {TABLE}"))
+        return list(
+            conn.execute(
+                text(f"SELECT id FROM {TABLE} ORDER BY random() LIMIT 10000")
+            ).scalars()
+        )
+
+
+def forget_checkpoint(conn: Connection) -> None:
+    if conn.execute(text("SELECT to_regclass('online_migrations')")).scalar():
+        conn.execute(
+            text("DELETE FROM online_migrations WHERE name = :name"),
+            {"name": BACKFILL.name},
+        )
+
+
+def reset_column(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS settings_jsonb"))
+        conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN settings_jsonb JSONB"))
+        forget_checkpoint(conn)
+
+
+def single_update(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(f"UPDATE {TABLE} SET {BACKFILL.set} WHERE {BACKFILL.where}")
+        )
+
+
+def chunked(engine: Engine, chunk_size: int, interrupt_after: int) -> None:
+    def on_progress(progress: BackfillProgress) -> None:
+        if interrupt_after and progress.rows >= interrupt_after:
+            raise Interrupted
+
+    migrator = OnlineMigrator(
+        engine, chunk_size=chunk_size, report_interval=0.0, on_progress=on_progress
+    )
+    try:
+        migrator.backfill(BACKFILL)
+    except Interrupted:
+        print(f"  interrupted after {interrupt_after} rows, resuming")
+        OnlineMigrator(engine, chunk_size=chunk_size).backfill(BACKFILL)
+
+
+def main(rows: int, chunk_size: int, interrupt_after: int) -> None:
+    engine = create_engine(
+        "postgresql+psycopg://{user}:{password}@{host}:{port}/{db}".format(
+            user=os.getenv("DB_USER"),
+            password=os.getenv("DB_PASSWORD"),
+            host=os.getenv("DB_HOST"),
+            port=os.getenv("DB_PORT"),
+            db=os.getenv("DB_NAME"),
+        )
+    )
+    ids = create_table(engine, rows)
+    print(
+        f"{'backfill':<8} {'seconds':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'max ms':>8} {'left':>6}"
+    )
+    try:
+        for name in ("single", "chunked"):
+            reset_column(engine)
+            writer = Writer(engine, ids)
+            writer.start()
+            started = time.perf_counter()
+            if name == "single":
+                single_update(engine)
+            else:
+                chunked(engine, chunk_size, interrupt_after)
+            elapsed = time.perf_counter() - started
+            writer.stop()
+            with engine.connect() as conn:
+                left = conn.execute(
+                    text(f"SELECT count(*) FROM {TABLE} WHERE {BACKFILL.where}")
+                ).scalar_one()
+            q = statistics.quantiles(writer.latencies, n=100)
+            print(
+                f"{name:<8} {elapsed:>8.1f} {q[49] * 1e3:>8.2f} "
+                f"{q[98] * 1e3:>8.2f} {max(writer.latencies) * 1e3:>8.1f} "
+                f"{left:>6}"
+            )
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+            forget_checkpoint(conn)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument(
+        "--interrupt-after", type=int, default=0,
+        help="abort the chunked run after this many rows, then resume it",
+    )
+    args = parser.parse_args()
+    main(args.rows, args.chunk_size, args.interrupt_after)
@@ -0,0 +1,388 @@
+"""
+Online schema changes for large, busy tables.
+
+Plain Alembic operations run in one transaction, so an ``UPDATE`` over a
+whole table (filling a new column, converting ``json`` to ``jsonb``)
+holds its row locks and piles up WAL until it commits, and an ``ALTER``
+waiting for its lock queues every query behind it. `OnlineMigrator`
+splits such changes up:
+
+* `ddl` runs a statement with a short ``lock_timeout`` and retries it,
+  so it never waits long at the head of the lock queue;
+* `backfill` updates a table in primary-key ranges of `chunk_size` rows,
+  one transaction each, pausing while the replicas lag behind. Every chunk
+  commits together with a checkpoint, so an interrupted backfill resumes
+  after the last committed range.
+
+The usual sequence for a rewrite, e.g. ``custom_settings`` to ``jsonb``::
+
+    def upgrade() -> None:
+        op.add_column("smart_devices", sa.Column("settings_jsonb", JSONB))
+        with op.get_context().autocommit_block():
+            migrator = OnlineMigrator(op.get_bind().engine)
+            migrator.backfill(
+                Backfill(
+                    name="smart_devices_settings_jsonb",
+                    table="smart_devices",
+                    set="settings_jsonb = custom_settings::jsonb",
+                    where="settings_jsonb IS NULL",
+                )
+            )
+
+followed, once the application writes both columns, by a migration that
+swaps them. The ``autocommit_block`` commits Alembic's own transaction
+first, so the DDL above is not held open for the whole backfill.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from psycopg import errors as pg_errors
+from sqlalchemy import Connection, Engine, text
+from sqlalchemy.exc import DBAPIError
+
+# alembic.ini shows INFO records of the alembic logger tree.
+logger = logging.getLogger("alembic.online")
+
+CHECKPOINTS_DDL = text(
+    """
+    CREATE TABLE IF NOT EXISTS online_migrations (
+        name TEXT PRIMARY KEY,
+        last_key TEXT,
+        rows BIGINT NOT NULL DEFAULT 0,
+        started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+        finished_at TIMESTAMPTZ
+    )
+    """
+)
+
+CHECKPOINT_STMT = text(
+    "SELECT last_key, rows, finished_at FROM online_migrations WHERE name = :name"
+)
+
+SAVE_CHECKPOINT_STMT = text(
+    """
+    INSERT INTO online_migrations (name, last_key, rows)
+    VALUES (:name, :last_key, :rows)
+    ON CONFLICT (name) DO UPDATE
+    SET last_key = EXCLUDED.last_key, rows = EXCLUDED.rows, updated_at = now()
+    """
+)
+
+FINISH_STMT = text(
+    "UPDATE online_migrations SET finished_at = now() WHERE name = :name"
+)
+
+# Replay lag of the slowest streaming replica, in seconds; NULL while the
+# replicas are idle and caught up.
+REPLICATION_LAG_STMT = text(
+    """
+    SELECT COALESCE(EXTRACT(EPOCH FROM max(replay_lag)), 0)
+    FROM pg_stat_replication
+    """
+)
+
+KEY_TYPE_STMT = text(
+    """
+    SELECT format_type(atttypid, atttypmod)
+    FROM pg_attribute
+    WHERE attrelid = CAST(:table AS regclass) AND attname = :key
+    """
+)
+
+ESTIMATE_STMT = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Backfill:
+    """
+    A chunked ``UPDATE {table} SET {set} WHERE {where}``.
+
+    `name` identifies the checkpoint, so it must be unique per backfill.
+    `where` should exclude rows already done: chunks re-run after a failure
+    (or a lost checkpoint) then only touch what is left. `key` must be the
+    primary key or another unique, indexed column.
+    """
+
+    name: str
+    table: str
+    set: str
+    where: str = "TRUE"
+    key: str = "id"
+
+
+@dataclass(frozen=True, slots=True)
+class BackfillProgress:
+    name: str
+    rows: int
+    chunks: int
+    chunk_size: int
+    last_key: str | None
+    elapsed: float
+    rows_per_second: float
+    estimated_rows: int
+    replication_lag: float
+
+
+class OnlineMigrator:
+    """
+    Runs `ddl` and `backfill` changes without long locks.
+
+    Parameters
+    ----------
+    engine : Engine
+        Engine on the primary. Each chunk and each DDL attempt takes a
+        connection of its own.
+    chunk_size : int
+        Rows per backfill transaction to start with.
+    min_chunk_size, max_chunk_size : int
+        Bounds of the chunk size, which halves when a chunk takes longer
+        than `target_chunk_seconds` (or times out) and doubles when it
+        takes less than half of that.
+    target_chunk_seconds : float
+        Wanted duration of a chunk transaction.
+    pause : float
+        Sleep between chunks, in seconds, leaving room for autovacuum and
+        the regular load.
+    max_replication_lag : float
+        Chunks wait while a streaming replica lags more than this many
+        seconds behind.
+    lock_timeout : float
+        ``lock_timeout`` of DDL statements and chunks, in seconds.
+    statement_timeout : float
+        ``statement_timeout`` of a chunk, in seconds.
+    attempts : int
+        Tries of a DDL statement or a chunk that ran into `lock_timeout`
+        or `statement_timeout`, with doubling backoff.
+    report_interval : float
+        Seconds between progress reports.
+    on_progress : Callable[[BackfillProgress], None] | None
+        Called with every report instead of logging it.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        *,
+        chunk_size: int = 5_000,
+        min_chunk_size: int = 100,
+        max_chunk_size: int = 50_000,
+        target_chunk_seconds: float = 0.5,
+        pause: float = 0.05,
+        max_replication_lag: float = 5.0,
+        lock_timeout: float = 2.0,
+        statement_timeout: float = 30.0,
+        attempts: int = 10,
+        report_interval: float = 10.0,
+        on_progress: Callable[[BackfillProgress], None] | None = None,
+    ) -> None:
+        self._engine = engine
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_chunk_seconds = target_chunk_seconds
+        self.pause = pause
+        self.max_replication_lag = max_replication_lag
+        self.lock_timeout = lock_timeout
+        self.statement_timeout = statement_timeout
+        self.attempts = attempts
+        self.report_interval = report_interval
+        self._failures = 0
+        self._on_progress = on_progress or (
+            lambda progress: logger.info("Backfill progress: %s", progress)
+        )
+
+    def ddl(self, statement: str, *, transactional: bool = True) -> None:
+        """
+        Run `statement`, retrying while its lock is not granted in time.
+
+        Only the lock wait is bounded, not the statement itself. Pass
+        ``transactional=False`` for statements that cannot run in a
+        transaction block, such as ``CREATE INDEX CONCURRENTLY``; a failed
+        concurrent build leaves an INVALID index behind, which has to be
+        dropped before the statement is run again.
+        """
+        for attempt in range(self.attempts):
+            try:
+                if transactional:
+                    with self._engine.begin() as conn:
+                        self._set_timeouts(conn, local=True, statement_timeout=0)
+                        conn.execute(text(statement))
+                else:
+                    with self._engine.connect() as conn:
+                        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+                        self._set_timeouts(conn, local=False, statement_timeout=0)
+                        try:
+                            conn.execute(text(statement))
+                        finally:
+                            conn.execute(text("RESET lock_timeout"))
+                            conn.execute(text("RESET statement_timeout"))
+                return
+            except DBAPIError as e:
+                if not _timed_out(e) or attempt + 1 == self.attempts:
+                    raise
+                logger.warning("Lock not granted for %r, retrying", statement)
+                time.sleep(min(0.1 * 2**attempt, 10.0))
+
+    def backfill(self, backfill: Backfill) -> int:
+        """
+        Run `backfill` to the end of the table, resuming from its checkpoint.
+
+        Returns
+        -------
+        int
+            Rows updated over all runs of this backfill.
+        """
+        with self._engine.begin() as conn:
+            conn.execute(CHECKPOINTS_DDL)
+            checkpoint = conn.execute(
+                CHECKPOINT_STMT, {"name": backfill.name}
+            ).first()
+            key_type = conn.execute(
+                KEY_TYPE_STMT, {"table": backfill.table, "key": backfill.key}
+            ).scalar_one()
+            estimated = conn.execute(
+                ESTIMATE_STMT, {"table": backfill.table}
+            ).scalar_one()
+        last_key, rows = (checkpoint[0], checkpoint[1]) if checkpoint else (None, 0)
+        if checkpoint is not None and checkpoint[2] is not None:
+            logger.info("Backfill %s already finished", backfill.name)
+            return int(rows)
+        if last_key is not None:
+            logger.info("Resuming backfill %s after %s", backfill.name, last_key)
+
+        first_bound, next_bound, update, first_update = _chunk_statements(
+            backfill, key_type
+        )
+        started = reported = time.monotonic()
+        resumed_rows = rows
+        chunks = 0
+        lag = 0.0
+        while True:
+            lag = self._wait_for_replicas()
+            chunk_started = time.monotonic()
+            try:
+                with self._engine.begin() as conn:
+                    self._set_timeouts(
+                        conn, local=True, statement_timeout=self.statement_timeout
+                    )
+                    params: dict[str, Any] = {"size": self.chunk_size}
+                    if last_key is not None:
+                        params["after"] = last_key
+                    bound = conn.execute(
+                        first_bound if last_key is None else next_bound, params
+                    ).scalar()
+                    if bound is None:
+                        conn.execute(FINISH_STMT, {"name": backfill.name})
+                        break
+                    params["bound"] = bound
+                    result = conn.execute(
+                        first_update if last_key is None else update, params
+                    )
+                    rows += result.rowcount
+                    conn.execute(
+                        SAVE_CHECKPOINT_STMT,
+                        {"name": backfill.name, "last_key": bound, "rows": rows},
+                    )
+            except DBAPIError as e:
+                if not _timed_out(e) or not self._back_off():
+                    raise
+                continue
+            last_key = bound
+            chunks += 1
+            self._resize(time.monotonic() - chunk_started)
+            now = time.monotonic()
+            if now - reported >= self.report_interval:
+                reported = now
+                self._on_progress(
+                    BackfillProgress(
+                        name=backfill.name,
+                        rows=rows,
+                        chunks=chunks,
+                        chunk_size=self.chunk_size,
+                        last_key=last_key,
+                        elapsed=now - started,
+                        rows_per_second=(rows - resumed_rows) / (now - started),
+                        estimated_rows=estimated,
+                        replication_lag=lag,
+                    )
+                )
+            if self.pause:
+                time.sleep(self.pause)
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Backfill %s finished: %d rows in %d chunks, %.1fs",
+            backfill.name, rows, chunks, elapsed,
+        )
+        return int(rows)
+
+    def _set_timeouts(
+        self, conn: Connection, *, local: bool, statement_timeout: float
+    ) -> None:
+        scope = "LOCAL " if local else ""
+        conn.execute(
+            text(f"SET {scope}lock_timeout = '{int(self.lock_timeout * 1000)}ms'")
+        )
+        conn.execute(
+            text(f"SET {scope}statement_timeout = '{int(statement_timeout * 1000)}ms'")
+        )
+
+    def _wait_for_replicas(self) -> float:
+        while True:
+            with self._engine.connect() as conn:
+                lag = float(conn.execute(REPLICATION_LAG_STMT).scalar_one())
+            if lag <= self.max_replication_lag:
+                return lag
+            logger.info("Replication lag %.1fs, backfill waiting", lag)
+            time.sleep(min(lag, 5.0))
+
+    def _back_off(self) -> bool:
+        # Every consecutive timeout also halves the chunk, so a chunk that
+        # fits the timeouts is reached within `attempts` tries or never.
+        self._failures += 1
+        if self._failures >= self.attempts:
+            return False
+        self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+        logger.warning("Chunk timed out, retrying with %d rows", self.chunk_size)
+        time.sleep(min(0.1 * 2**self._failures, 10.0))
+        return True
+
+    def _resize(self, seconds: float) -> None:
+        self._failures = 0
+        if seconds > self.target_chunk_seconds:
+            self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+        elif seconds < self.target_chunk_seconds / 2:
+            self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+
+
+def _chunk_statements(backfill: Backfill, key_type: str) -> tuple[Any, ...]:
+    table, key = backfill.table, backfill.key
+    after = f"{key} > CAST(:after AS {key_type})"
+    # Upper key of the next chunk, read from the key's index alone. Sorted
+    # rather than max() because uuid has no max aggregate.
+    bound = (
+        f"SELECT CAST({key} AS TEXT) FROM ("
+        f"SELECT {key} FROM {table} {{}} ORDER BY {key} LIMIT :size) chunk "
+        f"ORDER BY {key} DESC LIMIT 1"
+    )
+    update = (
+        f"UPDATE {table} SET {backfill.set} "
+        f"WHERE {{}}{key} <= CAST(:bound AS {key_type}) AND ({backfill.where})"
+    )
+    return (
+        text(bound.format("")),
+        text(bound.format(f"WHERE {after}")),
+        text(update.format(f"{after} AND ")),
+        text(update.format("")),
+    )
+
+
+def _timed_out(error: DBAPIError) -> bool:
+    return isinstance(
+        error.orig, (pg_errors.LockNotAvailable, pg_errors.QueryCanceled)
+    )
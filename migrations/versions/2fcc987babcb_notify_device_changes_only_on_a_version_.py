@@ -0,0 +1,57 @@
+"""notify device changes only on a version bump
+
+The telemetry snapshot refresh rewrites the snapshot columns of many
+devices every snapshot interval without bumping their version. Every write the
+caches must see bumps it, so the smart_devices entity_changed trigger
+fires on deletes and on updates that change the version, and no longer
+on every snapshot refresh.
+
+Revision ID: 2fcc987babcb
+Revises: 45b34d83e517
+Create Date: 2026-10-19 19:55:53.567318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2fcc987babcb'
+down_revision: Union[str, Sequence[str], None] = '45b34d83e517'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS smart_devices_notify_changed ON smart_devices")
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER smart_devices_notify_deleted
+        AFTER DELETE ON smart_devices
+        FOR EACH ROW EXECUTE FUNCTION notify_entity_changed()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER smart_devices_notify_updated
+        AFTER UPDATE ON smart_devices
+        FOR EACH ROW
+        WHEN (OLD.version IS DISTINCT FROM NEW.version)
+        EXECUTE FUNCTION notify_entity_changed()
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS smart_devices_notify_updated ON smart_devices")
+    op.execute("DROP TRIGGER IF EXISTS smart_devices_notify_deleted ON smart_devices")
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER smart_devices_notify_changed
+        AFTER UPDATE OR DELETE ON smart_devices
+        FOR EACH ROW EXECUTE FUNCTION notify_entity_changed()
+        """
+    )
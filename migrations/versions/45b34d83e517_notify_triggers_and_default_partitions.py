@@ -0,0 +1,141 @@
+"""notify triggers and default partitions
+
+The NOTIFY triggers the services LISTEN to and the DEFAULT partitions of
+the partitioned tables. Autogenerate does not see any of them, so they
+live here rather than in migrations/models.py. Every statement is
+idempotent, so a database that already has some of them can be upgraded.
+
+Revision ID: 45b34d83e517
+Revises: 7b3522ac17b8
+Create Date: 2026-10-19 19:54:23.534540
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '45b34d83e517'
+down_revision: Union[str, Sequence[str], None] = '7b3522ac17b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Entity caches in the services LISTEN on this channel. NOTIFY is delivered
+# on commit, so replicas drop an entry only once the new row is visible.
+# Inserts are not notified: caches only hold rows that already existed.
+ENTITY_CHANGED_CHANNEL = "entity_changed"
+ENTITY_TABLES = ("homes", "home_user_roles", "smart_devices")
+
+# The NLU service keeps a copy of every home's device catalog and LISTENs here
+# to reload a home whose devices were added, removed, moved or renamed. The
+# payload is the home id; a device moved between homes notifies both.
+# Updates that leave the catalog columns alone (status, settings, version
+# bumps) are filtered out by the trigger's WHEN clause.
+DEVICE_CATALOG_CHANNEL = "device_catalog"
+
+# The outbox relay LISTENs here to pick up new messages without waiting for
+# its next poll. The trigger fires once per INSERT statement, and Postgres
+# folds identical notifications of a transaction into one, delivered on
+# commit.
+OUTBOX_CHANNEL = "outbox"
+
+# Daily partitions are created ahead of time by the maintenance jobs; the
+# default partition only catches rows outside the prepared range.
+PARTITIONED_TABLES = ("device_telemetry", "command_log")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_entity_changed() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{ENTITY_CHANGED_CHANNEL}', TG_TABLE_NAME || ':' || OLD.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in ENTITY_TABLES:
+        op.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER {table}_notify_changed
+            AFTER UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_entity_changed()
+            """
+        )
+
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_device_catalog() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM pg_notify('{DEVICE_CATALOG_CHANNEL}', OLD.home_id::text);
+            END IF;
+            IF TG_OP = 'INSERT'
+                OR (TG_OP = 'UPDATE' AND NEW.home_id IS DISTINCT FROM OLD.home_id) THEN
+                PERFORM pg_notify('{DEVICE_CATALOG_CHANNEL}', NEW.home_id::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER smart_devices_notify_catalog
+        AFTER INSERT OR DELETE ON smart_devices
+        FOR EACH ROW EXECUTE FUNCTION notify_device_catalog()
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER smart_devices_notify_catalog_update
+        AFTER UPDATE ON smart_devices
+        FOR EACH ROW
+        WHEN ((OLD.home_id, OLD.name, OLD.type, OLD.location, OLD.is_active)
+              IS DISTINCT FROM
+              (NEW.home_id, NEW.name, NEW.type, NEW.location, NEW.is_active))
+        EXECUTE FUNCTION notify_device_catalog()
+        """
+    )
+
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION notify_outbox() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{OUTBOX_CHANNEL}', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE TRIGGER outbox_notify
+        AFTER INSERT ON outbox
+        FOR EACH STATEMENT EXECUTE FUNCTION notify_outbox()
+        """
+    )
+
+    for table in PARTITIONED_TABLES:
+        op.execute(
+            f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in PARTITIONED_TABLES:
+        op.execute(f"DROP TABLE IF EXISTS {table}_default")
+    op.execute("DROP TRIGGER IF EXISTS outbox_notify ON outbox")
+    op.execute("DROP FUNCTION IF EXISTS notify_outbox()")
+    op.execute(
+        "DROP TRIGGER IF EXISTS smart_devices_notify_catalog_update ON smart_devices"
+    )
+    op.execute("DROP TRIGGER IF EXISTS smart_devices_notify_catalog ON smart_devices")
+    op.execute("DROP FUNCTION IF EXISTS notify_device_catalog()")
+    for table in ENTITY_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_notify_changed ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS notify_entity_changed()")
@@ -0,0 +1,185 @@
+"""
+Share and latency of the gazetteer fast path of the NLU pipeline.
+
+Builds ``--homes`` synthetic homes of ``--devices`` devices each (names,
+locations and types shaped like ``smart_devices`` rows) and sends
+``--commands`` commands through `ParseCommandInteractor`: a ``--simple``
+share of "verb + device/location" commands, the rest phrased so that only
+a model can make sense of them. The model stages are simulated by a stage
+that takes ``--fallback-ms`` and resolves nothing.
+
+Reports, for each path, the share of the commands it took and their
+latency percentiles, and the time to build one home's gazetteer.
+
+Run from the ``nlu`` directory; no database or broker is needed::
+
+    PYTHONPATH=src python benchmarks/fast_path.py --commands 100000
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Sequence
+from uuid import UUID, uuid4
+
+from application.dto import TextCommandDTO
+from application.errors import UnresolvedCommandError
+from application.interactors import ParseCommandInteractor
+from domain.entities import Device, ParsedCommand
+from infrastructure.gazetteer import Gazetteer, GazetteerResolver
+from infrastructure.stages import ResolverChain
+
+
+LOCATIONS = [
+    "kitchen", "bedroom", "living room", "bathroom", "hall", "garage",
+    "office", "nursery", "balcony", "attic",
+]
+TYPES = [
+    "light", "lamp", "thermostat", "fan", "socket", "blinds", "heater",
+    "tv", "speaker", "humidifier",
+]
+SIMPLE = [
+    "turn on the {name}",
+    "turn the {name} off",
+    "switch off {name} please",
+    "toggle the {name}",
+    "set the {name} to {n}",
+    "status of the {name}",
+    "turn on the {type} in the {location}",
+]
+COMPLEX = [
+    "turn on the {name} when I get home",
+    "it is too dark in the {location}",
+    "make the {location} a bit warmer",
+    "turn off everything in the {location}",
+    "dim the {name} and start the {type}",
+]
+
+
+class StaticCatalog:
+    def __init__(self, devices: Sequence[Device], homes: dict[int, list[UUID]]):
+        self._devices: dict[UUID, list[Device]] = {}
+        for device in devices:
+            self._devices.setdefault(device.home_id, []).append(device)
+        self._homes = homes
+
+    def devices(self, home_id: UUID) -> Sequence[Device]:
+        return self._devices.get(home_id, [])
+
+    def version(self, home_id: UUID) -> int:
+        return 1
+
+    def homes_of(self, telegram_id: int) -> Sequence[UUID]:
+        return self._homes.get(telegram_id, [])
+
+
+class NoCache:
+    async def get(
+        self, home_id: UUID, text: str
+    ) -> tuple[bool, ParsedCommand | None]:
+        return False, None
+
+    async def put(
+        self, home_id: UUID, text: str, command: ParsedCommand | None
+    ) -> None:
+        pass
+
+
+class SimulatedModel:
+    def __init__(self, delay: float) -> None:
+        self._delay = delay
+
+    async def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        await asyncio.sleep(self._delay)
+        return None
+
+
+def make_home(rng: random.Random, devices: int) -> list[Device]:
+    home_id = uuid4()
+    made: list[Device] = []
+    seen: set[str] = set()
+    while len(made) < devices:
+        location, type = rng.choice(LOCATIONS), rng.choice(TYPES)
+        name = f"{location} {type}"
+        if name in seen:
+            name = f"{name} {len(made)}"
+        seen.add(name)
+        made.append(Device(uuid4(), home_id, name.title(), type, location))
+    return made
+
+
+def phrase(rng: random.Random, devices: Sequence[Device], simple: float) -> str:
+    device = rng.choice(devices)
+    template = rng.choice(SIMPLE if rng.random() < simple else COMPLEX)
+    return template.format(
+        name=device.name.lower(), type=device.type,
+        location=device.location, n=rng.randrange(10, 100, 10),
+    )
+
+
+def report(name: str, latencies: list[float], total: int) -> None:
+    if len(latencies) < 2:
+        print(f"{name:<12} {len(latencies):>8}")
+        return
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<12} {len(latencies):>8} {len(latencies) / total:>7.1%} "
+        f"{q[49] * 1e6:>10.1f} {q[98] * 1e6:>10.1f}"
+    )
+
+
+async def main(
+    homes: int, devices: int, commands: int, simple: float, fallback_ms: float
+) -> None:
+    rng = random.Random(0)
+    catalog_homes = [make_home(rng, devices) for _ in range(homes)]
+    catalog = StaticCatalog(
+        [d for home in catalog_homes for d in home],
+        {user: [home[0].home_id] for user, home in enumerate(catalog_homes)},
+    )
+
+    started = time.perf_counter()
+    for home in catalog_homes:
+        Gazetteer(home)
+    build = (time.perf_counter() - started) / homes
+
+    interactor = ParseCommandInteractor(
+        catalog,
+        GazetteerResolver(catalog),
+        ResolverChain([SimulatedModel(fallback_ms / 1000)]),
+        NoCache(),
+    )
+    latencies: dict[str, list[float]] = {"gazetteer": [], "fallback": []}
+    for _ in range(commands):
+        user = rng.randrange(homes)
+        dto = TextCommandDTO(
+            user_id=str(user), message_id="0",
+            text=phrase(rng, catalog_homes[user], simple),
+        )
+        started = time.perf_counter()
+        try:
+            await interactor(dto)
+            path = "gazetteer"
+        except UnresolvedCommandError:
+            path = "fallback"
+        latencies[path].append(time.perf_counter() - started)
+
+    print(f"gazetteer build: {build * 1e3:.2f} ms per home of {devices} devices")
+    print(f"{'path':<12} {'commands':>8} {'share':>7} {'p50 us':>10} {'p99 us':>10}")
+    for name, values in latencies.items():
+        report(name, values, commands)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--homes", type=int, default=1_000)
+    parser.add_argument("--devices", type=int, default=30)
+    parser.add_argument("--commands", type=int, default=100_000)
+    parser.add_argument("--simple", type=float, default=0.8)
+    parser.add_argument("--fallback-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.homes, args.devices, args.commands, args.simple, args.fallback_ms)
+    )
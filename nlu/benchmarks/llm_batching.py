@@ -0,0 +1,130 @@
+"""
+Throughput of the LLM stage of the NLU pipeline on CPU.
+
+Sends ``--requests`` commands that only a model can resolve to a
+`BatchedIntentEngine`, from 1 up to ``--concurrency`` concurrent callers,
+with
+
+* ``single``: one request per forward pass (``max_batch=1``),
+* ``batched``: as many as are waiting, up to the concurrency level.
+
+Both run with the system prompt's KV state cached, unless
+``--no-prefix-cache`` is given. Reports requests per second, latency
+percentiles and decoding steps per request.
+
+Run from the ``nlu`` directory; the model is downloaded on first use::
+
+    PYTHONPATH=src python benchmarks/llm_batching.py --concurrency 1,4,16
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from uuid import uuid4
+
+import torch
+
+from config import LlmConfig
+from domain.entities import Device
+from infrastructure.llm import BatchedIntentEngine
+
+
+HOME = uuid4()
+DEVICES = [
+    Device(uuid4(), HOME, name, type, location)
+    for name, type, location in (
+        ("Sofa Lamp", "lamp", "living room"),
+        ("Ceiling Light", "light", "living room"),
+        ("Bedside Lamp", "lamp", "bedroom"),
+        ("Bedroom Heater", "heater", "bedroom"),
+        ("Kitchen Light", "light", "kitchen"),
+        ("Kettle", "socket", "kitchen"),
+        ("Front Door", "lock", "hall"),
+        ("Hall Thermostat", "thermostat", "hall"),
+        ("Office Fan", "fan", "office"),
+        ("Desk Lamp", "lamp", "office"),
+        ("Garage Door", "lock", "garage"),
+        ("Nursery Blinds", "blinds", "nursery"),
+    )
+]
+REQUESTS = [
+    "it is too dark next to the sofa",
+    "I want to read in bed",
+    "make the bedroom a bit warmer, 22 degrees",
+    "put the kettle on",
+    "nobody should get in through the front",
+    "it is stuffy in the office",
+    "let some light into the nursery",
+    "keep the hall at 20",
+    "I am leaving, shut the garage",
+    "the desk is too bright",
+]
+
+
+async def measure(
+    name: str, config: LlmConfig, requests: int, concurrency: int
+) -> None:
+    engine = BatchedIntentEngine(config)
+    await engine.start()
+    rng = random.Random(0)
+    texts = [rng.choice(REQUESTS) for _ in range(requests)]
+    latencies: list[float] = []
+    answered = 0
+
+    async def caller(worker: int) -> None:
+        nonlocal answered
+        for n in range(worker, requests, concurrency):
+            started = time.perf_counter()
+            if await engine.resolve(DEVICES, texts[n]) is not None:
+                answered += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await engine.stop()
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(
+        f"{name:<8} {concurrency:>5} {requests / elapsed:>8.2f} "
+        f"{q[49] * 1e3:>8.0f} {q[98] * 1e3:>8.0f} "
+        f"{engine.steps / engine.requests:>6.1f} {answered / requests:>7.1%}"
+    )
+
+
+async def main(
+    model: str, requests: int, levels: list[int], prefix_cache: bool
+) -> None:
+    print(
+        f"{'engine':<8} {'conc':>5} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'steps':>6} {'answered':>7}"
+    )
+    for concurrency in levels:
+        for name, max_batch in (("single", 1), ("batched", concurrency)):
+            config = LlmConfig(
+                NLU_LLM_MODEL=model,
+                NLU_LLM_MAX_BATCH=max_batch,
+                NLU_LLM_PREFIX_CACHE=prefix_cache,
+            )
+            await measure(name, config, requests, concurrency)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="HuggingFaceTB/SmolLM2-135M-Instruct")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--no-prefix-cache", action="store_true")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    asyncio.run(
+        main(
+            args.model,
+            args.requests,
+            [int(level) for level in args.concurrency.split(",")],
+            not args.no_prefix_cache,
+        )
+    )
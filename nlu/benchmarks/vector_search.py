@@ -0,0 +1,149 @@
+"""
+Per-home device search: in-process index vs Qdrant.
+
+Fills one home with ``--sizes`` random unit vectors of ``--dimension``
+components each (the shape of the device embeddings) and runs
+``--queries`` top-``--limit`` searches against it, one query per call and
+``--batch`` queries per call, through
+
+* ``exact``: `InMemoryVectorStore` scoring the whole home matrix,
+* ``hnsw``: the same store above its HNSW threshold (needs ``hnswlib``),
+* ``qdrant``: `QdrantVectorStore`, with ``--qdrant`` only.
+
+Reports the latency per call, the queries per second in batches, and the
+recall of each store against the exact top-k.
+
+Run from the ``nlu`` directory; Qdrant is only needed for ``--qdrant``,
+reached through the usual ``QDRANT_*`` environment variables::
+
+    PYTHONPATH=src python benchmarks/vector_search.py --sizes 30,1000,20000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from uuid import uuid4
+
+import numpy as np
+
+from application.interfaces import IVectorStore
+from config import VectorIndexConfig
+from infrastructure import vector_index
+from infrastructure.vector_index import InMemoryVectorStore
+
+
+def unit(rng: np.random.Generator, n: int, dimension: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def measure(
+    name: str,
+    store: IVectorStore,
+    devices: np.ndarray,
+    queries: np.ndarray,
+    limit: int,
+    batch: int,
+) -> None:
+    home_id = uuid4()
+    ids = [uuid4() for _ in range(len(devices))]
+    for start in range(0, len(ids), 1_000):
+        await store.upsert(
+            home_id,
+            ids[start:start + 1_000],
+            ["-"] * len(ids[start:start + 1_000]),
+            devices[start:start + 1_000],
+        )
+    await store.search(home_id, queries[:1], limit)
+
+    latencies = []
+    found = []
+    for query in queries:
+        started = time.perf_counter()
+        hits = (await store.search(home_id, query[None, :], limit))[0]
+        latencies.append(time.perf_counter() - started)
+        found.append({id for id, _ in hits})
+
+    started = time.perf_counter()
+    for start in range(0, len(queries), batch):
+        await store.search(home_id, queries[start:start + batch], limit)
+    batched = len(queries) / (time.perf_counter() - started)
+
+    exact = np.argsort(-(queries @ devices.T), axis=1)[:, :limit]
+    recall = statistics.mean(
+        len(hits & {ids[row] for row in rows}) / len(rows)
+        for hits, rows in zip(found, exact)
+    )
+    await store.delete(home_id, ids)
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{name:<7} {len(devices):>7} {q[49] * 1e6:>9.1f} {q[98] * 1e6:>9.1f} "
+        f"{batched:>10.0f} {recall:>7.3f}"
+    )
+
+
+async def main(
+    sizes: list[int],
+    dimension: int,
+    queries: int,
+    limit: int,
+    batch: int,
+    qdrant: bool,
+) -> None:
+    rng = np.random.default_rng(0)
+    query_vectors = unit(rng, queries, dimension)
+    stores: dict[str, IVectorStore] = {
+        "exact": InMemoryVectorStore(
+            VectorIndexConfig(NLU_HNSW_THRESHOLD=2**62), dimension
+        ),
+    }
+    if vector_index.hnswlib is not None:
+        stores["hnsw"] = InMemoryVectorStore(
+            VectorIndexConfig(NLU_HNSW_THRESHOLD=0), dimension
+        )
+    if qdrant:
+        from config import QdrantConfig
+        from infrastructure.adapters.qdrant import QdrantVectorStore
+
+        qdrant_store = QdrantVectorStore(
+            QdrantConfig.model_validate(
+                {**os.environ, "QDRANT_COLLECTION": "vector_search_bench"}
+            ),
+            dimension,
+        )
+        await qdrant_store.start()
+        stores["qdrant"] = qdrant_store
+
+    print(
+        f"{'store':<7} {'devices':>7} {'p50 us':>9} {'p99 us':>9} "
+        f"{'batch q/s':>10} {'recall':>7}"
+    )
+    for size in sizes:
+        devices = unit(rng, size, dimension)
+        for name, store in stores.items():
+            await measure(name, store, devices, query_vectors, limit, batch)
+    if qdrant:
+        await qdrant_store.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="30,300,3000,30000")
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--qdrant", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            [int(size) for size in args.sizes.split(",")],
+            args.dimension,
+            args.queries,
+            args.limit,
+            args.batch,
+            args.qdrant,
+        )
+    )
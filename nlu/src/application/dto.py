@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class TextCommandDTO:
+    user_id: str
+    message_id: str
+    text: str
+    home_id: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedCommandDTO:
+    user_id: str
+    message_id: str
+    home_id: str
+    device_id: str
+    cmd: str
+    device: str
+    value: float | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ErrorEventDTO:
+    user_id: str
+    message_id: str
+    reason: str
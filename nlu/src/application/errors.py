@@ -0,0 +1,12 @@
+class UnknownUserError(Exception):
+    """Пользователь не состоит ни в одном доме."""
+    def __init__(self, user_id: str) -> None:
+        super().__init__(f"User {user_id} has no homes")
+        self.user_id = user_id
+
+
+class UnresolvedCommandError(Exception):
+    """Текст не удалось разобрать в команду."""
+    def __init__(self, text: str) -> None:
+        super().__init__(f"Could not understand: {text!r}")
+        self.text = text
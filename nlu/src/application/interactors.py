@@ -0,0 +1,65 @@
+from collections import Counter
+from uuid import UUID
+
+from domain.entities import ParsedCommand
+
+from .dto import TextCommandDTO
+from .errors import UnknownUserError, UnresolvedCommandError
+from .interfaces import (
+    ICommandResolver,
+    IDeviceCatalog,
+    IFastPathResolver,
+    IResultCache,
+)
+
+
+class ParseCommandInteractor:
+    """
+    Turns the text of a command into a device command.
+
+    The gazetteer fast path is tried first in every home of the user; only
+    text it cannot resolve on its own reaches the model-backed `fallback`.
+    What the fallback made of a text, including nothing, is kept in the
+    result cache, so a phrase seen before in that home skips the models.
+    `resolved` counts the commands resolved by each stage and from the
+    cache, plus those left unresolved.
+    """
+
+    def __init__(
+        self,
+        catalog: IDeviceCatalog,
+        fast_path: IFastPathResolver,
+        fallback: ICommandResolver,
+        cache: IResultCache,
+    ) -> None:
+        self._catalog = catalog
+        self._fast_path = fast_path
+        self._fallback = fallback
+        self._cache = cache
+        self.resolved: Counter[str] = Counter()
+
+    async def __call__(self, dto: TextCommandDTO) -> ParsedCommand:
+        homes = self._homes(dto)
+        for home_id in homes:
+            command = self._fast_path.resolve(home_id, dto.text)
+            if command is not None:
+                self.resolved[command.stage] += 1
+                return command
+        for home_id in homes:
+            cached, command = await self._cache.get(home_id, dto.text)
+            if not cached:
+                command = await self._fallback.resolve(home_id, dto.text)
+                await self._cache.put(home_id, dto.text, command)
+            if command is not None:
+                self.resolved["cache" if cached else command.stage] += 1
+                return command
+        self.resolved["unresolved"] += 1
+        raise UnresolvedCommandError(dto.text)
+
+    def _homes(self, dto: TextCommandDTO) -> list[UUID]:
+        homes = list(self._catalog.homes_of(int(dto.user_id)))
+        if dto.home_id is not None:
+            homes = [h for h in homes if h == UUID(dto.home_id)]
+        if not homes:
+            raise UnknownUserError(dto.user_id)
+        return homes
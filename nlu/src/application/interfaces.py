@@ -0,0 +1,86 @@
+from typing import Callable, Protocol, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from domain.entities import Device, ParsedCommand
+
+
+class IDeviceCatalog(Protocol):
+    def devices(self, home_id: UUID) -> Sequence[Device]:
+        """Получить устройства дома"""
+        ...
+
+    def version(self, home_id: UUID) -> int:
+        """Версия списка устройств дома, меняется при каждом его изменении"""
+        ...
+
+    def homes_of(self, telegram_id: int) -> Sequence[UUID]:
+        """Получить дома пользователя"""
+        ...
+
+    def home_ids(self) -> Sequence[UUID]:
+        """Получить все дома, в которых есть устройства"""
+        ...
+
+    def add_listener(self, listener: Callable[[UUID], None]) -> None:
+        """Вызывать listener с id дома при каждом изменении его устройств"""
+        ...
+
+
+class IEmbedder(Protocol):
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """Получить нормированные эмбеддинги текстов, по строке на текст"""
+        ...
+
+
+class IVectorStore(Protocol):
+    async def digests(self, home_id: UUID) -> dict[UUID, str]:
+        """Получить отпечатки описаний проиндексированных устройств дома"""
+        ...
+
+    async def upsert(
+        self,
+        home_id: UUID,
+        ids: Sequence[UUID],
+        digests: Sequence[str],
+        vectors: np.ndarray,
+    ) -> None:
+        """Сохранить эмбеддинги устройств дома"""
+        ...
+
+    async def delete(self, home_id: UUID, ids: Sequence[UUID]) -> None:
+        """Удалить эмбеддинги устройств дома"""
+        ...
+
+    async def search(
+        self, home_id: UUID, vectors: np.ndarray, limit: int
+    ) -> list[list[tuple[UUID, float]]]:
+        """Найти ближайшие устройства дома для каждого вектора запроса"""
+        ...
+
+
+class IFastPathResolver(Protocol):
+    def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        """Разобрать простую команду без моделей, None если не удалось"""
+        ...
+
+
+class ICommandResolver(Protocol):
+    async def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        """Разобрать команду, None если не удалось"""
+        ...
+
+
+class IResultCache(Protocol):
+    async def get(
+        self, home_id: UUID, text: str
+    ) -> tuple[bool, ParsedCommand | None]:
+        """Найти разбор текста в доме: (найден ли, команда или None)"""
+        ...
+
+    async def put(
+        self, home_id: UUID, text: str, command: ParsedCommand | None
+    ) -> None:
+        """Запомнить разбор текста в доме, None если он не разобран"""
+        ...
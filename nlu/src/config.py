@@ -0,0 +1,123 @@
+import os
+
+from pydantic import BaseModel, Field
+
+
+class RabbitMQConfig(BaseModel):
+    host: str = Field(alias="RABBITMQ_HOST")
+    port: int = Field(alias="RABBITMQ_PORT")
+    login: str = Field(alias="RABBITMQ_USER")
+    password: str = Field(alias="RABBITMQ_PASSWORD")
+    vhost: str = Field(alias="RABBITMQ_VHOST")
+
+
+class RedisConfig(BaseModel):
+    host: str = Field(alias="REDIS_HOST")
+    port: int = Field(alias="REDIS_PORT")
+    db: int = Field(default=0, alias="REDIS_NLU_CACHE_DB")
+    password: str = Field(alias="REDIS_PASSWORD")
+
+
+class PostgresConfig(BaseModel):
+    host: str = Field(alias="DB_HOST")
+    port: int = Field(alias="DB_PORT")
+    login: str = Field(alias="DB_USER")
+    password: str = Field(alias="DB_PASS")
+    database: str = Field(alias="DB_NAME")
+
+
+class CatalogConfig(BaseModel):
+    # Homes are reloaded as their devices change, through notifications on
+    # `channel`; the whole catalog is reloaded this often regardless, which
+    # also picks up membership changes.
+    refresh_interval: float = Field(
+        default=300.0, alias="NLU_CATALOG_REFRESH_INTERVAL"
+    )
+    channel: str = Field(default="device_catalog", alias="NLU_CATALOG_CHANNEL")
+
+
+class EmbeddingConfig(BaseModel):
+    model: str = Field(
+        default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
+        alias="NLU_EMBEDDING_MODEL",
+    )
+    device: str = Field(default="cpu", alias="NLU_EMBEDDING_DEVICE")
+    batch_size: int = Field(default=64, alias="NLU_EMBEDDING_BATCH_SIZE")
+
+
+class QdrantConfig(BaseModel):
+    url: str = Field(default="http://localhost:6333", alias="QDRANT_URL")
+    api_key: str | None = Field(default=None, alias="QDRANT_API_KEY")
+    collection: str = Field(default="device_catalog", alias="QDRANT_COLLECTION")
+
+
+class VectorIndexConfig(BaseModel):
+    # "memory" keeps the embeddings in the process, "qdrant" in QdrantConfig.
+    store: str = Field(default="memory", alias="NLU_VECTOR_STORE")
+    # Homes with at least this many devices are searched through HNSW.
+    hnsw_threshold: int = Field(default=2_000, alias="NLU_HNSW_THRESHOLD")
+    hnsw_m: int = Field(default=16, alias="NLU_HNSW_M")
+    hnsw_ef_construction: int = Field(
+        default=200, alias="NLU_HNSW_EF_CONSTRUCTION"
+    )
+    hnsw_ef: int = Field(default=64, alias="NLU_HNSW_EF")
+
+
+class SemanticConfig(BaseModel):
+    # The best device must score at least `min_score` and lead the next one
+    # by `min_margin`, otherwise the text is left to the next stage.
+    min_score: float = Field(default=0.5, alias="NLU_SEMANTIC_MIN_SCORE")
+    min_margin: float = Field(default=0.05, alias="NLU_SEMANTIC_MIN_MARGIN")
+
+
+class LlmConfig(BaseModel):
+    model: str = Field(default="Qwen/Qwen2.5-0.5B-Instruct", alias="NLU_LLM_MODEL")
+    device: str = Field(default="cpu", alias="NLU_LLM_DEVICE")
+    # Requests arriving within `max_wait` seconds are decoded together, up
+    # to `max_batch` of them.
+    max_batch: int = Field(default=8, alias="NLU_LLM_MAX_BATCH")
+    max_wait: float = Field(default=0.01, alias="NLU_LLM_MAX_WAIT")
+    max_new_tokens: int = Field(default=48, alias="NLU_LLM_MAX_NEW_TOKENS")
+    max_value_tokens: int = Field(default=4, alias="NLU_LLM_MAX_VALUE_TOKENS")
+    prefix_cache: bool = Field(default=True, alias="NLU_LLM_PREFIX_CACHE")
+
+
+class ResultCacheConfig(BaseModel):
+    max_size: int = Field(default=10_000, alias="NLU_CACHE_MAX_SIZE")
+    ttl: float = Field(default=86_400.0, alias="NLU_CACHE_TTL")
+    # Texts no stage could resolve are retried after this long.
+    negative_ttl: float = Field(default=600.0, alias="NLU_CACHE_NEGATIVE_TTL")
+    prefix: str = Field(default="nlu", alias="NLU_CACHE_PREFIX")
+
+
+class Config(BaseModel):
+    rabbit: RabbitMQConfig = Field(
+        default_factory=lambda: RabbitMQConfig.model_validate(os.environ)
+    )
+    redis: RedisConfig = Field(
+        default_factory=lambda: RedisConfig.model_validate(os.environ)
+    )
+    postgres: PostgresConfig = Field(
+        default_factory=lambda: PostgresConfig.model_validate(os.environ)
+    )
+    catalog: CatalogConfig = Field(
+        default_factory=lambda: CatalogConfig.model_validate(os.environ)
+    )
+    embedding: EmbeddingConfig = Field(
+        default_factory=lambda: EmbeddingConfig.model_validate(os.environ)
+    )
+    qdrant: QdrantConfig = Field(
+        default_factory=lambda: QdrantConfig.model_validate(os.environ)
+    )
+    vectors: VectorIndexConfig = Field(
+        default_factory=lambda: VectorIndexConfig.model_validate(os.environ)
+    )
+    semantic: SemanticConfig = Field(
+        default_factory=lambda: SemanticConfig.model_validate(os.environ)
+    )
+    llm: LlmConfig = Field(
+        default_factory=lambda: LlmConfig.model_validate(os.environ)
+    )
+    cache: ResultCacheConfig = Field(
+        default_factory=lambda: ResultCacheConfig.model_validate(os.environ)
+    )
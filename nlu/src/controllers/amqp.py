@@ -0,0 +1,61 @@
+from dataclasses import asdict
+import logging
+
+from dishka.integrations.faststream import FromDishka
+from faststream.rabbit import RabbitBroker, RabbitRouter
+
+from application.dto import ErrorEventDTO, ParsedCommandDTO, TextCommandDTO
+from application.errors import UnknownUserError, UnresolvedCommandError
+from application.interactors import ParseCommandInteractor
+
+
+logger = logging.getLogger(__name__)
+
+
+class CommandController:
+    def __init__(self, router: RabbitRouter, broker: RabbitBroker) -> None:
+        self.router = router
+        self.broker = broker
+        router.subscriber("nlu_command")(self.parse_command)
+
+    async def parse_command(
+        self,
+        dto: TextCommandDTO,
+        interactor: FromDishka[ParseCommandInteractor],
+    ) -> None:
+        try:
+            command = await interactor(dto)
+            await self.publish_success(
+                ParsedCommandDTO(
+                    user_id=dto.user_id,
+                    message_id=dto.message_id,
+                    home_id=str(command.home_id),
+                    device_id=str(command.device_id),
+                    cmd=command.cmd,
+                    device=command.device,
+                    value=command.value,
+                )
+            )
+        except (UnknownUserError, UnresolvedCommandError) as e:
+            await self.publish_error(
+                ErrorEventDTO(
+                    user_id=dto.user_id,
+                    message_id=dto.message_id,
+                    reason=str(e)
+                )
+            )
+        except Exception:
+            logger.exception("Failed to parse command %s", dto.message_id)
+            await self.publish_error(
+                ErrorEventDTO(
+                    user_id=dto.user_id,
+                    message_id=dto.message_id,
+                    reason="Internal error"
+                )
+            )
+
+    async def publish_success(self, dto: ParsedCommandDTO) -> None:
+        await self.broker.publish(asdict(dto), queue="parsed_command")
+
+    async def publish_error(self, dto: ErrorEventDTO) -> None:
+        await self.broker.publish(asdict(dto), queue="error_queue")
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+
+@dataclass(frozen=True, slots=True)
+class Device:
+    id: UUID
+    home_id: UUID
+    name: str
+    type: str
+    location: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedCommand:
+    home_id: UUID
+    device_id: UUID
+    cmd: str
+    device: str
+    value: float | None = None
+    stage: str = "gazetteer"
@@ -0,0 +1,185 @@
+import asyncio
+from collections import defaultdict
+import itertools
+import logging
+from typing import Callable, Sequence
+from uuid import UUID
+
+import psycopg
+from psycopg.conninfo import make_conninfo
+
+from application.interfaces import IDeviceCatalog
+from config import CatalogConfig, PostgresConfig
+from domain.entities import Device
+
+
+logger = logging.getLogger(__name__)
+
+DEVICES_QUERY = """
+    SELECT id, home_id, name, type, location
+    FROM smart_devices
+    WHERE is_active
+"""
+
+HOME_DEVICES_QUERY = DEVICES_QUERY + " AND home_id = %s"
+
+HOMES_QUERY = """
+    SELECT u.telegram_id, r.home_id
+    FROM home_user_roles r
+    JOIN telegram_users u ON u.id = r.user_id
+"""
+
+
+class PostgresDeviceCatalog(IDeviceCatalog):
+    """
+    In-memory copy of the active smart devices and of home membership.
+
+    The whole catalog is loaded at start and reloaded every
+    `refresh_interval` seconds. In between, a listener on `channel`, fed by
+    the ``notify_device_catalog`` triggers, reloads a home as soon as one of
+    its devices is added, removed, moved or renamed. After a reconnect the
+    whole catalog is reloaded, since notifications may have been missed.
+
+    A home's `version` changes whenever its device list does, which is
+    what the per-home indexes key on, and the listeners registered with
+    `add_listener` are called with its id.
+
+    Parameters
+    ----------
+    psql_config : PostgresConfig
+        Database to read from.
+    config : CatalogConfig
+        Refresh interval and notification channel.
+    """
+
+    def __init__(self, psql_config: PostgresConfig, config: CatalogConfig) -> None:
+        self._conninfo = make_conninfo(
+            host=psql_config.host,
+            port=psql_config.port,
+            user=psql_config.login,
+            password=psql_config.password,
+            dbname=psql_config.database,
+        )
+        self._config = config
+        self._devices: dict[UUID, tuple[Device, ...]] = {}
+        self._versions: dict[UUID, int] = {}
+        self._homes: dict[int, list[UUID]] = {}
+        self._clock = itertools.count(1)
+        self._listeners: list[Callable[[UUID], None]] = []
+        self._pending: set[UUID] = set()
+        self._changed = asyncio.Event()
+        self._full_refresh = False
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def devices(self, home_id: UUID) -> Sequence[Device]:
+        return self._devices.get(home_id, ())
+
+    def version(self, home_id: UUID) -> int:
+        return self._versions.get(home_id, 0)
+
+    def homes_of(self, telegram_id: int) -> Sequence[UUID]:
+        return self._homes.get(telegram_id, [])
+
+    def home_ids(self) -> Sequence[UUID]:
+        return list(self._devices)
+
+    def add_listener(self, listener: Callable[[UUID], None]) -> None:
+        self._listeners.append(listener)
+
+    def replace(
+        self, devices: Sequence[Device], homes: dict[int, list[UUID]]
+    ) -> None:
+        by_home: defaultdict[UUID, list[Device]] = defaultdict(list)
+        for device in devices:
+            by_home[device.home_id].append(device)
+        for home_id in by_home.keys() | self._devices.keys():
+            self.replace_home(home_id, by_home.get(home_id, ()))
+        self._homes = homes
+
+    def replace_home(self, home_id: UUID, devices: Sequence[Device]) -> None:
+        home_devices = tuple(sorted(devices, key=lambda d: d.id))
+        if home_devices == self._devices.get(home_id, ()):
+            return
+        if home_devices:
+            self._devices[home_id] = home_devices
+        else:
+            self._devices.pop(home_id, None)
+        self._versions[home_id] = next(self._clock)
+        for listener in self._listeners:
+            listener(home_id)
+
+    async def refresh(self) -> None:
+        async with await psycopg.AsyncConnection.connect(self._conninfo) as conn:
+            cursor = await conn.execute(DEVICES_QUERY)
+            devices = [Device(*row) for row in await cursor.fetchall()]
+            cursor = await conn.execute(HOMES_QUERY)
+            homes: defaultdict[int, list[UUID]] = defaultdict(list)
+            for telegram_id, home_id in await cursor.fetchall():
+                homes[telegram_id].append(home_id)
+        self.replace(devices, dict(homes))
+
+    async def refresh_homes(self, home_ids: Sequence[UUID]) -> None:
+        async with await psycopg.AsyncConnection.connect(self._conninfo) as conn:
+            for home_id in home_ids:
+                cursor = await conn.execute(HOME_DEVICES_QUERY, (home_id,))
+                devices = [Device(*row) for row in await cursor.fetchall()]
+                self.replace_home(home_id, devices)
+
+    async def start(self) -> None:
+        if not self._tasks:
+            await self.refresh()
+            self._tasks = [
+                asyncio.create_task(self._run()),
+                asyncio.create_task(self._listen()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _listen(self) -> None:
+        reconnect = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    self._conninfo, autocommit=True
+                ) as conn:
+                    await conn.execute(f'LISTEN "{self._config.channel}"')
+                    if reconnect:
+                        self._full_refresh = True
+                        self._changed.set()
+                    reconnect = True
+                    async for notify in conn.notifies():
+                        self._pending.add(UUID(notify.payload))
+                        self._changed.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Device catalog listener failed")
+            await asyncio.sleep(1.0)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._changed.wait(), self._config.refresh_interval
+                )
+            except asyncio.TimeoutError:
+                self._full_refresh = True
+            self._changed.clear()
+            pending, self._pending = self._pending, set()
+            try:
+                if self._full_refresh:
+                    self._full_refresh = False
+                    await self.refresh()
+                elif pending:
+                    await self.refresh_homes(list(pending))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Device catalog refresh failed")
+                self._pending |= pending
+                await asyncio.sleep(1.0)
+                self._changed.set()
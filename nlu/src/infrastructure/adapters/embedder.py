@@ -0,0 +1,39 @@
+import asyncio
+from typing import Sequence
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from application.interfaces import IEmbedder
+from config import EmbeddingConfig
+
+
+class SentenceTransformerEmbedder(IEmbedder):
+    """
+    SentenceTransformers model run off the event loop.
+
+    Embeddings are L2-normalised, so cosine similarity is a dot product.
+    Encoding is CPU or GPU bound and runs in a worker thread.
+
+    Parameters
+    ----------
+    config : EmbeddingConfig
+        Model name, device and batch size.
+    """
+
+    def __init__(self, config: EmbeddingConfig) -> None:
+        self._config = config
+        self._model = SentenceTransformer(config.model, device=config.device)
+
+    @property
+    def dimension(self) -> int:
+        return int(self._model.get_sentence_embedding_dimension() or 0)
+
+    async def embed(self, texts: Sequence[str]) -> np.ndarray:
+        return await asyncio.to_thread(
+            self._model.encode,
+            list(texts),
+            batch_size=self._config.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
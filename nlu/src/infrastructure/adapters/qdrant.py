@@ -0,0 +1,135 @@
+from typing import Sequence
+from uuid import UUID, uuid5
+
+import numpy as np
+from qdrant_client import AsyncQdrantClient, models
+
+from application.interfaces import IVectorStore
+from config import QdrantConfig
+
+
+def point_id(home_id: UUID, device_id: UUID) -> str:
+    # A device moved to another home gets a new point, so cleaning up the
+    # old home never deletes the new one.
+    return str(uuid5(home_id, str(device_id)))
+
+
+def _home_filter(home_id: UUID) -> models.Filter:
+    return models.Filter(
+        must=[
+            models.FieldCondition(
+                key="home_id", match=models.MatchValue(value=str(home_id))
+            )
+        ]
+    )
+
+
+class QdrantVectorStore(IVectorStore):
+    """
+    Device embeddings in one Qdrant collection, partitioned by home.
+
+    Every point carries its ``home_id``, ``device_id`` and the ``digest``
+    of the description it was embedded from; searches are filtered on the
+    indexed ``home_id`` payload.
+
+    Parameters
+    ----------
+    config : QdrantConfig
+        Server and collection.
+    dimension : int
+        Size of the embeddings.
+    """
+
+    def __init__(self, config: QdrantConfig, dimension: int) -> None:
+        self._config = config
+        self._dimension = dimension
+        self._client = AsyncQdrantClient(url=config.url, api_key=config.api_key)
+
+    async def start(self) -> None:
+        collection = self._config.collection
+        if await self._client.collection_exists(collection):
+            return
+        await self._client.create_collection(
+            collection,
+            vectors_config=models.VectorParams(
+                size=self._dimension, distance=models.Distance.COSINE
+            ),
+        )
+        await self._client.create_payload_index(
+            collection, "home_id", field_schema=models.PayloadSchemaType.KEYWORD
+        )
+
+    async def stop(self) -> None:
+        await self._client.close()
+
+    async def digests(self, home_id: UUID) -> dict[UUID, str]:
+        digests: dict[UUID, str] = {}
+        offset = None
+        while True:
+            points, offset = await self._client.scroll(
+                self._config.collection,
+                scroll_filter=_home_filter(home_id),
+                limit=256,
+                offset=offset,
+                with_payload=["device_id", "digest"],
+                with_vectors=False,
+            )
+            for point in points:
+                payload = point.payload or {}
+                digests[UUID(payload["device_id"])] = payload["digest"]
+            if offset is None:
+                return digests
+
+    async def upsert(
+        self,
+        home_id: UUID,
+        ids: Sequence[UUID],
+        digests: Sequence[str],
+        vectors: np.ndarray,
+    ) -> None:
+        await self._client.upsert(
+            self._config.collection,
+            points=[
+                models.PointStruct(
+                    id=point_id(home_id, id),
+                    vector=vector.tolist(),
+                    payload={
+                        "home_id": str(home_id),
+                        "device_id": str(id),
+                        "digest": digest,
+                    },
+                )
+                for id, digest, vector in zip(ids, digests, vectors)
+            ],
+        )
+
+    async def delete(self, home_id: UUID, ids: Sequence[UUID]) -> None:
+        await self._client.delete(
+            self._config.collection,
+            points_selector=models.PointIdsList(
+                points=[point_id(home_id, id) for id in ids]
+            ),
+        )
+
+    async def search(
+        self, home_id: UUID, vectors: np.ndarray, limit: int
+    ) -> list[list[tuple[UUID, float]]]:
+        responses = await self._client.query_batch_points(
+            self._config.collection,
+            requests=[
+                models.QueryRequest(
+                    query=vector.tolist(),
+                    filter=_home_filter(home_id),
+                    limit=limit,
+                    with_payload=["device_id"],
+                )
+                for vector in vectors
+            ],
+        )
+        return [
+            [
+                (UUID((point.payload or {})["device_id"]), point.score)
+                for point in response.points
+            ]
+            for response in responses
+        ]
@@ -0,0 +1,13 @@
+
+from redis.asyncio import Redis
+
+from config import RedisConfig
+
+
+def new_redis_client(redis_config: RedisConfig) -> Redis:
+    return Redis(
+        host=redis_config.host,
+        port=redis_config.port,
+        db=redis_config.db,
+        password=redis_config.password
+    )
@@ -0,0 +1,243 @@
+import re
+from typing import Any, Iterable, Mapping, Sequence
+from uuid import UUID
+
+from application.interfaces import IDeviceCatalog, IFastPathResolver
+from domain.entities import Device, ParsedCommand
+
+
+TOKEN_RE = re.compile(r"\d+(?:[.,]\d+)?|\w+")
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+# Surface forms of the supported commands. Multi-word forms are matched as
+# a whole, so "turn on" wins over the bare "on" of "turn the light on".
+VERBS: Mapping[str, str] = {
+    "turn on": "turn_on",
+    "switch on": "turn_on",
+    "enable": "turn_on",
+    "on": "turn_on",
+    "включи": "turn_on",
+    "включить": "turn_on",
+    "turn off": "turn_off",
+    "switch off": "turn_off",
+    "disable": "turn_off",
+    "off": "turn_off",
+    "выключи": "turn_off",
+    "выключить": "turn_off",
+    "toggle": "toggle",
+    "переключи": "toggle",
+    "open": "open",
+    "открой": "open",
+    "close": "close",
+    "закрой": "close",
+    "lock": "lock",
+    "unlock": "unlock",
+    "set": "set",
+    "установи": "set",
+    "поставь": "set",
+    "status": "status",
+    "state": "status",
+    "статус": "status",
+    "состояние": "status",
+}
+
+# Words that carry no meaning of their own in a command. Anything else the
+# gazetteer does not recognise sends the text to the slower stages.
+STOP_WORDS = frozenset({
+    "a", "an", "the", "please", "turn", "switch", "in", "at", "of", "to",
+    "my", "is", "what", "whats", "s", "percent", "degrees",
+    "пожалуйста", "в", "во", "мой", "мою", "какое", "какой", "процентов",
+    "градусов",
+})
+
+_END = ""
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.casefold())
+
+
+class Gazetteer:
+    """
+    Token trie over the devices of one home and the verb lexicon.
+
+    Device names, locations and types are inserted as token sequences, so
+    a phrase is recognised by walking the trie from each position and
+    keeping the longest match. A command is resolved when the text holds
+    exactly one verb, identifies exactly one device (by its name, or by
+    its location and/or type) and, for ``set``, exactly one number, with
+    nothing left over but stop words. Everything else is left to the
+    model-backed stages: being wrong costs more than being slow.
+
+    Parameters
+    ----------
+    devices : Iterable[Device]
+        Devices of the home.
+    verbs : Mapping[str, str]
+        Surface form to command name.
+    """
+
+    def __init__(
+        self, devices: Iterable[Device], verbs: Mapping[str, str] = VERBS
+    ) -> None:
+        self._root: dict[str, Any] = {}
+        self._devices: dict[UUID, Device] = {}
+        self._by_location: dict[str, set[UUID]] = {}
+        self._by_type: dict[str, set[UUID]] = {}
+        for phrase, cmd in verbs.items():
+            self._insert(phrase, ("verb", cmd))
+        for device in devices:
+            self._devices[device.id] = device
+            self._insert(device.name, ("device", device.id))
+            self._insert(device.type, ("type", device.type.casefold()))
+            self._by_type.setdefault(device.type.casefold(), set()).add(device.id)
+            if device.location:
+                location = device.location.casefold()
+                self._insert(device.location, ("location", location))
+                self._by_location.setdefault(location, set()).add(device.id)
+
+    def match(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        """Resolve `text` to a command on one device of the home, or None."""
+        scan = self._scan(text, strict=True)
+        if scan is None:
+            return None
+        cmds, names, locations, types, numbers = scan
+        intent = self._intent(cmds, numbers)
+        candidates = self._candidates(names, locations, types)
+        if intent is None or candidates is None or len(candidates) != 1:
+            return None
+        device = self._devices[candidates.pop()]
+        return ParsedCommand(
+            home_id=home_id,
+            device_id=device.id,
+            cmd=intent[0],
+            device=device.name,
+            value=intent[1],
+        )
+
+    def intent(self, text: str) -> tuple[str, float | None] | None:
+        """
+        Find the command and value of `text`, ignoring unknown words.
+
+        Used by the stages that find the device some other way.
+        """
+        scan = self._scan(text, strict=False)
+        return None if scan is None else self._intent(scan[0], scan[4])
+
+    def _scan(
+        self, text: str, strict: bool
+    ) -> tuple[set[str], list[set[UUID]], set[str], set[str], list[float]] | None:
+        tokens = tokenize(text)
+        cmds: set[str] = set()
+        names: list[set[UUID]] = []
+        locations: set[str] = set()
+        types: set[str] = set()
+        numbers: list[float] = []
+        i, n = 0, len(tokens)
+        while i < n:
+            node, j, end, found = self._root, i, i, None
+            while j < n:
+                child = node.get(tokens[j])
+                if child is None:
+                    break
+                node = child
+                j += 1
+                if _END in node:
+                    end, found = j, node[_END]
+            if found is not None:
+                for kind, value in found:
+                    if kind == "verb":
+                        cmds.add(value)
+                    elif kind == "device":
+                        names.append(value)
+                    elif kind == "location":
+                        locations.add(value)
+                    else:
+                        types.add(value)
+                i = end
+                continue
+            token = tokens[i]
+            if NUMBER_RE.fullmatch(token):
+                numbers.append(float(token.replace(",", ".")))
+            elif strict and token not in STOP_WORDS:
+                return None
+            i += 1
+        return cmds, names, locations, types, numbers
+
+    @staticmethod
+    def _intent(
+        cmds: set[str], numbers: list[float]
+    ) -> tuple[str, float | None] | None:
+        if len(cmds) != 1:
+            return None
+        cmd = next(iter(cmds))
+        if len(numbers) != (1 if cmd == "set" else 0):
+            return None
+        return cmd, numbers[0] if numbers else None
+
+    def _candidates(
+        self,
+        names: Sequence[set[UUID]],
+        locations: set[str],
+        types: set[str],
+    ) -> set[UUID] | None:
+        # A name must agree with any location or type also mentioned.
+        if len(locations) > 1 or len(types) > 1:
+            return None
+        if not (names or locations or types):
+            return None
+        candidates = set.intersection(*names) if names else None
+        for location in locations:
+            by_location = self._by_location[location]
+            candidates = (
+                set(by_location) if candidates is None else candidates & by_location
+            )
+        for type in types:
+            by_type = self._by_type[type]
+            candidates = set(by_type) if candidates is None else candidates & by_type
+        return candidates
+
+    def _insert(self, phrase: str, entry: tuple[str, Any]) -> None:
+        tokens = tokenize(phrase)
+        if not tokens:
+            return
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        entries = node.setdefault(_END, [])
+        if entry[0] == "device":
+            # Several devices may share a name; keep one set of ids.
+            for kind, ids in entries:
+                if kind == "device":
+                    ids.add(entry[1])
+                    return
+            entry = ("device", {entry[1]})
+        if entry not in entries:
+            entries.append(entry)
+
+
+class GazetteerResolver(IFastPathResolver):
+    """
+    Fast path of the NLU pipeline: one `Gazetteer` per home.
+
+    A home's gazetteer is built on first use and rebuilt when the
+    catalog's version of the home changes, so resolving a command costs
+    a dictionary lookup and a walk over its tokens.
+
+    Parameters
+    ----------
+    catalog : IDeviceCatalog
+        Devices of every home.
+    """
+
+    def __init__(self, catalog: IDeviceCatalog) -> None:
+        self._catalog = catalog
+        self._gazetteers: dict[UUID, tuple[int, Gazetteer]] = {}
+
+    def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        version = self._catalog.version(home_id)
+        cached = self._gazetteers.get(home_id)
+        if cached is None or cached[0] != version:
+            cached = (version, Gazetteer(self._catalog.devices(home_id)))
+            self._gazetteers[home_id] = cached
+        return cached[1].match(home_id, text)
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import logging
+from uuid import UUID
+
+from application.interfaces import IDeviceCatalog, IEmbedder, IVectorStore
+from config import EmbeddingConfig
+from domain.entities import Device
+
+
+logger = logging.getLogger(__name__)
+
+
+def describe(device: Device) -> str:
+    """Text a device is embedded from."""
+    if device.location:
+        return f"{device.name} ({device.type}, {device.location})"
+    return f"{device.name} ({device.type})"
+
+
+def digest(description: str) -> str:
+    return hashlib.blake2b(description.encode(), digest_size=16).hexdigest()
+
+
+class CatalogIndexer:
+    """
+    Keeps the vector store in step with the device catalog, home by home.
+
+    Syncing a home compares the digest of each device's description with
+    the one stored next to its embedding, embeds only the devices that are
+    new or whose description changed, and deletes the embeddings of
+    devices that are gone. Embeddings outlive the process, so a restart
+    embeds nothing that has not changed.
+
+    Every home is synced at start; afterwards a home is synced when the
+    catalog reports a change to it, in the background, and `ensure` syncs
+    one on demand if a query reaches it first.
+
+    Parameters
+    ----------
+    catalog : IDeviceCatalog
+        Source of the devices.
+    embedder : IEmbedder
+        Model the devices are embedded with.
+    store : IVectorStore
+        Where the embeddings are kept.
+    config : EmbeddingConfig
+        Batch size.
+    """
+
+    def __init__(
+        self,
+        catalog: IDeviceCatalog,
+        embedder: IEmbedder,
+        store: IVectorStore,
+        config: EmbeddingConfig,
+    ) -> None:
+        self._catalog = catalog
+        self._embedder = embedder
+        self._store = store
+        self._config = config
+        self._synced: dict[UUID, int] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+        self._pending: set[UUID] = set()
+        self._changed = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.embedded = 0
+        self.deleted = 0
+        catalog.add_listener(self.schedule)
+
+    def schedule(self, home_id: UUID) -> None:
+        self._pending.add(home_id)
+        self._changed.set()
+
+    async def ensure(self, home_id: UUID) -> None:
+        if self._synced.get(home_id) != self._catalog.version(home_id):
+            await self.sync(home_id)
+
+    async def sync(self, home_id: UUID) -> None:
+        lock = self._locks.setdefault(home_id, asyncio.Lock())
+        async with lock:
+            version = self._catalog.version(home_id)
+            if self._synced.get(home_id) == version:
+                return
+            devices = self._catalog.devices(home_id)
+            indexed = await self._store.digests(home_id)
+            changed = []
+            for device in devices:
+                description = describe(device)
+                if indexed.get(device.id) != digest(description):
+                    changed.append((device.id, description))
+            for start in range(0, len(changed), self._config.batch_size):
+                batch = changed[start:start + self._config.batch_size]
+                vectors = await self._embedder.embed([d for _, d in batch])
+                await self._store.upsert(
+                    home_id,
+                    [id for id, _ in batch],
+                    [digest(d) for _, d in batch],
+                    vectors,
+                )
+            stale = indexed.keys() - {device.id for device in devices}
+            if stale:
+                await self._store.delete(home_id, list(stale))
+            self.embedded += len(changed)
+            self.deleted += len(stale)
+            self._synced[home_id] = version
+
+    async def start(self) -> None:
+        if self._task is None:
+            for home_id in self._catalog.home_ids():
+                await self.sync(home_id)
+            logger.info("Device catalog indexed, %d devices embedded", self.embedded)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            pending, self._pending = self._pending, set()
+            for home_id in pending:
+                try:
+                    await self.sync(home_id)
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Indexing home %s failed", home_id)
+                    self._pending.add(home_id)
+            if self._pending:
+                await asyncio.sleep(1.0)
+                self._changed.set()
@@ -0,0 +1,359 @@
+import asyncio
+import copy
+from dataclasses import dataclass, field
+import logging
+from typing import Any, Sequence
+from uuid import UUID
+
+import torch
+from transformers import AutoModelForCausalLM, AutoTokenizer
+
+from application.interfaces import ICommandResolver, IDeviceCatalog
+from config import LlmConfig
+from domain.entities import Device, ParsedCommand
+from infrastructure.gazetteer import VERBS
+from infrastructure.indexer import describe
+
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = sorted(set(VERBS.values()))
+
+# Everything before the home's devices is the same for every request; its
+# KV state is computed once and shared by all batches.
+SYSTEM_PROMPT = (
+    "You turn requests to a smart home into commands. Answer with one JSON "
+    'object {"cmd": ..., "device": ..., "value": ...}. "cmd" is one of '
+    + ", ".join(COMMANDS)
+    + '. "device" is the name of one of the listed devices. "value" is the '
+    'number to set for "set", otherwise null.\n'
+    "Example. Devices: Desk Lamp (lamp, office); Hall Heater (heater, hall)\n"
+    "Request: make it warmer in the hall, 23 degrees\n"
+    'JSON: {"cmd": "set", "device": "Hall Heater", "value": 23}\n'
+)
+
+ANSWER_START = '{"cmd": "'
+_END = -1
+
+
+def _suffix(devices: Sequence[Device], text: str) -> str:
+    listed = "; ".join(describe(device) for device in devices)
+    return f"Devices: {listed}\nRequest: {text}\nJSON: {ANSWER_START}"
+
+
+class _Trie:
+    """Token sequences of the alternatives of a field, by token."""
+
+    def __init__(self, alternatives: dict[str, list[int]]) -> None:
+        self.root: dict[int, Any] = {}
+        for value, tokens in alternatives.items():
+            node = self.root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node[_END] = value
+
+
+@dataclass(slots=True)
+class SchemaConstraint:
+    """
+    Decoding state of one answer, limited to the command schema.
+
+    The answer is ``{"cmd": "<cmd>", "device": "<name>", "value": <v>}``.
+    The keys and punctuation are part of the alternatives, so the model
+    only chooses where the schema leaves a choice: which command, which
+    device, and the digits of the value or ``null``. A step with a single
+    allowed token is forced.
+    """
+
+    cmds: _Trie
+    devices: _Trie
+    numbers: frozenset[int]
+    null: list[int]
+    close: int
+    max_value_tokens: int
+    node: dict[int, Any] = field(init=False)
+    phase: int = 0
+    cmd: str | None = None
+    device: str | None = None
+    value: list[int] = field(default_factory=list)
+    done: bool = False
+
+    def __post_init__(self) -> None:
+        self.node = self.cmds.root
+
+    def allowed(self) -> list[int]:
+        if self.phase < 2:
+            return [t for t in self.node if t != _END]
+        if self.phase == 2:
+            return [*self.numbers, self.null[0]]
+        if self.phase == 3:
+            if len(self.value) >= self.max_value_tokens:
+                return [self.close]
+            return [*self.numbers, self.close]
+        return [self.null[len(self.value)]]
+
+    def advance(self, token: int) -> None:
+        if self.phase < 2:
+            self.node = self.node[token]
+            if _END in self.node:
+                if self.phase == 0:
+                    self.cmd = self.node[_END]
+                    self.node = self.devices.root
+                else:
+                    self.device = self.node[_END]
+                self.phase += 1
+        elif self.phase == 2:
+            is_null = token == self.null[0] and token not in self.numbers
+            self.phase = 4 if is_null else 3
+            self.value.append(token)
+            self.done = self.phase == 4 and len(self.null) == 1
+        elif self.phase == 3:
+            if token == self.close:
+                self.done = True
+            else:
+                self.value.append(token)
+        else:
+            self.value.append(token)
+            self.done = len(self.value) == len(self.null)
+
+
+@dataclass(slots=True)
+class _Request:
+    devices: Sequence[Device]
+    text: str
+    future: asyncio.Future[tuple[str, str, float | None] | None]
+
+
+class BatchedIntentEngine:
+    """
+    Small causal LM answering in the command schema, batched.
+
+    Requests arriving within `max_wait` seconds of each other, up to
+    `max_batch`, are decoded together in one worker thread: one forward
+    pass per step for the whole batch. The KV state of `SYSTEM_PROMPT` is
+    computed once at start and copied into every batch, so only the
+    home's device list and the request are run through the model.
+    Decoding is constrained by a `SchemaConstraint` per request, which
+    ends the answer at the closing brace.
+
+    Parameters
+    ----------
+    config : LlmConfig
+        Model, batching and decoding limits.
+    """
+
+    def __init__(self, config: LlmConfig) -> None:
+        self._config = config
+        self._tokenizer = AutoTokenizer.from_pretrained(config.model)
+        self._model = AutoModelForCausalLM.from_pretrained(
+            config.model, torch_dtype=torch.float32
+        ).to(config.device)
+        self._model.eval()
+        self._pad = self._tokenizer.pad_token_id
+        if self._pad is None:
+            self._pad = self._tokenizer.eos_token_id
+        self._prefix_ids = self._encode(SYSTEM_PROMPT, special=True)
+        self._prefix_cache: Any = None
+        if config.prefix_cache:
+            with torch.no_grad():
+                self._prefix_cache = self._model(
+                    input_ids=torch.tensor([self._prefix_ids], device=config.device),
+                    use_cache=True,
+                ).past_key_values
+        self._cmds = _Trie(
+            {cmd: self._encode(f'{cmd}", "device": "') for cmd in COMMANDS}
+        )
+        # Tokens made only of digits and dots, the pieces of a value. The
+        # vocabulary is scanned once, at start.
+        self._numbers = frozenset(
+            id for id in range(len(self._tokenizer))
+            if (piece := self._tokenizer.decode([id]))
+            and all(c.isdigit() or c == "." for c in piece)
+        )
+        self._null = self._encode("null}")
+        self._close = self._encode("}")[-1]
+        self._queue: asyncio.Queue[_Request] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+        self.batches = 0
+        self.requests = 0
+        self.steps = 0
+
+    async def resolve(
+        self, devices: Sequence[Device], text: str
+    ) -> tuple[str, str, float | None] | None:
+        """Return ``(cmd, device name, value)`` for `text`."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Request(devices, text, future))
+        return await future
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self._config.max_wait
+            while len(batch) < self._config.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(self._queue.get(), timeout)
+                    )
+                except asyncio.TimeoutError:
+                    break
+            try:
+                answers = await asyncio.to_thread(self._decode, batch)
+            except Exception as e:
+                logger.exception("Intent decoding failed")
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            for request, answer in zip(batch, answers):
+                if not request.future.done():
+                    request.future.set_result(answer)
+
+    def _encode(self, text: str, special: bool = False) -> list[int]:
+        return self._tokenizer(text, add_special_tokens=special).input_ids
+
+    def _constraint(self, devices: Sequence[Device]) -> SchemaConstraint:
+        return SchemaConstraint(
+            cmds=self._cmds,
+            devices=_Trie(
+                {d.name: self._encode(f'{d.name}", "value": ') for d in devices}
+            ),
+            numbers=self._numbers,
+            null=self._null,
+            close=self._close,
+            max_value_tokens=self._config.max_value_tokens,
+        )
+
+    @torch.no_grad()
+    def _decode(
+        self, batch: Sequence[_Request]
+    ) -> list[tuple[str, str, float | None] | None]:
+        device = self._config.device
+        prompts = [self._encode(_suffix(r.devices, r.text)) for r in batch]
+        if self._prefix_cache is None:
+            prompts = [self._prefix_ids + prompt for prompt in prompts]
+        width = max(len(prompt) for prompt in prompts)
+        # Left padding keeps the last prompt token of every row in the last
+        # column; padding is masked out and skipped by the position ids.
+        input_ids = torch.tensor(
+            [[self._pad] * (width - len(p)) + p for p in prompts], device=device
+        )
+        mask = torch.tensor(
+            [[0] * (width - len(p)) + [1] * len(p) for p in prompts], device=device
+        )
+        cache = None
+        if self._prefix_cache is not None:
+            cache = copy.deepcopy(self._prefix_cache)
+            cache.batch_repeat_interleave(len(batch))
+            prefix = torch.ones(
+                (len(batch), len(self._prefix_ids)), dtype=mask.dtype, device=device
+            )
+            mask = torch.cat([prefix, mask], dim=1)
+        positions = (mask.cumsum(dim=1) - 1).clamp(min=0)
+        out = self._model(
+            input_ids=input_ids,
+            attention_mask=mask,
+            position_ids=positions[:, -input_ids.shape[1]:],
+            past_key_values=cache,
+            use_cache=True,
+        )
+        constraints = [self._constraint(r.devices) for r in batch]
+        for _ in range(self._config.max_new_tokens):
+            logits = out.logits[:, -1, :]
+            tokens, active = [], []
+            for row, constraint in enumerate(constraints):
+                if constraint.done:
+                    tokens.append(self._pad)
+                    active.append(0)
+                    continue
+                allowed = constraint.allowed()
+                if len(allowed) == 1:
+                    token = allowed[0]
+                else:
+                    scores = logits[row, allowed]
+                    token = allowed[int(torch.argmax(scores))]
+                constraint.advance(token)
+                tokens.append(token)
+                active.append(1)
+            if all(constraint.done for constraint in constraints):
+                break
+            step = torch.tensor(active, dtype=mask.dtype, device=device)
+            mask = torch.cat([mask, step[:, None]], dim=1)
+            positions = positions[:, -1:] + step[:, None]
+            out = self._model(
+                input_ids=torch.tensor(tokens, device=device)[:, None],
+                attention_mask=mask,
+                position_ids=positions,
+                past_key_values=out.past_key_values,
+                use_cache=True,
+            )
+            self.steps += 1
+        self.batches += 1
+        self.requests += len(batch)
+        return [self._answer(constraint) for constraint in constraints]
+
+    def _answer(
+        self, constraint: SchemaConstraint
+    ) -> tuple[str, str, float | None] | None:
+        if not constraint.done or constraint.cmd is None or constraint.device is None:
+            return None
+        value = None
+        if constraint.phase == 3:
+            try:
+                value = float(self._tokenizer.decode(constraint.value))
+            except ValueError:
+                return None
+        return constraint.cmd, constraint.device, value
+
+
+class LlmResolver(ICommandResolver):
+    """
+    Last stage of the NLU pipeline: the `BatchedIntentEngine`.
+
+    Parameters
+    ----------
+    catalog : IDeviceCatalog
+        Devices of every home.
+    engine : BatchedIntentEngine
+        Shared by all the requests of the process.
+    """
+
+    def __init__(self, catalog: IDeviceCatalog, engine: BatchedIntentEngine) -> None:
+        self._catalog = catalog
+        self._engine = engine
+
+    async def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        devices = self._catalog.devices(home_id)
+        if not devices:
+            return None
+        answer = await self._engine.resolve(devices, text)
+        if answer is None:
+            return None
+        cmd, name, value = answer
+        matches = [device for device in devices if device.name == name]
+        if len(matches) != 1 or (cmd == "set" and value is None):
+            return None
+        if cmd != "set":
+            value = None
+        return ParsedCommand(
+            home_id=home_id,
+            device_id=matches[0].id,
+            cmd=cmd,
+            device=name,
+            value=value,
+            stage="llm",
+        )
@@ -0,0 +1,70 @@
+from infrastructure.gazetteer import STOP_WORDS, tokenize
+
+
+UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+    "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+    "ноль": 0, "один": 1, "одна": 1, "два": 2, "две": 2, "три": 3,
+    "четыре": 4, "пять": 5, "шесть": 6, "семь": 7, "восемь": 8,
+    "девять": 9, "десять": 10, "одиннадцать": 11, "двенадцать": 12,
+    "тринадцать": 13, "четырнадцать": 14, "пятнадцать": 15,
+    "шестнадцать": 16, "семнадцать": 17, "восемнадцать": 18,
+    "девятнадцать": 19,
+}
+TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60,
+    "seventy": 70, "eighty": 80, "ninety": 90,
+    "двадцать": 20, "тридцать": 30, "сорок": 40, "пятьдесят": 50,
+    "шестьдесят": 60, "семьдесят": 70, "восемьдесят": 80, "девяносто": 90,
+}
+HUNDREDS = {"hundred": 100, "сто": 100}
+
+
+def _extend(value: int | None, word: str) -> int | None:
+    """`value` followed by the number word `word`, or None if it does not go on."""
+    if value is None:
+        return UNITS.get(word, TENS.get(word, HUNDREDS.get(word)))
+    rest = value % 100
+    if word in HUNDREDS:
+        return value * 100 if 0 < value < 10 else None
+    if word in TENS:
+        return value + TENS[word] if value and rest == 0 else None
+    if word in UNITS:
+        if value and rest == 0:
+            return value + UNITS[word]
+        if rest >= 20 and rest % 10 == 0 and UNITS[word] < 10:
+            return value + UNITS[word]
+    return None
+
+
+def _numerals(tokens: list[str]) -> list[str]:
+    """Replace runs of number words ("twenty two") with digits ("22")."""
+    out: list[str] = []
+    value: int | None = None
+    for token in tokens:
+        if value is not None:
+            extended = _extend(value, token)
+            if extended is not None:
+                value = extended
+                continue
+            out.append(str(value))
+        value = _extend(None, token)
+        if value is None:
+            out.append(token)
+    if value is not None:
+        out.append(str(value))
+    return out
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form of a command, for caching its interpretation.
+
+    Case and punctuation are dropped, number words become digits, decimal
+    commas become dots and stop words are removed, so "Set the lamp to
+    Fifty!" and "set lamp 50" share an entry. Word order is kept.
+    """
+    tokens = [token.replace(",", ".") for token in tokenize(text)]
+    return " ".join(t for t in _numerals(tokens) if t not in STOP_WORDS)
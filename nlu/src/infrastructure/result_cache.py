@@ -0,0 +1,154 @@
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import time
+from uuid import UUID
+
+from redis.asyncio import Redis
+
+from application.interfaces import IDeviceCatalog, IResultCache
+from config import ResultCacheConfig
+from domain.entities import ParsedCommand
+from infrastructure.indexer import describe
+from infrastructure.normalizer import normalize
+
+
+logger = logging.getLogger(__name__)
+
+_Key = tuple[UUID, str, str]
+
+
+class ResultCache(IResultCache):
+    """
+    Interpretations of commands by home and normalised text, in two tiers.
+
+    Lookups go to a bounded in-process LRU first, then to Redis, which is
+    shared by every NLU replica; a Redis hit is copied into the LRU. Texts
+    no stage could resolve are cached too, for `negative_ttl`, so the same
+    unparseable phrase does not keep reaching the LLM.
+
+    Keys hold a digest of the home's device catalog. When a home's devices
+    change, its digest changes with them and the old entries are no longer
+    reached, on every replica at once; the LRU also drops them right away,
+    the Redis ones expire. A Redis failure counts as a miss.
+
+    Parameters
+    ----------
+    catalog : IDeviceCatalog
+        Devices of every home.
+    redis : Redis
+        Shared tier.
+    config : ResultCacheConfig
+        Sizes, TTLs and key prefix.
+    """
+
+    def __init__(
+        self, catalog: IDeviceCatalog, redis: Redis, config: ResultCacheConfig
+    ) -> None:
+        self._catalog = catalog
+        self._redis = redis
+        self._config = config
+        self._entries: OrderedDict[_Key, tuple[float, ParsedCommand | None]] = (
+            OrderedDict()
+        )
+        self._digests: dict[UUID, tuple[int, str]] = {}
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        catalog.add_listener(self.invalidate)
+
+    async def get(
+        self, home_id: UUID, text: str
+    ) -> tuple[bool, ParsedCommand | None]:
+        key = self._key(home_id, text)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, command = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, command
+            del self._entries[key]
+        try:
+            raw = await self._redis.get(self._redis_key(key))
+        except Exception:
+            logger.warning("NLU result cache read failed", exc_info=True)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return False, None
+        command = self._decode(home_id, raw)
+        self._remember(key, command)
+        self.redis_hits += 1
+        return True, command
+
+    async def put(
+        self, home_id: UUID, text: str, command: ParsedCommand | None
+    ) -> None:
+        key = self._key(home_id, text)
+        self._remember(key, command)
+        ttl = self._config.ttl if command is not None else self._config.negative_ttl
+        try:
+            await self._redis.set(
+                self._redis_key(key), self._encode(command), ex=int(ttl)
+            )
+        except Exception:
+            logger.warning("NLU result cache write failed", exc_info=True)
+
+    def invalidate(self, home_id: UUID) -> None:
+        self._digests.pop(home_id, None)
+        for key in [key for key in self._entries if key[0] == home_id]:
+            del self._entries[key]
+
+    def _key(self, home_id: UUID, text: str) -> _Key:
+        version = self._catalog.version(home_id)
+        cached = self._digests.get(home_id)
+        if cached is None or cached[0] != version:
+            catalog = "\n".join(
+                f"{device.id} {describe(device)}"
+                for device in self._catalog.devices(home_id)
+            )
+            digest = hashlib.blake2b(catalog.encode(), digest_size=8).hexdigest()
+            cached = self._digests[home_id] = (version, digest)
+        return home_id, cached[1], normalize(text)
+
+    def _redis_key(self, key: _Key) -> str:
+        home_id, catalog, text = key
+        text_digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        return f"{self._config.prefix}:{home_id}:{catalog}:{text_digest}"
+
+    def _remember(self, key: _Key, command: ParsedCommand | None) -> None:
+        ttl = self._config.ttl if command is not None else self._config.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, command)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._config.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _encode(command: ParsedCommand | None) -> str:
+        if command is None:
+            return "null"
+        return json.dumps(
+            {
+                "device_id": str(command.device_id),
+                "cmd": command.cmd,
+                "device": command.device,
+                "value": command.value,
+                "stage": command.stage,
+            }
+        )
+
+    @staticmethod
+    def _decode(home_id: UUID, raw: bytes | str) -> ParsedCommand | None:
+        data = json.loads(raw)
+        if data is None:
+            return None
+        return ParsedCommand(
+            home_id=home_id,
+            device_id=UUID(data["device_id"]),
+            cmd=data["cmd"],
+            device=data["device"],
+            value=data["value"],
+            stage=data["stage"],
+        )
@@ -0,0 +1,76 @@
+from uuid import UUID
+
+from application.interfaces import (
+    ICommandResolver,
+    IDeviceCatalog,
+    IEmbedder,
+    IVectorStore,
+)
+from config import SemanticConfig
+from domain.entities import ParsedCommand
+from infrastructure.gazetteer import Gazetteer
+from infrastructure.indexer import CatalogIndexer
+
+
+class SemanticResolver(ICommandResolver):
+    """
+    Finds the device of a command by embedding similarity.
+
+    Catches commands whose device the gazetteer could not pin down ("the
+    light over the sofa"). The command and value still come from the verb
+    lexicon; text without exactly one verb is left to the next stage. Only
+    the text of the command is embedded: the devices were embedded ahead
+    of time by the `CatalogIndexer`.
+
+    Parameters
+    ----------
+    catalog : IDeviceCatalog
+        Devices of every home.
+    indexer : CatalogIndexer
+        Keeps the device embeddings current.
+    embedder : IEmbedder
+        Model the devices were embedded with.
+    store : IVectorStore
+        Device embeddings.
+    config : SemanticConfig
+        Acceptance thresholds.
+    """
+
+    def __init__(
+        self,
+        catalog: IDeviceCatalog,
+        indexer: CatalogIndexer,
+        embedder: IEmbedder,
+        store: IVectorStore,
+        config: SemanticConfig,
+    ) -> None:
+        self._catalog = catalog
+        self._indexer = indexer
+        self._embedder = embedder
+        self._store = store
+        self._config = config
+        self._verbs = Gazetteer(())
+
+    async def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        intent = self._verbs.intent(text)
+        if intent is None:
+            return None
+        await self._indexer.ensure(home_id)
+        vectors = await self._embedder.embed([text])
+        hits = (await self._store.search(home_id, vectors, 2))[0]
+        if not hits or hits[0][1] < self._config.min_score:
+            return None
+        if len(hits) > 1 and hits[0][1] - hits[1][1] < self._config.min_margin:
+            return None
+        device_id = hits[0][0]
+        for device in self._catalog.devices(home_id):
+            if device.id == device_id:
+                return ParsedCommand(
+                    home_id=home_id,
+                    device_id=device.id,
+                    cmd=intent[0],
+                    device=device.name,
+                    value=intent[1],
+                    stage="semantic",
+                )
+        return None
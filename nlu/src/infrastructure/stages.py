@@ -0,0 +1,26 @@
+from typing import Sequence
+from uuid import UUID
+
+from application.interfaces import ICommandResolver
+from domain.entities import ParsedCommand
+
+
+class ResolverChain(ICommandResolver):
+    """
+    Model-backed stages of the NLU pipeline, tried in order.
+
+    Parameters
+    ----------
+    stages : Sequence[ICommandResolver]
+        Stages, cheapest first. The first to resolve the text wins.
+    """
+
+    def __init__(self, stages: Sequence[ICommandResolver]) -> None:
+        self._stages = list(stages)
+
+    async def resolve(self, home_id: UUID, text: str) -> ParsedCommand | None:
+        for stage in self._stages:
+            command = await stage.resolve(home_id, text)
+            if command is not None:
+                return command
+        return None
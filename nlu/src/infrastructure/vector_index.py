@@ -0,0 +1,174 @@
+import logging
+from typing import Sequence
+from uuid import UUID
+
+import numpy as np
+
+from application.interfaces import IVectorStore
+from config import VectorIndexConfig
+
+
+try:
+    import hnswlib
+except ImportError:  # pragma: no cover - optional dependency
+    hnswlib = None
+
+logger = logging.getLogger(__name__)
+
+
+class _HomeIndex:
+    """
+    Embeddings of one home as rows of a float32 matrix.
+
+    Rows are kept contiguous: a deleted row is replaced by the last one,
+    and the matrix grows by doubling. The HNSW graph, when there is one,
+    is dropped on every change and rebuilt by the next search.
+    """
+
+    __slots__ = ("ids", "digests", "rows", "matrix", "size", "hnsw")
+
+    def __init__(self, dimension: int) -> None:
+        self.ids: list[UUID] = []
+        self.digests: list[str] = []
+        self.rows: dict[UUID, int] = {}
+        self.matrix = np.empty((16, dimension), dtype=np.float32)
+        self.size = 0
+        self.hnsw: "hnswlib.Index | None" = None
+
+    def upsert(self, id: UUID, digest: str, vector: np.ndarray) -> None:
+        row = self.rows.get(id)
+        if row is None:
+            if self.size == len(self.matrix):
+                grown = np.empty((2 * self.size, self.matrix.shape[1]), np.float32)
+                grown[:self.size] = self.matrix
+                self.matrix = grown
+            row = self.size
+            self.size += 1
+            self.rows[id] = row
+            self.ids.append(id)
+            self.digests.append(digest)
+        else:
+            self.digests[row] = digest
+        self.matrix[row] = vector
+        self.hnsw = None
+
+    def delete(self, id: UUID) -> None:
+        row = self.rows.pop(id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            self.matrix[row] = self.matrix[last]
+            self.ids[row] = self.ids[last]
+            self.digests[row] = self.digests[last]
+            self.rows[self.ids[row]] = row
+        self.ids.pop()
+        self.digests.pop()
+        self.size = last
+        self.hnsw = None
+
+    def exact(self, vectors: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = vectors @ self.matrix[:self.size].T
+        if k < self.size:
+            top = np.argpartition(scores, self.size - k, axis=1)[:, -k:]
+        else:
+            top = np.broadcast_to(np.arange(self.size), (len(vectors), self.size))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        return (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+    def approximate(
+        self, vectors: np.ndarray, k: int, config: VectorIndexConfig
+    ) -> tuple[np.ndarray, np.ndarray]:
+        if self.hnsw is None:
+            index = hnswlib.Index(space="ip", dim=self.matrix.shape[1])
+            index.init_index(
+                max_elements=self.size,
+                M=config.hnsw_m,
+                ef_construction=config.hnsw_ef_construction,
+            )
+            index.add_items(self.matrix[:self.size], np.arange(self.size))
+            self.hnsw = index
+        assert self.hnsw is not None
+        self.hnsw.set_ef(max(config.hnsw_ef, k))
+        rows, distances = self.hnsw.knn_query(vectors, k=k)
+        # The "ip" space reports 1 - dot product.
+        return rows, 1.0 - distances
+
+
+class InMemoryVectorStore(IVectorStore):
+    """
+    Device embeddings held in the NLU process, one matrix per home.
+
+    A home has a few dozen devices, so searching it is one small matrix
+    product; going over the network to Qdrant would cost far more than
+    the search. All the query vectors of a `search` are scored at once
+    and the top `limit` picked with ``argpartition``. A home holding
+    `hnsw_threshold` embeddings or more is searched through an HNSW graph
+    instead, when ``hnswlib`` is installed.
+
+    Nothing is persisted: after a restart the `CatalogIndexer` embeds
+    every device again.
+
+    Parameters
+    ----------
+    config : VectorIndexConfig
+        HNSW threshold and parameters.
+    dimension : int
+        Size of the embeddings.
+    """
+
+    def __init__(self, config: VectorIndexConfig, dimension: int) -> None:
+        self._config = config
+        self._dimension = dimension
+        self._homes: dict[UUID, _HomeIndex] = {}
+        if hnswlib is None:
+            logger.info("hnswlib is not installed, large homes use exact search")
+
+    async def digests(self, home_id: UUID) -> dict[UUID, str]:
+        index = self._homes.get(home_id)
+        if index is None:
+            return {}
+        return dict(zip(index.ids, index.digests))
+
+    async def upsert(
+        self,
+        home_id: UUID,
+        ids: Sequence[UUID],
+        digests: Sequence[str],
+        vectors: np.ndarray,
+    ) -> None:
+        index = self._homes.get(home_id)
+        if index is None:
+            index = self._homes[home_id] = _HomeIndex(self._dimension)
+        for id, digest, vector in zip(ids, digests, vectors):
+            index.upsert(id, digest, vector)
+
+    async def delete(self, home_id: UUID, ids: Sequence[UUID]) -> None:
+        index = self._homes.get(home_id)
+        if index is None:
+            return
+        for id in ids:
+            index.delete(id)
+        if not index.size:
+            del self._homes[home_id]
+
+    async def search(
+        self, home_id: UUID, vectors: np.ndarray, limit: int
+    ) -> list[list[tuple[UUID, float]]]:
+        index = self._homes.get(home_id)
+        if index is None:
+            return [[] for _ in range(len(vectors))]
+        k = min(limit, index.size)
+        queries = np.asarray(vectors, dtype=np.float32)
+        if hnswlib is not None and index.size >= self._config.hnsw_threshold:
+            rows, scores = index.approximate(queries, k, self._config)
+        else:
+            rows, scores = index.exact(queries, k)
+        return [
+            [(index.ids[row], float(score)) for row, score in zip(r, s)]
+            for r, s in zip(rows.tolist(), scores.tolist())
+        ]
@@ -0,0 +1,131 @@
+from typing import AsyncIterable
+
+from dishka import AnyOf, Provider, Scope, from_context, provide
+from faststream.rabbit import RabbitBroker, RabbitRouter
+from redis.asyncio import Redis
+
+from application import interfaces
+from application.interactors import ParseCommandInteractor
+from config import Config
+from infrastructure.adapters.catalog import PostgresDeviceCatalog
+from infrastructure.adapters.embedder import SentenceTransformerEmbedder
+from infrastructure.adapters.qdrant import QdrantVectorStore
+from infrastructure.adapters.redis import new_redis_client
+from infrastructure.gazetteer import GazetteerResolver
+from infrastructure.indexer import CatalogIndexer
+from infrastructure.llm import BatchedIntentEngine, LlmResolver
+from infrastructure.result_cache import ResultCache
+from infrastructure.semantic import SemanticResolver
+from infrastructure.stages import ResolverChain
+from infrastructure.vector_index import InMemoryVectorStore
+
+
+class AppProvider(Provider):
+    config = from_context(provides=Config, scope=Scope.APP)
+    broker = from_context(provides=RabbitBroker, scope=Scope.APP)
+    controller = from_context(provides=RabbitRouter, scope=Scope.APP)
+
+    @provide(scope=Scope.APP)
+    async def get_catalog(
+        self, config: Config
+    ) -> AsyncIterable[AnyOf[PostgresDeviceCatalog, interfaces.IDeviceCatalog]]:
+        catalog = PostgresDeviceCatalog(config.postgres, config.catalog)
+        await catalog.start()
+        try:
+            yield catalog
+        finally:
+            await catalog.stop()
+
+    fast_path = provide(
+        GazetteerResolver,
+        scope=Scope.APP,
+        provides=interfaces.IFastPathResolver
+    )
+
+    @provide(scope=Scope.APP)
+    def get_embedder(
+        self, config: Config
+    ) -> AnyOf[SentenceTransformerEmbedder, interfaces.IEmbedder]:
+        return SentenceTransformerEmbedder(config.embedding)
+
+    @provide(scope=Scope.APP)
+    async def get_vector_store(
+        self, config: Config, embedder: SentenceTransformerEmbedder
+    ) -> AsyncIterable[interfaces.IVectorStore]:
+        if config.vectors.store == "memory":
+            yield InMemoryVectorStore(config.vectors, embedder.dimension)
+            return
+        store = QdrantVectorStore(config.qdrant, embedder.dimension)
+        await store.start()
+        try:
+            yield store
+        finally:
+            await store.stop()
+
+    @provide(scope=Scope.APP)
+    async def get_indexer(
+        self,
+        config: Config,
+        catalog: interfaces.IDeviceCatalog,
+        embedder: interfaces.IEmbedder,
+        store: interfaces.IVectorStore,
+    ) -> AsyncIterable[CatalogIndexer]:
+        indexer = CatalogIndexer(catalog, embedder, store, config.embedding)
+        await indexer.start()
+        try:
+            yield indexer
+        finally:
+            await indexer.stop()
+
+    @provide(scope=Scope.APP)
+    def get_semantic(
+        self,
+        config: Config,
+        catalog: interfaces.IDeviceCatalog,
+        indexer: CatalogIndexer,
+        embedder: interfaces.IEmbedder,
+        store: interfaces.IVectorStore,
+    ) -> SemanticResolver:
+        return SemanticResolver(catalog, indexer, embedder, store, config.semantic)
+
+    @provide(scope=Scope.APP)
+    async def get_intent_engine(
+        self, config: Config
+    ) -> AsyncIterable[BatchedIntentEngine]:
+        engine = BatchedIntentEngine(config.llm)
+        await engine.start()
+        try:
+            yield engine
+        finally:
+            await engine.stop()
+
+    @provide(scope=Scope.APP)
+    def get_fallback(
+        self,
+        catalog: interfaces.IDeviceCatalog,
+        semantic: SemanticResolver,
+        engine: BatchedIntentEngine,
+    ) -> interfaces.ICommandResolver:
+        return ResolverChain([semantic, LlmResolver(catalog, engine)])
+
+    @provide(scope=Scope.APP)
+    async def get_redis_conn(self, config: Config) -> AsyncIterable[Redis]:
+        conn = new_redis_client(config.redis)
+        try:
+            yield conn
+        finally:
+            await conn.close()
+
+    @provide(scope=Scope.APP)
+    def get_result_cache(
+        self,
+        config: Config,
+        catalog: interfaces.IDeviceCatalog,
+        redis: Redis,
+    ) -> interfaces.IResultCache:
+        return ResultCache(catalog, redis, config.cache)
+
+    exec_interactor = provide(
+        source=ParseCommandInteractor,
+        scope=Scope.APP
+    )
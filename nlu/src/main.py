@@ -0,0 +1,49 @@
+from dishka import make_async_container
+from dishka.integrations.faststream import setup_dishka  # type: ignore
+from faststream import FastStream
+from faststream.rabbit import RabbitBroker, RabbitRouter
+
+from application import interfaces
+from config import Config
+from controllers.amqp import CommandController
+from infrastructure.adapters.rabbit import new_broker
+from infrastructure.indexer import CatalogIndexer
+from ioc import AppProvider
+
+
+config = Config()
+controller = RabbitRouter()
+
+
+def get_faststream_app(config: Config, controller: RabbitRouter) -> FastStream:
+    broker = new_broker(config.rabbit)
+    container = make_async_container(
+        AppProvider(),
+        context={
+            Config: config,
+            RabbitBroker: broker,
+            RabbitRouter: controller
+        }
+    )
+    CommandController(controller, broker)
+    faststream_app = FastStream(broker)
+    setup_dishka(
+        container=container,
+        app=faststream_app,
+        auto_inject=True
+    )
+    broker.include_router(controller)
+
+    @faststream_app.after_startup
+    async def load_catalog() -> None:
+        # Load and index the device catalog before the first command arrives.
+        await container.get(interfaces.IDeviceCatalog)
+        await container.get(CatalogIndexer)
+
+    return faststream_app
+
+
+if __name__ == "__main__":
+    import asyncio
+    app = get_faststream_app(config, controller)
+    asyncio.run(app.run())
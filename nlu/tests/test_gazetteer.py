@@ -0,0 +1,63 @@
+from uuid import UUID, uuid4
+
+import pytest
+
+from domain.entities import Device
+from infrastructure.gazetteer import Gazetteer
+
+
+HOME = uuid4()
+
+
+def device(name: str, type: str, location: str | None) -> Device:
+    return Device(uuid4(), HOME, name, type, location)
+
+
+LAMP = device("Lamp", "lamp", "bedroom")
+CEILING = device("Ceiling", "lamp", "kitchen")
+KETTLE = device("Kettle", "kettle", "kitchen")
+BOILER = device("Boiler", "heater", "bathroom")
+
+
+def resolve(text: str) -> UUID | None:
+    command = Gazetteer([LAMP, CEILING, KETTLE, BOILER]).match(HOME, text)
+    return None if command is None else command.device_id
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("turn on the lamp", LAMP),
+        ("turn on the bedroom lamp", LAMP),
+        ("turn on the ceiling", CEILING),
+        ("turn on the kitchen ceiling", CEILING),
+        ("turn off the kettle", KETTLE),
+    ],
+)
+def test_name_resolves_the_device(text: str, expected: Device) -> None:
+    assert resolve(text) == expected.id
+
+
+@pytest.mark.parametrize(
+    "text", ["turn on the heater", "turn on the heater in the bathroom"]
+)
+def test_location_and_type_resolve_the_device(text: str) -> None:
+    assert resolve(text) == BOILER.id
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "turn on the kitchen lamp",
+        "toggle the lamp in the kitchen",
+        "turn on the bedroom ceiling",
+        "turn on the kitchen bedroom lamp",
+    ],
+)
+def test_name_conflicting_with_location_is_refused(text: str) -> None:
+    assert resolve(text) is None
+
+
+def test_location_without_a_single_device_is_refused() -> None:
+    assert resolve("turn on the kitchen") is None
+    assert resolve("turn on the kitchen heater") is None
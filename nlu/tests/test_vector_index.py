@@ -0,0 +1,166 @@
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from config import VectorIndexConfig
+from infrastructure import vector_index
+from infrastructure.vector_index import InMemoryVectorStore, _HomeIndex
+
+
+DIMENSION = 4
+
+
+def unit(*values: float) -> np.ndarray:
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def new_index(count: int) -> tuple[_HomeIndex, list[UUID]]:
+    index = _HomeIndex(DIMENSION)
+    ids = [uuid4() for _ in range(count)]
+    for i, id in enumerate(ids):
+        index.upsert(id, f"d{i}", unit(i + 1, 1, 0, 0))
+    return index, ids
+
+
+def assert_consistent(index: _HomeIndex) -> None:
+    assert len(index.ids) == len(index.digests) == len(index.rows) == index.size
+    for row, id in enumerate(index.ids):
+        assert index.rows[id] == row
+
+
+def test_upsert_grows_the_matrix_and_updates_in_place() -> None:
+    index, ids = new_index(20)
+    assert index.size == 20
+    assert len(index.matrix) == 32
+    assert_consistent(index)
+
+    index.upsert(ids[3], "changed", unit(0, 0, 0, 1))
+    assert index.size == 20
+    assert index.rows[ids[3]] == 3
+    assert index.digests[3] == "changed"
+    np.testing.assert_allclose(index.matrix[3], unit(0, 0, 0, 1))
+
+
+def test_delete_moves_the_last_row_into_the_gap() -> None:
+    index, ids = new_index(5)
+    last_vector = index.matrix[4].copy()
+
+    index.delete(ids[1])
+    assert index.size == 4
+    assert ids[1] not in index.rows
+    assert index.ids == [ids[0], ids[4], ids[2], ids[3]]
+    assert index.digests == ["d0", "d4", "d2", "d3"]
+    np.testing.assert_array_equal(index.matrix[1], last_vector)
+    assert_consistent(index)
+
+    index.delete(ids[3])
+    assert index.ids == [ids[0], ids[4], ids[2]]
+    assert_consistent(index)
+
+    index.delete(uuid4())
+    assert index.size == 3
+
+
+def test_change_drops_the_hnsw_graph() -> None:
+    index, ids = new_index(3)
+    index.hnsw = object()
+    index.upsert(ids[0], "d0", unit(1, 0, 0, 0))
+    assert index.hnsw is None
+    index.hnsw = object()
+    index.delete(ids[0])
+    assert index.hnsw is None
+
+
+@pytest.mark.parametrize("k", [1, 3, 5, 8])
+def test_exact_returns_top_k_best_first(k: int) -> None:
+    index = _HomeIndex(DIMENSION)
+    vectors = [unit(1, 0, 0, 0), unit(1, 1, 0, 0), unit(0, 1, 0, 0),
+               unit(0, 0, 1, 0), unit(1, 1, 1, 0)]
+    for i, vector in enumerate(vectors):
+        index.upsert(uuid4(), f"d{i}", vector)
+    queries = np.stack([unit(1, 0.2, 0, 0), unit(0, 0.3, 1, 0.1)])
+
+    rows, scores = index.exact(queries, min(k, index.size))
+    expected = np.argsort(-(queries @ np.stack(vectors).T), axis=1)
+    expected = expected[:, :min(k, index.size)]
+    np.testing.assert_array_equal(rows, expected)
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_search_of_a_missing_home_is_empty() -> None:
+    store = InMemoryVectorStore(VectorIndexConfig(), DIMENSION)
+    queries = np.stack([unit(1, 0, 0, 0), unit(0, 1, 0, 0)])
+    assert asyncio.run(store.search(uuid4(), queries, 3)) == [[], []]
+
+
+def test_delete_of_the_last_device_forgets_the_home() -> None:
+    store = InMemoryVectorStore(VectorIndexConfig(), DIMENSION)
+    home, id = uuid4(), uuid4()
+    asyncio.run(store.upsert(home, [id], ["d"], np.stack([unit(1, 0, 0, 0)])))
+    asyncio.run(store.delete(home, [id]))
+    assert asyncio.run(store.digests(home)) == {}
+    assert asyncio.run(store.search(home, np.stack([unit(1, 0, 0, 0)]), 1)) == [[]]
+
+
+@pytest.mark.parametrize("devices, path", [(9, "exact"), (10, "hnsw")])
+def test_search_switches_to_hnsw_at_the_threshold(
+    monkeypatch: pytest.MonkeyPatch, devices: int, path: str
+) -> None:
+    paths: list[str] = []
+    exact = _HomeIndex.exact
+
+    def record_exact(self: _HomeIndex, *args: Any) -> Any:
+        paths.append("exact")
+        return exact(self, *args)
+
+    def record_approximate(self: _HomeIndex, vectors: Any, k: int, config: Any) -> Any:
+        paths.append("hnsw")
+        return exact(self, vectors, k)
+
+    monkeypatch.setattr(_HomeIndex, "exact", record_exact)
+    monkeypatch.setattr(_HomeIndex, "approximate", record_approximate)
+    if vector_index.hnswlib is None:
+        monkeypatch.setattr(vector_index, "hnswlib", object())
+    store = InMemoryVectorStore(
+        VectorIndexConfig.model_validate({"NLU_HNSW_THRESHOLD": 10}),
+        DIMENSION,
+    )
+    home = uuid4()
+    vectors = np.stack([unit(i + 1, 1, 0, 0) for i in range(devices)])
+    asyncio.run(
+        store.upsert(home, [uuid4() for _ in range(devices)], ["d"] * devices, vectors)
+    )
+    asyncio.run(store.search(home, vectors[:1], 3))
+    assert paths == [path]
+
+
+def test_search_stays_exact_without_hnswlib(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(vector_index, "hnswlib", None)
+    store = InMemoryVectorStore(
+        VectorIndexConfig.model_validate({"NLU_HNSW_THRESHOLD": 1}), DIMENSION
+    )
+    home, id = uuid4(), uuid4()
+    asyncio.run(store.upsert(home, [id], ["d"], np.stack([unit(1, 0, 0, 0)])))
+    results = asyncio.run(store.search(home, np.stack([unit(1, 0, 0, 0)]), 5))
+    assert results[0][0][0] == id
+    assert results[0][0][1] == pytest.approx(1.0)
+
+
+def test_hnsw_agrees_with_exact_search() -> None:
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(0)
+    index = _HomeIndex(DIMENSION)
+    for i in range(200):
+        index.upsert(uuid4(), f"d{i}", unit(*rng.standard_normal(DIMENSION)))
+    queries = np.stack([unit(*rng.standard_normal(DIMENSION)) for _ in range(5)])
+    config = VectorIndexConfig()
+
+    rows, scores = index.approximate(queries, 5, config)
+    exact_rows, exact_scores = index.exact(queries, 5)
+    np.testing.assert_array_equal(rows, exact_rows)
+    np.testing.assert_allclose(scores, exact_scores, atol=1e-5)
+    assert index.hnsw is not None